@@ -1,23 +1,57 @@
 import tkinter as tk
-from tkinter import ttk, font
+from tkinter import ttk, font, filedialog, messagebox
+from array import array
+import math
+import os
 import time
-from collections import deque
+import layout
+import loaders
+import profiling
+import traversal
+import worker
+from graphdata import Graph, LabelIndex
+from spatial import SpatialGrid
+from theme import (NODE_RADIUS, NODE_OUTLINE_WIDTH, EDGE_WIDTH, CANVAS_WIDTH, CANVAS_HEIGHT, LAYOUT_MARGIN,
+                   NODE_SPACING, LABEL_MIN_RADIUS, POINT_RADIUS, NODE_COLOR_DEFAULT, NODE_COLOR_VISITING,
+                   TEXT_COLOR, EDGE_COLOR_DEFAULT, HIGHLIGHT_COLOR, SELECTION_COLOR, NODE_COLORS)
+from traversal import GOAL_REQUIRED, HEURISTICS, NONE, PSEUDO_CODE
+import theme
 
 # --- Constants ---
-NODE_RADIUS = 20
-NODE_OUTLINE_WIDTH = 2
-EDGE_WIDTH = 2
-NODE_COLOR_DEFAULT = "lightblue"
-NODE_COLOR_VISITING = "yellow"
-NODE_COLOR_VISITED = "deepskyblue"
-NODE_COLOR_START = "lightgreen"
-TEXT_COLOR = "black"
-HIGHLIGHT_COLOR = "lightcoral"
-CANVAS_WIDTH = 600
-CANVAS_HEIGHT = 400
 CODE_WIDTH = 50
 CODE_HEIGHT = 20
 DELAY_MS = 700 # Delay between visualization steps in milliseconds
+SPEED_MIN = 0.25 # Slowest playback speed multiplier
+SPEED_MAX = 4096.0 # Fastest playback speed multiplier (the slider is logarithmic)
+STEP_BUDGET_MS = 10 # Longest time the scheduler runs steps before returning to the event loop
+DEFAULT_MAX_FPS = 30 # Canvas repaints per second during playback
+MAX_FPS_CHOICES = ("10", "20", "30", "60", "120")
+PROFILE_REFRESH_MS = 500 # How often the profiler panel is updated
+PLAYBACK_MODES = ("Step by step", "Sampled", "Instant") # Sampled plays the run back as a fixed number of frames
+DEFAULT_SAMPLE_FRAMES = 50
+FRAME_CHUNK = 20000 # Steps applied between returns to the event loop in Sampled/Instant mode
+WORKER_POLL_MS = 15 # How often the background worker is checked for results while it has jobs
+
+# --- Rendering Limits ---
+MIN_ZOOM = 0.0005
+MAX_ZOOM = 8.0
+ZOOM_STEP = 1.2          # Zoom factor per mouse wheel notch
+MAX_LABEL_ITEMS = 500    # More visible nodes than this are drawn as points
+MAX_POINT_ITEMS = 5000   # More visible nodes than this are aggregated per grid cell
+MAX_EDGE_ITEMS = 5000    # Individually drawn edges per frame; the rest are bundled
+MAX_EDGE_SCAN = 200000   # Adjacency entries scanned per frame to draw or bundle edges
+BUNDLE_MIN_LENGTH = 200  # Edges longer than this on screen (pixels) are bundled
+BUNDLE_CELL_PX = 40      # Screen cell size used to group bundled edge ends
+BUNDLE_MAX_WIDTH = 8
+BUNDLE_COLOR = "#c8c8c8"
+HIT_SLOP_PX = 4          # The pointer hits nodes up to this many pixels outside them
+CLICK_MAX_MOVE = 3       # A press that moves further than this (pixels) is a drag, not a click
+SELECTION_GAP = 3        # Pixels between a node and its selection ring
+
+PICKER_MAX_MATCHES = 50  # Labels listed in a node picker's drop-down
+
+GOAL_NONE = "(none)" # Goal node choice for runs without a goal
+NEW_NODE_ANGLE = math.pi * (3 - math.sqrt(5)) # Golden angle: spreads the nodes added around one point
 
 # --- Graph Data (Fixed) ---
 graph = {
@@ -45,45 +79,777 @@ node_positions = {
     'I': (CANVAS_WIDTH // 2 + 50, 350)
 }
 
-# --- Pseudo Code ---
-DFS_CODE = [
-    "DFS(graph, start_node):",
-    "  visited = set()",
-    "  stack = [start_node]",
-    "  while stack:",
-    "    node = stack.pop()",
-    "    if node not in visited:",
-    "      mark node as visiting", # Visualization Step
-    "      visited.add(node)",
-    "      mark node as visited",  # Visualization Step
-    "      for neighbor in reversed(graph[node]):", # Reverse for visual order
-    "        if neighbor not in visited:",
-    "          stack.append(neighbor)",
-    "          mark edge to neighbor", # Visualization Step
-]
-
-BFS_CODE = [
-    "BFS(graph, start_node):",
-    "  visited = set()",
-    "  queue = deque([start_node])",
-    "  visited.add(start_node)",
-    "  mark start_node as visiting", # Visualization Step
-    "  while queue:",
-    "    node = queue.popleft()",
-    "    mark node as visited",    # Visualization Step
-    "    for neighbor in graph[node]:",
-    "      if neighbor not in visited:",
-    "        visited.add(neighbor)",
-    "        queue.append(neighbor)",
-    "        mark neighbor as visiting", # Visualization Step
-    "        mark edge to neighbor",   # Visualization Step
-]
+# --- Step Scheduler ---
+class StepScheduler:
+    """Drives a step generator from the Tk event loop with after() callbacks.
+
+    The generator yields the delay (in ms) to wait before its next step, so
+    nothing ever blocks the main loop and no CPU is used between frames.
+    Steps are run against a wall-clock schedule: when the scaled delays are
+    shorter than a timer tick, one tick runs every step that is due (for at
+    most STEP_BUDGET_MS), so fast playback is not limited by timer resolution.
+    """
+    def __init__(self, master, on_finish=None, on_error=None, profiler=None):
+        self.master = master
+        self.on_finish = on_finish # Called with no arguments when a run ends or is cancelled
+        self.on_error = on_error   # Called with the exception if a step raises
+        self.profiler = profiler   # Times every step ("step") while enabled
+        self.steps = None
+        self.after_id = None
+        self.paused = False
+        self.speed = 1.0
+        self.due = 0.0 # perf_counter() time at which the next step is due
+        self.pending_delay = 0 # Delay still owed to the step that was paused
+
+    @property
+    def running(self):
+        return self.steps is not None
+
+    def start(self, steps):
+        """Starts driving a new step generator, cancelling any current one."""
+        self.cancel(notify=False)
+        self.steps = steps
+        self.paused = False
+        self.due = time.perf_counter()
+        self._schedule()
+
+    def pause(self):
+        if self.running and not self.paused:
+            self.paused = True
+            self._unschedule()
+            self.pending_delay = max(self.due - time.perf_counter(), 0.0) * 1000 * self.speed
+
+    def resume(self):
+        if self.running and self.paused:
+            self.paused = False
+            self.due = time.perf_counter() + self.pending_delay / self.speed / 1000
+            self._schedule()
+
+    def cancel(self, notify=True):
+        """Stops the current run; the generator is closed and never resumed."""
+        self._unschedule()
+        if self.steps is None:
+            return
+        self.steps.close()
+        self.steps = None
+        self.paused = False
+        if notify and self.on_finish:
+            self.on_finish()
+
+    def set_speed(self, speed):
+        self.speed = min(max(speed, SPEED_MIN), SPEED_MAX)
+
+    def _schedule(self):
+        wait = (self.due - time.perf_counter()) * 1000
+        self.after_id = self.master.after(max(int(wait), 1), self._tick)
+
+    def _unschedule(self):
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _tick(self):
+        self.after_id = None
+        deadline = time.perf_counter() + STEP_BUDGET_MS / 1000
+        profiler = self.profiler if self.profiler is not None and self.profiler.enabled else None
+        while True:
+            try:
+                if profiler is None:
+                    delay = next(self.steps)
+                else:
+                    start = time.perf_counter()
+                    delay = next(self.steps)
+                    profiler.record("step", time.perf_counter() - start)
+            except StopIteration:
+                self.steps = None
+                if self.on_finish:
+                    self.on_finish()
+                return
+            except Exception as e:
+                self.steps = None
+                if self.on_error:
+                    self.on_error(e)
+                return
+            if self.paused:
+                self.pending_delay = delay or 0
+                return
+            self.due += (delay or 0) / self.speed / 1000
+            now = time.perf_counter()
+            if self.due > now:
+                break
+            if now >= deadline:
+                self.due = now # Running behind; let the display catch up instead of bursting later
+                break
+        self._schedule()
+
+
+# --- Canvas Renderer ---
+class GraphRenderer:
+    """Draws a graph on a canvas with zoom/pan, viewport culling and level of detail.
+
+    Node and highlighted-edge colors are kept in plain lists/dicts, and canvas
+    items only exist for what lies inside the viewport, so the cost of a frame
+    depends on the view, not on the size of the graph. Depending on how many
+    nodes are visible and how large they are on screen, nodes are drawn as
+    labeled circles ("full"), unlabeled dots ("points"), or one dot per
+    spatial grid cell ("cells"). Edges that are long on screen or leave the
+    view are bundled into one line per pair of screen cells.
+
+    Color changes only update the model and mark the item dirty; flush()
+    applies them to the canvas at most once per frame (frame_ms), so only
+    the last color set on an item within a frame is ever drawn.
+    """
+    def __init__(self, canvas, label_font, on_frame=None, profiler=None):
+        self.canvas = canvas
+        self.label_font = label_font # Shared by every label; creating fonts is expensive
+        self.on_frame = on_frame # Called after every flush, to repaint other widgets in step
+        self.profiler = profiler or profiling.Profiler() # Disabled unless the app turns it on
+        self.graph = None
+        self.positions = [] # World (x, y) per node id
+        self.index = SpatialGrid([])
+        self.index_stale = False # Positions moved since the index was built
+        self.hit_index = None # Finer grid over the same positions for node_at(), built on first use
+        self.hit_size = 0 # Number of nodes hit_index was built for
+        self.node_colors = [] # Fill color per node id
+        self.touched_nodes = set() # Nodes colored since the last reset; only these need restoring
+        self.edge_colors = {} # Highlighted edges only ((min(u, v), max(u, v)): color)
+        self.node_edges = {} # Node id: keys of its highlighted edges, for nodes whose edges are sampled
+        self.cell_colors = {} # Last color set inside each grid cell, for "cells" mode
+        self.cell_edges = None # Sampled (cell, cell): count table for "cells" mode
+        self.scale = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.mode = "full"
+        self.node_objects = {} # Canvas items of rendered nodes only (node id: oval_id)
+        self.text_objects = {}
+        self.edge_objects = {} # Individually drawn edges ((min(u, v), max(u, v)): line_id)
+        self.cell_objects = {} # Grid cell key: item, in "cells" mode
+        self.bundled_nodes = set() # Rendered nodes with an edge drawn as part of a bundle
+        self.selected = None # Node id marked with a ring (the start node)
+        self.selection_object = None
+        self.render_after_id = None
+        self.dirty_nodes = set() # Items whose model color changed since the last flush
+        self.dirty_edges = set()
+        self.dirty_cells = set()
+        self.flush_after_id = None
+        self.frame_ms = 1000 / DEFAULT_MAX_FPS
+        self.last_flush = 0.0
+
+    # --- Model ---
+    def set_graph(self, graph, positions):
+        """Shows a new graph with all colors reset."""
+        self.graph = graph
+        self.node_colors = [NODE_COLOR_DEFAULT] * len(graph)
+        self.touched_nodes.clear()
+        self.edge_colors.clear()
+        self.node_edges.clear()
+        self.set_positions(positions)
+
+    def set_positions(self, positions):
+        """Moves the nodes to new world positions (one (x, y) per node id).
+
+        The spatial index is rebuilt by the next render and the hit-testing
+        grid by the next node_at(), so a layout moving the nodes many times
+        per frame only pays for them once.
+        """
+        self.positions = positions
+        self.index_stale = True
+        self.hit_index = None
+        self.request_render()
+
+    def sync_index(self):
+        """Rebuilds the spatial index and the per-cell colors if the nodes have moved."""
+        if not self.index_stale:
+            return
+        self.index_stale = False
+        positions = self.positions
+        self.index = SpatialGrid(positions)
+        self.cell_edges = None
+        self.cell_colors = {}
+        for node in self.touched_nodes:
+            self.cell_colors[self.index.cell_of(*positions[node])] = self.node_colors[node]
+
+    def set_node_color(self, node, color):
+        self.node_colors[node] = color
+        self.touched_nodes.add(node)
+        self.dirty_nodes.add(node)
+        if not self.index_stale: # Otherwise sync_index() recomputes the cell colors
+            key = self.index.cell_of(*self.positions[node])
+            self.cell_colors[key] = color
+            self.dirty_cells.add(key)
+        self.request_flush()
+
+    def set_edge_color(self, u, v, color):
+        key = (u, v) if u < v else (v, u)
+        self.edge_colors[key] = color
+        self.node_edges.setdefault(u, set()).add(key)
+        self.node_edges.setdefault(v, set()).add(key)
+        self.dirty_edges.add(key)
+        self.request_flush()
+
+    def clear_edge_color(self, u, v):
+        """Removes the highlight of an edge."""
+        key = (u, v) if u < v else (v, u)
+        if self.edge_colors.pop(key, None) is not None:
+            self.dirty_edges.add(key)
+            self.request_flush()
+
+    def reset_colors(self):
+        """Restores the default color of every node and edge.
+
+        Only the nodes, edges and cells colored since the last reset are
+        touched, and they are repainted by the next flush like any other
+        change, so the cost depends on the run, not on the graph size.
+        """
+        node_colors = self.node_colors
+        for node in self.touched_nodes:
+            node_colors[node] = NODE_COLOR_DEFAULT
+        self.dirty_nodes |= self.touched_nodes
+        self.touched_nodes.clear()
+        self.dirty_edges.update(self.edge_colors)
+        self.edge_colors.clear()
+        self.node_edges.clear()
+        self.dirty_cells.update(self.cell_colors)
+        self.cell_colors.clear()
+        self.request_flush()
+
+    def set_max_fps(self, fps):
+        self.frame_ms = 1000 / max(fps, 1)
+
+    # --- Editing ---
+    # Called right after the same edit is made to the graph. Only the items of the
+    # edited nodes and edges are created or deleted; an edit that changes what is
+    # aggregated (grid cells, bundles, or the number of visible nodes past a
+    # level-of-detail limit) falls back to one coalesced render.
+    def add_node(self, x, y):
+        """Shows the node just added to the graph at world position (x, y)."""
+        node = len(self.positions)
+        self.positions.append((x, y))
+        self.node_colors.append(NODE_COLOR_DEFAULT)
+        if not self.index_stale: # Otherwise sync_index() indexes it with the rest
+            self.index.insert(node)
+        if self.hit_index is not None:
+            if node >= 2 * self.hit_size: # Its cells are sized for half as many nodes; node_at() builds a new one
+                self.hit_index = None
+            else:
+                self.hit_index.insert(node)
+        x0, y0, x1, y1 = self.visible_rect()
+        if not (x0 <= x <= x1 and y0 <= y <= y1):
+            return
+        limit = MAX_LABEL_ITEMS if self.mode == "full" else MAX_POINT_ITEMS
+        if self.mode == "cells" or len(self.node_objects) >= limit:
+            self.request_render()
+        else:
+            self.create_node(node, self.node_size())
+
+    def add_edge(self, u, v):
+        """Shows an edge just added to the graph."""
+        key = (u, v) if u < v else (v, u)
+        self.cell_edges = None
+        if key in self.edge_objects or (u not in self.node_objects and v not in self.node_objects):
+            if self.mode == "cells":
+                self.request_render()
+            return
+        (ux, uy), (vx, vy) = self.to_screen(u), self.to_screen(v)
+        if (u in self.node_objects and v in self.node_objects and len(self.edge_objects) < MAX_EDGE_ITEMS
+                and (vx - ux) ** 2 + (vy - uy) ** 2 < BUNDLE_MIN_LENGTH * BUNDLE_MIN_LENGTH):
+            self.create_edge(key, ux, uy, vx, vy)
+        else:
+            self.request_render() # Joins a bundle
+
+    def remove_edge(self, u, v):
+        """Hides an edge just removed from the graph (unless the opposite direction remains)."""
+        if v in self.graph.neighbors(u) or u in self.graph.neighbors(v):
+            return
+        key = (u, v) if u < v else (v, u)
+        self.cell_edges = None
+        self.edge_colors.pop(key, None)
+        self.dirty_edges.discard(key)
+        for end in key:
+            self.node_edges.get(end, set()).discard(key)
+        line_id = self.edge_objects.pop(key, None)
+        if line_id is not None:
+            self.canvas.delete(line_id)
+        elif self.mode == "cells" or u in self.bundled_nodes or v in self.bundled_nodes:
+            self.request_render()
+
+    def remove_node(self, node, moved):
+        """Hides a node just removed from the graph, whose edges were removed before it.
+
+        `moved` is what Graph.remove_node() returned: the old id of the node
+        that took over id `node`. Its items, colors and edges are renamed,
+        not redrawn.
+        """
+        for items in (self.node_objects, self.text_objects):
+            item = items.pop(node, None)
+            if item is not None:
+                self.canvas.delete(item)
+        if not self.index_stale:
+            self.index.remove(node)
+        if self.hit_index is not None:
+            self.hit_index.remove(node)
+        self.touched_nodes.discard(node)
+        self.dirty_nodes.discard(node)
+        self.bundled_nodes.discard(node)
+        self.node_edges.pop(node, None)
+        self.cell_edges = None
+        if self.selected == node:
+            self.select(None)
+        if moved is not None:
+            if not self.index_stale:
+                self.index.remove(moved)
+            if self.hit_index is not None:
+                self.hit_index.remove(moved)
+            self.positions[node] = self.positions[moved]
+            self.node_colors[node] = self.node_colors[moved]
+            if not self.index_stale:
+                self.index.insert(node)
+            if self.hit_index is not None:
+                self.hit_index.insert(node)
+            for items in (self.node_objects, self.text_objects):
+                if moved in items:
+                    items[node] = items.pop(moved)
+            for nodes in (self.touched_nodes, self.dirty_nodes, self.bundled_nodes):
+                if moved in nodes:
+                    nodes.remove(moved)
+                    nodes.add(node)
+            for edges in (self.edge_objects, self.edge_colors):
+                for key in [key for key in edges if moved in key]:
+                    a, b = (node if end == moved else end for end in key)
+                    edges[(a, b) if a < b else (b, a)] = edges.pop(key)
+            for key in [key for key in self.dirty_edges if moved in key]:
+                self.dirty_edges.remove(key)
+                a, b = (node if end == moved else end for end in key)
+                self.dirty_edges.add((a, b) if a < b else (b, a))
+            for key in self.node_edges.pop(moved, ()):
+                a, b = (node if end == moved else end for end in key)
+                renamed = (a, b) if a < b else (b, a)
+                for end in renamed:
+                    keys = self.node_edges.setdefault(end, set())
+                    keys.discard(key)
+                    keys.add(renamed)
+            if self.selected == moved:
+                self.selected = node
+        self.positions.pop()
+        self.node_colors.pop()
+        if self.mode == "cells":
+            self.request_render()
+
+    def move_nodes(self, moves):
+        """Moves a few nodes ({node: (x, y)}), updating only their items and edge lines."""
+        x0, y0, x1, y1 = self.visible_rect()
+        rerender = self.mode == "cells"
+        for node, (x, y) in moves.items():
+            if self.hit_index is not None:
+                self.hit_index.remove(node) # Before the shared position changes
+            if self.index_stale:
+                self.positions[node] = (x, y)
+            else:
+                self.index.move(node, x, y)
+            if self.hit_index is not None:
+                self.hit_index.insert(node)
+            if (node in self.node_objects) != (x0 <= x <= x1 and y0 <= y <= y1) or node in self.bundled_nodes:
+                rerender = True # Enters or leaves the view, or has to be re-bundled
+        self.cell_edges = None
+        if rerender:
+            self.request_render()
+            return
+        canvas, size = self.canvas, self.node_size()
+        for node in moves:
+            if node in self.node_objects:
+                x, y = self.to_screen(node)
+                canvas.coords(self.node_objects[node], x - size, y - size, x + size, y + size)
+                if node in self.text_objects:
+                    canvas.coords(self.text_objects[node], x, y)
+        for (u, v), line_id in self.edge_objects.items():
+            if u in moves or v in moves:
+                canvas.coords(line_id, *self.to_screen(u), *self.to_screen(v))
+        if self.selected in moves:
+            self.draw_selection()
+
+    # --- Selection ---
+    def node_at(self, sx, sy):
+        """Returns the id of the node drawn at screen position (sx, sy), or None.
+
+        Looked up in the spatial index, not among the canvas items. Nodes
+        aggregated into grid cells are not drawn, so they cannot be hit.
+        """
+        if self.mode == "cells" or not self.positions:
+            return None
+        if self.hit_index is None: # Built here, not for every positions update of a settling force layout
+            self.hit_index = SpatialGrid.for_hit_testing(self.positions)
+            self.hit_size = len(self.positions)
+        reach = (max(self.node_size(), POINT_RADIUS) + HIT_SLOP_PX) / self.scale
+        return self.hit_index.nearest((sx - self.offset_x) / self.scale, (sy - self.offset_y) / self.scale, reach)
+
+    def select(self, node):
+        """Marks node id `node` with a ring (None to clear it)."""
+        self.selected = node
+        self.draw_selection()
+
+    def draw_selection(self):
+        if self.selection_object is not None:
+            self.canvas.delete(self.selection_object)
+            self.selection_object = None
+        if self.selected is None or self.selected >= len(self.positions) or self.mode == "cells":
+            return
+        x, y = self.to_screen(self.selected)
+        size = max(self.node_size(), POINT_RADIUS) + SELECTION_GAP
+        self.selection_object = self.canvas.create_oval(x - size, y - size, x + size, y + size,
+                                                        fill="", outline=SELECTION_COLOR, width=2)
+
+    # --- View ---
+    def viewport_size(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width < 2 or height < 2: # Not mapped yet
+            return CANVAS_WIDTH, CANVAS_HEIGHT
+        return width, height
+
+    def to_screen(self, node):
+        x, y = self.positions[node]
+        return x * self.scale + self.offset_x, y * self.scale + self.offset_y
+
+    def fit(self):
+        """Shows the whole graph; graphs that fit the canvas are shown at zoom 1."""
+        if not self.positions:
+            return
+        width, height = self.viewport_size()
+        min_x = min(x for x, _ in self.positions) - LAYOUT_MARGIN
+        min_y = min(y for _, y in self.positions) - LAYOUT_MARGIN
+        max_x = max(x for x, _ in self.positions) + LAYOUT_MARGIN
+        max_y = max(y for _, y in self.positions) + LAYOUT_MARGIN
+        if min_x >= 0 and min_y >= 0 and max_x <= width and max_y <= height:
+            self.scale, self.offset_x, self.offset_y = 1.0, 0.0, 0.0
+        else:
+            self.scale = max(min(width / (max_x - min_x), height / (max_y - min_y)), MIN_ZOOM)
+            self.offset_x = (width - (max_x + min_x) * self.scale) / 2
+            self.offset_y = (height - (max_y + min_y) * self.scale) / 2
+        self.request_render()
+
+    def zoom(self, factor, sx, sy):
+        """Zooms by `factor`, keeping the point under screen position (sx, sy) fixed."""
+        scale = min(max(self.scale * factor, MIN_ZOOM), MAX_ZOOM)
+        wx, wy = (sx - self.offset_x) / self.scale, (sy - self.offset_y) / self.scale
+        self.scale = scale
+        self.offset_x, self.offset_y = sx - wx * scale, sy - wy * scale
+        self.request_render()
+
+    def pan(self, dx, dy):
+        """Scrolls the view by (dx, dy) pixels."""
+        self.offset_x += dx
+        self.offset_y += dy
+        self.canvas.move("all", dx, dy) # Immediate feedback; the next render re-culls
+        self.request_render()
+
+    # --- Rendering ---
+    def request_render(self):
+        """Schedules one render for when Tk is idle; repeated requests are coalesced."""
+        if self.render_after_id is None:
+            self.render_after_id = self.canvas.after_idle(self.render)
+
+    def request_flush(self):
+        """Schedules the next frame's flush of dirty items, no sooner than frame_ms after the last."""
+        if self.flush_after_id is None:
+            wait = self.last_flush + self.frame_ms / 1000 - time.perf_counter()
+            self.flush_after_id = self.canvas.after(max(int(wait * 1000), 1), self.flush)
+
+    def flush(self):
+        """Applies the model colors of all dirty items; returns how many were repainted."""
+        self.flush_after_id = None
+        start = time.perf_counter()
+        if start - self.last_flush < 1:
+            self.profiler.record("frame interval", start - self.last_flush)
+        self.last_flush = start
+        canvas, count = self.canvas, 0
+        for node in self.dirty_nodes:
+            item = self.node_objects.get(node)
+            if item is not None:
+                canvas.itemconfig(item, fill=self.node_colors[node])
+                count += 1
+        for key in self.dirty_cells:
+            item = self.cell_objects.get(key)
+            if item is not None:
+                canvas.itemconfig(item, fill=self.cell_colors.get(key, NODE_COLOR_DEFAULT))
+                count += 1
+        for key in self.dirty_edges:
+            u, v = key
+            line_id = self.edge_objects.get(key)
+            color = self.edge_colors.get(key)
+            if line_id is None:
+                if color is not None and (u in self.node_objects or v in self.node_objects):
+                    # The edge was bundled or culled; highlighted edges are always drawn on their own
+                    self.create_edge(key, *self.to_screen(u), *self.to_screen(v))
+                    count += 1
+            elif color is None: # Reset
+                canvas.itemconfig(line_id, fill=EDGE_COLOR_DEFAULT, width=EDGE_WIDTH)
+                count += 1
+            else:
+                canvas.itemconfig(line_id, fill=color, width=EDGE_WIDTH + 1) # Make highlighted edge thicker
+                count += 1
+        self.dirty_nodes.clear()
+        self.dirty_cells.clear()
+        self.dirty_edges.clear()
+        self.profiler.record("itemconfig", time.perf_counter() - start)
+        self.profiler.count("dirty items", count)
+        if self.on_frame:
+            self.on_frame()
+        self.profiler.record("frame", time.perf_counter() - start)
+        return count
+
+    def render(self):
+        """Recreates the canvas items for the current view."""
+        start = time.perf_counter()
+        self._render()
+        self.profiler.record("render", time.perf_counter() - start)
+
+    def _render(self):
+        self.render_after_id = None
+        # Items are recreated from the model colors, so nothing is left to flush
+        self.dirty_nodes.clear()
+        self.dirty_cells.clear()
+        self.dirty_edges.clear()
+        self.canvas.delete("all")
+        self.node_objects.clear()
+        self.text_objects.clear()
+        self.edge_objects.clear()
+        self.cell_objects.clear()
+        self.bundled_nodes.clear()
+        self.selection_object = None
+        if not self.positions:
+            return
+        self.sync_index()
+
+        width, height = self.viewport_size()
+        x0, y0, x1, y1 = self.visible_rect()
+        visible = None
+        if self.index.count(x0, y0, x1, y1) <= MAX_POINT_ITEMS:
+            visible = self.index.query(x0, y0, x1, y1)
+        if visible is None or len(visible) > MAX_POINT_ITEMS:
+            self.mode = "cells"
+            self.render_cells(x0, y0, x1, y1)
+            return
+
+        radius = NODE_RADIUS * self.scale
+        self.mode = "full" if radius >= LABEL_MIN_RADIUS and len(visible) <= MAX_LABEL_ITEMS else "points"
+        self.render_edges(visible, width, height)
+        size = self.node_size()
+        for node in visible:
+            self.create_node(node, size)
+        self.draw_selection()
+
+    def visible_rect(self):
+        """Visible world rectangle (x0, y0, x1, y1), padded so nodes on the border are kept."""
+        width, height = self.viewport_size()
+        return (-self.offset_x / self.scale - NODE_RADIUS, -self.offset_y / self.scale - NODE_RADIUS,
+                (width - self.offset_x) / self.scale + NODE_RADIUS, (height - self.offset_y) / self.scale + NODE_RADIUS)
+
+    def node_size(self):
+        """On-screen half size of a node item in the current mode."""
+        radius = NODE_RADIUS * self.scale
+        return radius if self.mode == "full" else min(max(radius, POINT_RADIUS), LABEL_MIN_RADIUS)
+
+    def create_node(self, node, size):
+        """Creates the item of a visible node: a labeled circle in "full" mode, else a dot."""
+        x, y = self.to_screen(node)
+        if self.mode == "full":
+            self.node_objects[node] = self.canvas.create_oval(
+                x - size, y - size, x + size, y + size,
+                fill=self.node_colors[node], outline="black", width=NODE_OUTLINE_WIDTH
+            )
+            self.text_objects[node] = self.canvas.create_text(x, y, text=self.graph.labels[node], fill=TEXT_COLOR,
+                                                              font=self.label_font)
+        else:
+            self.node_objects[node] = self.canvas.create_rectangle(
+                x - size, y - size, x + size, y + size, fill=self.node_colors[node], outline=""
+            )
+
+    def create_edge(self, key, x1, y1, x2, y2):
+        color = self.edge_colors.get(key)
+        line_id = self.canvas.create_line(
+            x1, y1, x2, y2,
+            width=EDGE_WIDTH if color is None else EDGE_WIDTH + 1, fill=color or EDGE_COLOR_DEFAULT
+        )
+        self.canvas.tag_lower(line_id) # Keep edges below the nodes
+        self.edge_objects[key] = line_id
+        return line_id
+
+    def render_edges(self, visible, width, height):
+        """Draws the edges of the visible nodes: short ones as lines, the rest bundled.
+
+        At most about MAX_EDGE_SCAN adjacency entries are scanned per frame:
+        the rows of high-degree nodes are sampled, each sampled edge standing
+        for `step` of them, and their highlighted edges are drawn from
+        node_edges instead.
+        """
+        in_view = set(visible)
+        offsets, targets = self.graph.offsets, self.graph.targets
+        to_screen = self.to_screen
+        bundles = {} # (cell, cell): [count, sum x1, sum y1, sum x2, sum y2]
+        bundled = set() # Edges between two visible nodes already bundled from their other end
+        long_edge = BUNDLE_MIN_LENGTH * BUNDLE_MIN_LENGTH
+        row_limit = max(MAX_EDGE_SCAN // len(visible), 1) if visible else 1
+        for u in visible:
+            ux, uy = to_screen(u)
+            start, end = offsets[u], offsets[u + 1]
+            step = 1
+            if end - start > row_limit:
+                step = -(-(end - start) // row_limit)
+                for key in self.node_edges.get(u, ()):
+                    if key not in self.edge_objects:
+                        self.create_edge(key, ux, uy, *to_screen(key[0] if key[1] == u else key[1]))
+            for v in targets[start:end:step]:
+                key = (u, v) if u < v else (v, u)
+                if key in self.edge_objects:
+                    continue
+                vx, vy = to_screen(v)
+                inside = v in in_view
+                if inside:
+                    if key in bundled:
+                        continue # Handled from v
+                    bundled.add(key)
+                if key in self.edge_colors or (inside and len(self.edge_objects) < MAX_EDGE_ITEMS
+                                               and (vx - ux) ** 2 + (vy - uy) ** 2 < long_edge):
+                    self.create_edge(key, ux, uy, vx, vy)
+                    continue
+                self.bundled_nodes.add(u)
+                if inside:
+                    self.bundled_nodes.add(v)
+                # Far endpoints are clamped to a frame around the view, so they group by exit point
+                cx = min(max(vx, -BUNDLE_CELL_PX), width + BUNDLE_CELL_PX)
+                cy = min(max(vy, -BUNDLE_CELL_PX), height + BUNDLE_CELL_PX)
+                a = (int(ux // BUNDLE_CELL_PX), int(uy // BUNDLE_CELL_PX))
+                b = (int(cx // BUNDLE_CELL_PX), int(cy // BUNDLE_CELL_PX))
+                if a > b:
+                    a, b, ux2, uy2, cx, cy = b, a, cx, cy, ux, uy
+                else:
+                    ux2, uy2 = ux, uy
+                bundle = bundles.get((a, b))
+                if bundle is None:
+                    bundles[(a, b)] = [step, ux2 * step, uy2 * step, cx * step, cy * step]
+                else:
+                    bundle[0] += step
+                    bundle[1] += ux2 * step
+                    bundle[2] += uy2 * step
+                    bundle[3] += cx * step
+                    bundle[4] += cy * step
+        self.draw_bundles(bundles.values())
+
+    def draw_bundles(self, bundles):
+        """Draws aggregated edges, thicker the more edges they stand for."""
+        for count, sx1, sy1, sx2, sy2 in bundles:
+            line_id = self.canvas.create_line(
+                sx1 / count, sy1 / count, sx2 / count, sy2 / count,
+                width=min(1 + math.log2(count), BUNDLE_MAX_WIDTH), fill=BUNDLE_COLOR
+            )
+            self.canvas.tag_lower(line_id)
+
+    def render_cells(self, x0, y0, x1, y1):
+        """Draws one dot per occupied grid cell, sized by how many nodes it holds."""
+        scale, off_x, off_y = self.scale, self.offset_x, self.offset_y
+        centroids = self.index.centroids
+        shown = set()
+        for key, members in self.index.cells_in(x0, y0, x1, y1):
+            shown.add(key)
+            x, y = centroids[key]
+            x, y = x * scale + off_x, y * scale + off_y
+            size = min(POINT_RADIUS + math.log2(len(members)), LABEL_MIN_RADIUS)
+            self.cell_objects[key] = self.canvas.create_rectangle(
+                x - size, y - size, x + size, y + size,
+                fill=self.cell_colors.get(key, NODE_COLOR_DEFAULT), outline=""
+            )
+        bundles = []
+        for (a, b), count in self.sampled_cell_edges().items():
+            if a in shown or b in shown:
+                ax, ay = centroids[a]
+                bx, by = centroids[b]
+                bundles.append((count, ax * scale + off_x, ay * scale + off_y,
+                                bx * scale + off_x, by * scale + off_y))
+        bundles.sort(reverse=True)
+        self.draw_bundles([(1, ax, ay, bx, by) if count == 1 else
+                           (count, ax * count, ay * count, bx * count, by * count)
+                           for count, ax, ay, bx, by in bundles[:MAX_EDGE_ITEMS]])
+
+    def sampled_cell_edges(self):
+        """Counts edges between grid cells, scanning at most MAX_EDGE_SCAN adjacency entries."""
+        if self.cell_edges is None:
+            offsets, targets = self.graph.offsets, self.graph.targets
+            positions, cell_of = self.positions, self.index.cell_of
+            stride = max(1, len(targets) // MAX_EDGE_SCAN)
+            counts = {}
+            u = 0
+            for i in range(0, len(targets), stride):
+                while offsets[u + 1] <= i:
+                    u += 1
+                a = cell_of(*positions[u])
+                b = cell_of(*positions[targets[i]])
+                if a != b:
+                    key = (a, b) if a < b else (b, a)
+                    counts[key] = counts.get(key, 0) + stride
+            self.cell_edges = counts
+        return self.cell_edges
+
+
+# --- Node Picker ---
+class NodePicker:
+    """Editable combobox that finds node labels by the prefix typed into it.
+
+    Its drop-down only ever holds the first PICKER_MAX_MATCHES labels that
+    start with the text (found in a graphdata.LabelIndex), never the whole
+    label list, so it stays quick with any number of nodes. `variable` is
+    only set to complete choices: picking from the drop-down, or pressing
+    Enter on a label or on text with a single match. Leaving the box puts
+    the current choice back.
+    """
+    def __init__(self, master, variable, labels, extra=(), on_pick=None, width=10):
+        self.variable = variable
+        self.labels = labels # LabelIndex of the graph
+        self.extra = extra   # Choices offered before the labels, e.g. GOAL_NONE
+        self.on_pick = on_pick # Called with the label picked
+        self.text = tk.StringVar(value=variable.get())
+        self.combo = ttk.Combobox(master, textvariable=self.text, width=width, postcommand=self.update_matches)
+        self.combo.bind("<KeyRelease>", self.on_key)
+        self.combo.bind("<Return>", self.commit)
+        self.combo.bind("<<ComboboxSelected>>", self.commit)
+        self.combo.bind("<FocusOut>", lambda event: self.text.set(self.variable.get()))
+
+    def grid(self, **options):
+        self.combo.grid(**options)
+
+    def set(self, label):
+        self.variable.set(label)
+        self.text.set(label)
+
+    def matches(self):
+        text = self.text.get()
+        extra = [choice for choice in self.extra if choice.casefold().startswith(text.casefold())]
+        return extra + self.labels.prefix(text, PICKER_MAX_MATCHES - len(extra))
+
+    def update_matches(self):
+        self.combo.config(values=self.matches())
+
+    def on_key(self, event):
+        if event.keysym not in ("Return", "Escape", "Up", "Down", "Tab"):
+            self.update_matches()
+
+    def commit(self, event=None):
+        """Picks the typed label, or the only label it is a prefix of."""
+        text, matches = self.text.get(), self.matches()
+        if text in matches:
+            label = text
+        elif len(matches) == 1:
+            label = matches[0]
+        else:
+            return # Not a label, and ambiguous
+        self.set(label)
+        if self.on_pick:
+            self.on_pick(label)
+
 
 # --- Main Application Class ---
 class GraphVisualizerApp:
     def __init__(self, master):
         self.master = master
-        self.master.title("Graph Traversal Visualizer (DFS/BFS)")
+        self.master.title("Graph Traversal Visualizer")
         self.master.geometry("1000x650") # Adjusted window size
 
         # --- Styling ---
@@ -93,14 +859,46 @@ class GraphVisualizerApp:
         style.configure("TCombobox", padding=5, font=('Helvetica', 10))
 
         # --- Data Structures ---
-        self.node_objects = {}  # Stores canvas oval IDs for nodes
-        self.text_objects = {}  # Stores canvas text IDs for node labels
-        self.edge_objects = {}  # Stores canvas line IDs for edges ((u, v): line_id)
+        # Nodes are integer ids into self.graph.labels; labels are only used for display
+        self.graph = Graph.from_adjacency(graph)
+        self.positions = [node_positions[label] for label in self.graph.labels] # World (x, y) per node id
 
         # --- Control Variables ---
         self.selected_algorithm = tk.StringVar(value="DFS")
-        self.start_node = tk.StringVar(value=list(graph.keys())[0]) # Default start node
-        self.is_running = False # Flag to prevent concurrent runs
+        self.start_node = tk.StringVar(value=self.graph.labels[0]) # Default start node
+        self.goal_node = tk.StringVar(value=GOAL_NONE) # Used by the shortest-path searches
+        self.heuristic = tk.StringVar(value="Euclidean") # Used by A*
+        self.is_running = False # True from Run until the playback ends; a new Run supersedes it
+        self.speed = tk.DoubleVar(value=0.0) # log2 of the playback speed multiplier
+        self.max_fps = tk.StringVar(value=str(DEFAULT_MAX_FPS))
+        self.pending_code_line = None # Code line to highlight at the next frame
+        self.playback_mode = tk.StringVar(value=PLAYBACK_MODES[0])
+        self.trace = None     # StepTrace of the last run, kept for seeking
+        self.trace_step = 0   # Number of its steps currently shown
+        self.timeline = None  # traversal.Timeline of self.trace, for seeking
+        self.timeline_step = tk.DoubleVar(value=0)
+        self.sample_frames = tk.IntVar(value=DEFAULT_SAMPLE_FRAMES)
+        self.layout_name = tk.StringVar(value="Fixed") # "Fixed" uses the hand-placed node_positions
+        self.worker = worker.Worker() # Computes traversals and layouts off the Tk thread
+        self.layout_root = 0 # Top node of the Layered layout
+        self.levels = None   # traversal.BfsLevels from layout_root, kept while editing a Layered layout
+        self.layer_top = 0.0 # World y of the first row of the Layered layout, and the distance between rows
+        self.layer_gap = float(NODE_SPACING)
+        self.edit_from = tk.StringVar() # Node labels for the Edit controls
+        self.edit_to = tk.StringVar()
+        self.label_index = LabelIndex(self.graph.labels) # For the node pickers
+        self.visit_ranks = None # Position of each node in the visit order of self.trace, built on first hover
+        self.hovered = None     # Node id under the mouse pointer
+        self.press_origin = None # Where the left button went down, to tell a click from a drag
+        self.poll_after_id = None
+        self.enable_after_id = None
+        self.run_started = 0.0 # When the traversal of the current run was submitted
+        self.profiler = profiling.Profiler() # Enabled with the Profile checkbox
+        self.profile_enabled = tk.BooleanVar(value=False)
+        self.profile_after_id = None
+        self.frontier_size = 0 # Nodes currently colored visiting (the stack/queue as shown)
+        self.scheduler = StepScheduler(master, on_finish=self.on_visualization_done,
+                                       on_error=self.on_visualization_error, profiler=self.profiler)
 
         # --- GUI Layout ---
         # Main frame
@@ -119,21 +917,95 @@ class GraphVisualizerApp:
         # --- Controls ---
         controls_frame = ttk.LabelFrame(left_frame, text="Controls", padding="10")
         controls_frame.pack(pady=10, padx=5, fill=tk.X)
+        self.controls_frame = controls_frame
 
         ttk.Label(controls_frame, text="Algorithm:").grid(row=0, column=0, sticky=tk.W, pady=2)
-        algo_combo = ttk.Combobox(controls_frame, textvariable=self.selected_algorithm, values=["DFS", "BFS"], state="readonly", width=10)
+        algo_combo = ttk.Combobox(controls_frame, textvariable=self.selected_algorithm, values=list(traversal.ALGORITHMS), state="readonly", width=10)
         algo_combo.grid(row=0, column=1, sticky=tk.EW, pady=2, padx=5)
         algo_combo.bind("<<ComboboxSelected>>", self.update_code_display)
 
+        # Type the start of a label to list matching nodes, or click a node (Shift+click for the goal)
         ttk.Label(controls_frame, text="Start Node:").grid(row=1, column=0, sticky=tk.W, pady=2)
-        node_combo = ttk.Combobox(controls_frame, textvariable=self.start_node, values=list(graph.keys()), state="readonly", width=10)
-        node_combo.grid(row=1, column=1, sticky=tk.EW, pady=2, padx=5)
+        self.start_picker = NodePicker(controls_frame, self.start_node, self.label_index, on_pick=self.set_start_node)
+        self.start_picker.grid(row=1, column=1, sticky=tk.EW, pady=2, padx=5)
+
+        ttk.Label(controls_frame, text="Goal Node:").grid(row=2, column=0, sticky=tk.W, pady=2)
+        self.goal_picker = NodePicker(controls_frame, self.goal_node, self.label_index, extra=(GOAL_NONE,))
+        self.goal_picker.grid(row=2, column=1, sticky=tk.EW, pady=2, padx=5)
+
+        ttk.Label(controls_frame, text="Heuristic:").grid(row=3, column=0, sticky=tk.W, pady=2)
+        heuristic_combo = ttk.Combobox(controls_frame, textvariable=self.heuristic, values=list(HEURISTICS),
+                                       state="readonly", width=10)
+        heuristic_combo.grid(row=3, column=1, sticky=tk.EW, pady=2, padx=5) # A* only
 
         self.run_button = ttk.Button(controls_frame, text="Run", command=self.run_visualization)
-        self.run_button.grid(row=2, column=0, pady=10, padx=5, sticky=tk.EW)
+        self.run_button.grid(row=4, column=0, pady=10, padx=5, sticky=tk.EW)
 
         self.reset_button = ttk.Button(controls_frame, text="Reset", command=self.reset_visualization)
-        self.reset_button.grid(row=2, column=1, pady=10, padx=5, sticky=tk.EW)
+        self.reset_button.grid(row=4, column=1, pady=10, padx=5, sticky=tk.EW)
+
+        ttk.Label(controls_frame, text="Playback:").grid(row=5, column=0, sticky=tk.W, pady=(0, 10))
+        playback_combo = ttk.Combobox(controls_frame, textvariable=self.playback_mode, values=PLAYBACK_MODES,
+                                      state="readonly", width=10)
+        playback_combo.grid(row=5, column=1, sticky=tk.EW, pady=(0, 10), padx=5)
+        frames_spin = ttk.Spinbox(controls_frame, from_=2, to=1000, textvariable=self.sample_frames, width=5)
+        frames_spin.grid(row=5, column=2, sticky=tk.W, pady=(0, 10)) # Number of frames in Sampled mode
+
+        self.pause_button = ttk.Button(controls_frame, text="Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.grid(row=6, column=0, pady=(0, 10), padx=5, sticky=tk.EW)
+
+        self.cancel_button = ttk.Button(controls_frame, text="Cancel", command=self.cancel_visualization, state=tk.DISABLED)
+        self.cancel_button.grid(row=6, column=1, pady=(0, 10), padx=5, sticky=tk.EW)
+
+        ttk.Label(controls_frame, text="Speed:").grid(row=7, column=0, sticky=tk.W, pady=2)
+        speed_scale = ttk.Scale(controls_frame, from_=math.log2(SPEED_MIN), to=math.log2(SPEED_MAX),
+                                variable=self.speed, command=self.update_speed)
+        speed_scale.grid(row=7, column=1, sticky=tk.EW, pady=2, padx=5)
+        self.speed_label = ttk.Label(controls_frame, text="1x", width=6)
+        self.speed_label.grid(row=7, column=2, sticky=tk.W, pady=2)
+
+        ttk.Label(controls_frame, text="Max FPS:").grid(row=8, column=0, sticky=tk.W, pady=2)
+        fps_combo = ttk.Combobox(controls_frame, textvariable=self.max_fps, values=MAX_FPS_CHOICES,
+                                 state="readonly", width=10)
+        fps_combo.grid(row=8, column=1, sticky=tk.EW, pady=2, padx=5)
+        fps_combo.bind("<<ComboboxSelected>>", self.update_max_fps)
+
+        self.open_button = ttk.Button(controls_frame, text="Open Graph...", command=self.open_graph_file)
+        ttk.Label(controls_frame, text="Layout:").grid(row=9, column=0, sticky=tk.W, pady=2)
+        self.layout_combo = ttk.Combobox(controls_frame, textvariable=self.layout_name,
+                                         values=["Fixed", *layout.LAYOUTS], state="readonly", width=10)
+        self.layout_combo.grid(row=9, column=1, sticky=tk.EW, pady=2, padx=5)
+        self.layout_combo.bind("<<ComboboxSelected>>", self.apply_layout)
+
+        self.open_button.grid(row=10, column=0, pady=(10, 0), padx=5, sticky=tk.EW)
+
+        fit_button = ttk.Button(controls_frame, text="Fit View", command=self.fit_view)
+        fit_button.grid(row=10, column=1, pady=(10, 0), padx=5, sticky=tk.EW)
+
+        profile_check = ttk.Checkbutton(controls_frame, text="Profile", variable=self.profile_enabled,
+                                        command=self.toggle_profiler)
+        profile_check.grid(row=11, column=0, pady=(5, 0), padx=5, sticky=tk.W)
+        export_button = ttk.Button(controls_frame, text="Export Profile...", command=self.export_profile)
+        export_button.grid(row=11, column=1, pady=(5, 0), padx=5, sticky=tk.EW)
+
+        # Add/Remove act on the edge From-To, or on the node From if To is empty
+        ttk.Label(controls_frame, text="Edit:").grid(row=12, column=0, sticky=tk.W, pady=(5, 2))
+        from_entry = ttk.Entry(controls_frame, textvariable=self.edit_from, width=10)
+        from_entry.grid(row=12, column=1, sticky=tk.EW, pady=(5, 2), padx=5)
+        to_entry = ttk.Entry(controls_frame, textvariable=self.edit_to, width=6)
+        to_entry.grid(row=12, column=2, sticky=tk.EW, pady=(5, 2))
+        add_button = ttk.Button(controls_frame, text="Add", command=self.add_edit)
+        add_button.grid(row=13, column=0, padx=5, sticky=tk.EW)
+        remove_button = ttk.Button(controls_frame, text="Remove", command=self.remove_edit)
+        remove_button.grid(row=13, column=1, padx=5, sticky=tk.EW)
+
+        self.status_label = ttk.Label(controls_frame, text="Built-in graph")
+        self.status_label.grid(row=14, column=0, columnspan=3, sticky=tk.W, pady=2)
+
+        # --- Profiler Panel (shown while profiling) ---
+        self.profile_frame = ttk.LabelFrame(left_frame, text="Profiler", padding="5")
+        self.profile_label = ttk.Label(self.profile_frame, text="", font=("Courier New", 9), justify=tk.LEFT)
+        self.profile_label.pack(fill=tk.X)
 
         # --- Code Display ---
         code_frame = ttk.LabelFrame(left_frame, text="Pseudo Code", padding="10")
@@ -145,67 +1017,365 @@ class GraphVisualizerApp:
         self.code_text.tag_configure("highlight", background=HIGHLIGHT_COLOR)
         self.code_text.config(state=tk.DISABLED) # Read-only
 
+        # --- Timeline ---
+        # Packed before the canvas so that it keeps its space when the window shrinks
+        self.info_label = ttk.Label(right_frame, text="") # Details of the node under the pointer
+        self.info_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+        timeline_frame = ttk.Frame(right_frame)
+        timeline_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+        self.timeline_scale = ttk.Scale(timeline_frame, from_=0, to=0, variable=self.timeline_step,
+                                        command=self.on_timeline_seek)
+        self.timeline_scale.pack(side=tk.LEFT, expand=True, fill=tk.X)
+        self.timeline_label = ttk.Label(timeline_frame, text="No run", width=24)
+        self.timeline_label.pack(side=tk.RIGHT)
+
         # --- Canvas ---
         self.canvas = tk.Canvas(right_frame, bg="white", width=CANVAS_WIDTH, height=CANVAS_HEIGHT,
                                 relief=tk.SUNKEN, borderwidth=1)
         self.canvas.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+        self.renderer = GraphRenderer(self.canvas, font.Font(weight='bold'), on_frame=self.on_frame,
+                                      profiler=self.profiler)
+
+        # Zoom with the mouse wheel, pan by dragging
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", self.on_mouse_wheel) # X11 wheel up
+        self.canvas.bind("<Button-5>", self.on_mouse_wheel) # X11 wheel down
+        self.canvas.bind("<ButtonPress-1>", self.on_drag_start)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        self.canvas.bind("<Motion>", self.on_hover)
+        self.canvas.bind("<Leave>", lambda event: self.show_node_info(None))
+        self.canvas.bind("<Configure>", lambda event: self.renderer.request_render())
+        self.drag_origin = None
 
         # --- Initial Setup ---
         self.draw_graph()
+        self.set_start_node(self.start_node.get())
         self.update_code_display() # Load initial code
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        """Stops the background worker and closes the window."""
+        self.worker.close()
+        self.master.destroy()
+
+    # --- Graph Loading ---
+    def open_graph_file(self):
+        """Asks for a graph file and loads it in place of the current graph, stopping a run in progress."""
+        if self.is_running:
+            if not messagebox.askyesno("Open Graph", "A traversal is running. Stop it and open another graph?"):
+                return
+            self.cancel_visualization()
+        path = filedialog.askopenfilename(
+            title="Open Graph",
+            filetypes=[("Graph files", "*.csv *.txt *.tsv *.edges *.el *.json *.graphml *.xml"),
+                       ("All files", "*.*")])
+        if not path:
+            return
+        name = os.path.basename(path)
+        try:
+            loaded = loaders.load_graph(path, progress=lambda done, total: self.show_load_progress(name, done, total))
+        except (OSError, ValueError, SyntaxError) as e: # ElementTree parse errors are SyntaxErrors
+            messagebox.showerror("Open Graph", f"Could not load {name}:\n{e}")
+            self.status_label.config(text="Load failed")
+            return
+        if len(loaded) == 0:
+            messagebox.showerror("Open Graph", f"{name} contains no nodes.")
+            return
+        self.set_graph(loaded)
+        self.status_label.config(text=f"{name}: {len(loaded)} nodes, {loaded.num_edges} adjacency entries")
+
+    def show_load_progress(self, name, done, total):
+        """Progress callback for loaders: shows the percentage read so far."""
+        percent = 100 * done // total if total else 100
+        self.status_label.config(text=f"Loading {name}... {percent}%")
+        self.master.update_idletasks() # Repaint the label only; no events are processed
+
+    def set_graph(self, new_graph):
+        """Replaces the displayed graph and lays it out with a force-directed layout."""
+        self.graph = new_graph
+        self.set_trace(None)
+        self.label_index = self.start_picker.labels = self.goal_picker.labels = LabelIndex(new_graph.labels)
+        self.set_start_node(self.graph.labels[0])
+        self.goal_picker.set(GOAL_NONE)
+        # Loaded graphs have no hand-placed positions
+        self.layout_combo.config(values=list(layout.LAYOUTS))
+        self.layout_name.set("Force")
+        self.positions = [] # The new graph is drawn when the worker sends its first positions
+        self.apply_layout()
+
+    # --- Layout ---
+    def apply_layout(self, event=None):
+        """Lays the graph out with the selected layout; all but Fixed are computed by the worker."""
+        name = self.layout_name.get()
+        self.levels = None
+        if name == "Fixed":
+            self.worker.cancel("layout")
+            # Nodes added by editing have no hand-placed position; they stay where they are
+            self.positions = [node_positions[label] if label in node_positions else self.positions[node]
+                              for node, label in enumerate(self.graph.labels)]
+            self.draw_graph()
+            return
+        self.layout_root = self.graph.index.get(self.start_node.get(), 0) # Layered only
+        self.worker.compute_layout(name, self.graph, *self.world_size(), LAYOUT_MARGIN, root=self.layout_root)
+        self.watch_worker()
+
+    def world_size(self):
+        """Size of the area to lay the graph out in; large graphs get room to spread out."""
+        return theme.world_size(len(self.graph))
+
+    def on_layout(self, positions):
+        """Shows positions sent by the worker; the force layout sends several as it settles."""
+        if self.renderer.graph is not self.graph: # First positions of a newly loaded graph
+            self.positions = positions
+            self.draw_graph()
+            self.fit_view()
+        else:
+            self.move_nodes(positions) # Keeps the colors, also those of a run in progress
+
+    def move_nodes(self, positions):
+        """Moves the nodes to new positions, keeping their colors."""
+        self.positions = positions
+        self.renderer.set_positions(positions)
+
+    # --- Editing ---
+    def add_edit(self):
+        """Add button: adds the edge From-To, or the node From if To is empty."""
+        a, b = self.edit_from.get().strip(), self.edit_to.get().strip()
+        if a:
+            self.apply_edits([("add_edge", a, b)] if b else [("add_node", a)])
+
+    def remove_edit(self):
+        """Remove button: removes the edge From-To, or the node From if To is empty."""
+        a, b = self.edit_from.get().strip(), self.edit_to.get().strip()
+        if a:
+            self.apply_edits([("remove_edge", a, b)] if b else [("remove_node", a)])
+
+    def apply_edits(self, edits):
+        """Applies a batch of edits to the graph in place and returns how many were applied.
+
+        Each edit is ("add_node", label), ("add_edge", a, b) or ("add_edge",
+        a, b, weight), ("remove_edge", a, b) or ("remove_node", label), by
+        node label; edges are undirected. add_edge creates missing nodes,
+        and edits of missing nodes or edges are skipped. Only the canvas
+        items of the edited nodes and edges change and new nodes are placed
+        next to their neighbors; in the Layered layout, the nodes whose BFS
+        depth changed move to their new row. The run shown is dropped, as
+        its trace no longer matches the graph.
+        """
+        if len(self.positions) != len(self.graph):
+            return 0 # Not laid out yet
+        self.stop_run()
+        self.pause_button.config(state=tk.DISABLED, text="Pause")
+        self.cancel_button.config(state=tk.DISABLED)
+        self.enable_controls()
+        self.set_trace(None)
+        self.reset_visualization()
+        # A layout being computed (on the graph as it was) is restarted once the edits are done
+        relayout = self.worker.cancel("layout")
+        levels = self.layered_levels()
+        graph, index, applied = self.graph, self.graph.index, 0
+        for op, *args in edits:
+            changed = ()
+            if op == "add_node":
+                if args[0] not in index:
+                    self.edit_add_node(args[0], ())
+                    applied += 1
+            elif op == "add_edge":
+                a, b, weight = args[0], args[1], args[2] if len(args) > 2 else None
+                if a not in index:
+                    self.edit_add_node(a, [index[b]] if b in index else ())
+                if b not in index:
+                    self.edit_add_node(b, [index[a]])
+                u, v = index[a], index[b]
+                entries = graph.add_edge(u, v, weight)
+                if entries:
+                    self.renderer.add_edge(u, v)
+                    changed = levels.edges_added(entries) if levels else set()
+                    applied += 1
+            elif op == "remove_edge":
+                if args[0] in index and args[1] in index:
+                    changed = self.edit_remove_edge(index[args[0]], index[args[1]])
+                    applied += 1 if changed is not None else 0
+            elif op == "remove_node":
+                if args[0] in index and len(graph) > 1: # Keep at least one node to start from
+                    self.edit_remove_node(index[args[0]])
+                    applied += 1
+            else:
+                raise ValueError(f"unknown edit {op!r}")
+            if changed:
+                self.move_to_layers(changed)
+
+        self.set_start_node(self.start_node.get() if self.start_node.get() in index else graph.labels[0])
+        if self.goal_node.get() not in index:
+            self.goal_picker.set(GOAL_NONE)
+        self.status_label.config(text=f"Edited: {len(graph)} nodes, {graph.num_edges} adjacency entries")
+        if relayout:
+            self.apply_layout()
+        return applied
+
+    def edit_add_node(self, label, near):
+        """Adds a node next to the node ids in `near`, or in the middle of the view if there are none."""
+        node = self.graph.add_node(label)
+        self.label_index.add(label)
+        if near:
+            x = sum(self.positions[other][0] for other in near) / len(near)
+            y = sum(self.positions[other][1] for other in near) / len(near)
+        else:
+            x0, y0, x1, y1 = self.renderer.visible_rect()
+            x, y = (x0 + x1) / 2, (y0 + y1) / 2
+        angle = node * NEW_NODE_ANGLE
+        self.renderer.add_node(x + NODE_SPACING * math.cos(angle), y + NODE_SPACING * math.sin(angle))
+        if self.levels:
+            self.levels.node_added()
+
+    def edit_remove_edge(self, u, v, directed=False):
+        """Removes an edge; returns the nodes whose depth changed, or None if there was no such edge."""
+        entries = self.graph.remove_edge(u, v, directed=directed)
+        if not entries:
+            return None
+        self.renderer.remove_edge(u, v)
+        return self.levels.edges_removed(entries) if self.levels else set()
+
+    def edit_remove_node(self, node):
+        """Removes a node and its edges; the last node takes over its id."""
+        changed = set()
+        for v in list(self.graph.neighbors(node)):
+            changed |= self.edit_remove_edge(node, v, directed=True)
+        for u in set(self.graph.reverse().neighbors(node)): # The other direction, and in-edges of directed graphs
+            changed |= self.edit_remove_edge(u, node, directed=True)
+        self.label_index.remove(self.graph.labels[node])
+        moved = self.graph.remove_node(node)
+        self.renderer.remove_node(node, moved)
+        if self.levels:
+            self.levels.node_removed(node, moved)
+            self.layout_root = self.levels.root
+        changed.discard(node)
+        if moved in changed:
+            changed.discard(moved)
+            changed.add(node)
+        self.move_to_layers(changed)
+
+    def layered_levels(self):
+        """BFS depths behind the Layered layout, built on the first edit after it was computed."""
+        if self.layout_name.get() != "Layered" or not 0 <= self.layout_root < len(self.graph):
+            return None
+        if self.levels is None:
+            self.levels = traversal.BfsLevels(self.graph, self.layout_root)
+            self.layer_top = self.positions[self.layout_root][1]
+            row = next((node for node, depth in enumerate(self.levels.depth) if depth == 1), None)
+            if row is not None:
+                self.layer_gap = self.positions[row][1] - self.layer_top
+        return self.levels
+
+    def move_to_layers(self, nodes):
+        """Moves nodes whose BFS depth changed to the row of their new depth (unreachable ones stay)."""
+        depth = self.levels.depth if self.levels else ()
+        moves = {node: (self.positions[node][0], self.layer_top + depth[node] * self.layer_gap)
+                 for node in nodes if node < len(depth) and depth[node] != NONE}
+        if moves:
+            self.renderer.move_nodes(moves)
 
     # --- Drawing Functions ---
     def draw_graph(self):
-        """Draws the initial graph on the canvas."""
-        self.canvas.delete("all") # Clear previous drawings
-        self.node_objects.clear()
-        self.text_objects.clear()
-        self.edge_objects.clear()
-
-        # Draw edges first (so nodes are on top)
-        for u, neighbors in graph.items():
-            for v in neighbors:
-                # Avoid drawing duplicate edges (e.g., A->B and B->A)
-                # Only draw if u < v alphabetically to draw each edge once
-                if u < v:
-                    x1, y1 = node_positions[u]
-                    x2, y2 = node_positions[v]
-                    line_id = self.canvas.create_line(
-                        x1, y1, x2, y2,
-                        width=EDGE_WIDTH, fill="gray"
-                    )
-                    self.edge_objects[(u, v)] = line_id
-                    self.edge_objects[(v, u)] = line_id # Store both directions for lookup
-
-        # Draw nodes
-        for node, (x, y) in node_positions.items():
-            # Create node circle
-            oval_id = self.canvas.create_oval(
-                x - NODE_RADIUS, y - NODE_RADIUS,
-                x + NODE_RADIUS, y + NODE_RADIUS,
-                fill=NODE_COLOR_DEFAULT, outline="black", width=NODE_OUTLINE_WIDTH
-            )
-            # Create node label
-            text_id = self.canvas.create_text(x, y, text=node, fill=TEXT_COLOR, font=font.Font(weight='bold'))
-            self.node_objects[node] = oval_id
-            self.text_objects[node] = text_id
+        """Draws the current graph on the canvas with default colors."""
+        self.renderer.set_graph(self.graph, self.positions)
+        self.renderer.select(self.graph.index.get(self.start_node.get()))
+        self.frontier_size = 0
+        self.trace_step = 0
+        self.update_timeline()
 
     def update_node_color(self, node, color):
         """Updates the fill color of a specific node."""
-        if node in self.node_objects:
-            self.canvas.itemconfig(self.node_objects[node], fill=color)
-            self.master.update() # Force GUI update
+        old = self.renderer.node_colors[node]
+        if old != color: # Keep count of the frontier for the profiler
+            if color == NODE_COLOR_VISITING:
+                self.frontier_size += 1
+            elif old == NODE_COLOR_VISITING:
+                self.frontier_size -= 1
+        self.renderer.set_node_color(node, color)
 
     def update_edge_color(self, u, v, color):
         """Updates the color of a specific edge."""
-        edge = tuple(sorted((u, v))) # Ensure consistent key format
-        if edge in self.edge_objects:
-             self.canvas.itemconfig(self.edge_objects[edge], fill=color, width=EDGE_WIDTH + 1) # Make highlighted edge thicker
-             self.master.update()
-        elif (u, v) in self.edge_objects: # Check original direction if sorted failed (shouldn't happen with current setup)
-             self.canvas.itemconfig(self.edge_objects[(u, v)], fill=color, width=EDGE_WIDTH + 1)
-             self.master.update()
+        self.renderer.set_edge_color(u, v, color)
+
+    # --- Zoom and Pan ---
+    def fit_view(self):
+        """Zooms out (or back to 100%) so the whole graph is visible."""
+        self.renderer.fit()
 
+    def on_mouse_wheel(self, event):
+        """Zooms in or out around the mouse pointer."""
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.renderer.zoom(ZOOM_STEP, event.x, event.y)
+        else:
+            self.renderer.zoom(1 / ZOOM_STEP, event.x, event.y)
+
+    def on_drag_start(self, event):
+        self.press_origin = (event.x, event.y)
+        self.drag_origin = None # Set once the pointer has moved far enough to be a drag
+
+    def on_drag(self, event):
+        """Pans the view along with the mouse."""
+        if self.drag_origin is None:
+            if self.press_origin is None or math.dist(self.press_origin, (event.x, event.y)) <= CLICK_MAX_MOVE:
+                return # Still a click
+            self.drag_origin = self.press_origin
+        x0, y0 = self.drag_origin
+        self.drag_origin = (event.x, event.y)
+        self.renderer.pan(event.x - x0, event.y - y0)
+
+    def on_release(self, event):
+        """A click (a press without a drag) on a node picks it as the start node, or with Shift as the goal."""
+        clicked = self.drag_origin is None and self.press_origin is not None
+        self.press_origin = self.drag_origin = None
+        node = self.node_under(event) if clicked else None
+        if node is None:
+            return
+        if event.state & 0x0001: # Shift
+            self.goal_picker.set(self.graph.labels[node])
+        else:
+            self.set_start_node(self.graph.labels[node])
+
+    # --- Selection ---
+    def set_start_node(self, label):
+        """Makes `label` the start node and rings it on the canvas."""
+        self.start_picker.set(label)
+        if self.renderer.graph is self.graph: # Otherwise draw_graph() rings it once the layout arrives
+            self.renderer.select(self.graph.index.get(label))
+
+    def node_under(self, event):
+        """Returns the node under the pointer, or None while a new graph waits for its layout.
+
+        Until then the renderer and its spatial index still hold the previous
+        graph, whose node ids mean nothing in the new one.
+        """
+        if self.renderer.graph is not self.graph:
+            return None
+        return self.renderer.node_at(event.x, event.y)
+
+    def on_hover(self, event):
+        """Shows the details of the node under the pointer, found through the spatial index."""
+        node = self.node_under(event)
+        if node != self.hovered:
+            self.show_node_info(node)
+
+    def show_node_info(self, node):
+        self.hovered = node
+        self.canvas.config(cursor="" if node is None else "hand2")
+        if node is None:
+            self.info_label.config(text="")
+            return
+        text = f"{self.graph.labels[node]}: degree {self.graph.degree(node)}"
+        if self.trace is not None:
+            if self.visit_ranks is None:
+                self.visit_ranks = array('l', [NONE]) * len(self.graph)
+                for rank, visited in enumerate(self.trace.order):
+                    self.visit_ranks[visited] = rank
+            rank = self.visit_ranks[node]
+            text += (f", visited {rank + 1} of {len(self.trace.order)}" if rank != NONE
+                     else f", not visited by {self.trace.algorithm}")
+        self.info_label.config(text=text)
 
     # --- Code Highlighting ---
     def update_code_display(self, event=None):
@@ -213,15 +1383,24 @@ class GraphVisualizerApp:
         self.code_text.config(state=tk.NORMAL) # Enable editing
         self.code_text.delete('1.0', tk.END)   # Clear existing text
         algo = self.selected_algorithm.get()
-        code_lines = DFS_CODE if algo == "DFS" else BFS_CODE
+        code_lines = PSEUDO_CODE[algo]
         for i, line in enumerate(code_lines):
              # Indentation matters for line numbers in Text widget
             self.code_text.insert(tk.END, f"{line}\n")
         self.code_text.config(state=tk.DISABLED) # Disable editing
         self.current_highlighted_line = None
+        self.pending_code_line = None
 
     def highlight_code_line(self, line_index):
-        """Highlights a specific line index (0-based) in the code display."""
+        """Highlights a specific line index (0-based) in the code display at the next frame."""
+        self.pending_code_line = line_index
+        self.renderer.request_flush()
+
+    def apply_code_highlight(self):
+        """Moves the code highlight to the pending line; called once per rendered frame."""
+        line_index = self.pending_code_line
+        if line_index == self.current_highlighted_line:
+            return
         if self.current_highlighted_line is not None:
             # Line numbers in Text widget are 1-based
             start = f"{self.current_highlighted_line + 1}.0"
@@ -237,218 +1416,324 @@ class GraphVisualizerApp:
         else:
             self.current_highlighted_line = None
 
-        self.master.update() # Force GUI update
-
     # --- Visualization Logic ---
     def run_visualization(self):
-        """Starts the selected graph traversal visualization."""
-        if self.is_running:
-            print("Visualization already in progress.")
+        """Starts the selected graph traversal visualization, superseding a run in progress."""
+        start_node_val = self.start_node.get()
+        algo = self.selected_algorithm.get()
+        goal = self.graph.index.get(self.goal_node.get(), NONE)
+        if algo in GOAL_REQUIRED and goal == NONE:
+            messagebox.showinfo("Run", f"{algo} searches for a path: please pick a Goal Node.")
+            return
+        if len(self.positions) != len(self.graph):
+            messagebox.showinfo("Run", "The graph is still being laid out; please wait a moment.")
             return
+        self.stop_run()
 
-        self.is_running = True
-        self.run_button.config(state=tk.DISABLED)
-        self.reset_button.config(state=tk.DISABLED)
         self.reset_visualization(clear_code_highlight=False) # Reset colors but keep code
+        self.is_running = True # Set after the reset, which does nothing while running
+        self.reset_button.config(state=tk.DISABLED)
+        self.layout_combo.config(state=tk.DISABLED) # Redrawing would drop the run's colors
+        self.pause_button.config(state=tk.DISABLED, text="Pause") # Until the traversal is done
+        self.cancel_button.config(state=tk.NORMAL)
+        self.set_trace(None)
+        self.timeline_label.config(text=f"Computing {algo}...")
+
+        # The traversal runs in the background; start_playback() picks up its trace
+        self.run_started = time.perf_counter()
+        self.worker.run_traversal(algo, self.graph, self.graph.index[start_node_val], goal=goal,
+                                  coords=self.positions, heuristic=self.heuristic.get())
+        self.watch_worker()
+
+    def start_playback(self, trace, timeline):
+        """Plays back the trace of the current run once the worker has computed it and its timeline."""
+        self.profiler.record("traversal", time.perf_counter() - self.run_started)
+        self.profiler.count("traversal steps", len(trace))
+        self.pause_button.config(state=tk.NORMAL, text="Pause")
+        self.set_trace(trace, timeline)
+        self.scheduler.set_speed(self.playback_speed())
+        mode = self.playback_mode.get()
+        if mode == "Instant":
+            self.scheduler.start(self.replay_frames(trace, 1))
+        elif mode == "Sampled":
+            self.scheduler.start(self.replay_frames(trace, self.sample_frame_count()))
+        else:
+            self.scheduler.start(self.replay_trace(trace))
 
-        start_node_val = self.start_node.get()
-        algo = self.selected_algorithm.get()
+    def toggle_pause(self):
+        """Pauses or resumes the running visualization."""
+        if self.scheduler.paused:
+            self.scheduler.resume()
+            self.pause_button.config(text="Pause")
+        else:
+            self.scheduler.pause()
+            self.pause_button.config(text="Resume")
+
+    def cancel_visualization(self):
+        """Stops the running visualization, leaving the graph as it is."""
+        if self.worker.cancel("run"): # Still computing; there is nothing to play back yet
+            self.set_trace(None)
+            self.on_visualization_done()
+        else:
+            self.scheduler.cancel()
+
+    def stop_run(self):
+        """Drops the run in progress, if any, without re-enabling the controls."""
+        self.worker.cancel("run")
+        self.scheduler.cancel(notify=False)
+        if self.enable_after_id is not None:
+            self.master.after_cancel(self.enable_after_id)
+            self.enable_after_id = None
+        self.is_running = False
 
+    # --- Background Worker ---
+    def watch_worker(self):
+        """Starts polling the worker for results, unless already polling."""
+        if self.poll_after_id is None:
+            self.poll_after_id = self.master.after(WORKER_POLL_MS, self.poll_worker)
+
+    def poll_worker(self):
+        """Handles the results the worker has sent; polls again while it has jobs."""
+        self.poll_after_id = None
+        for channel, kind, value in self.worker.poll():
+            if kind == worker.ERROR:
+                if channel == "run": # E.g. negative edge weights
+                    messagebox.showerror("Run", value)
+                    self.set_trace(None)
+                    self.on_visualization_done()
+                else:
+                    messagebox.showerror("Layout", value)
+            elif channel == "layout":
+                self.on_layout(value)
+            else:
+                self.start_playback(*value)
+        if self.worker.busy:
+            self.watch_worker()
+
+    def playback_speed(self):
+        """Speed multiplier selected on the (logarithmic) speed slider."""
+        return 2 ** self.speed.get()
+
+    # --- Timeline ---
+    def set_trace(self, trace, timeline=None):
+        """Makes `trace` and its traversal.Timeline the run shown on the timeline (None for no run)."""
+        self.trace = trace
+        self.trace_step = 0
+        self.timeline = timeline
+        self.visit_ranks = None
+        self.show_node_info(None)
+        self.timeline_scale.config(to=len(trace) if trace is not None else 0)
+        self.update_timeline()
+
+    def update_timeline(self):
+        """Moves the timeline slider to the step being shown."""
+        self.timeline_step.set(self.trace_step)
+        if self.trace is None:
+            self.timeline_label.config(text="No run")
+        else:
+            self.timeline_label.config(text=f"Step {self.trace_step} / {len(self.trace)}")
+
+    def on_timeline_seek(self, value):
+        """Shows the state of the last run at the step picked on the timeline, pausing playback."""
+        if self.trace is None:
+            self.update_timeline()
+            return
+        step = int(float(value))
+        if step == self.trace_step:
+            return
+        if self.scheduler.running and not self.scheduler.paused:
+            self.toggle_pause()
+        self.seek(step)
+
+    def seek(self, step):
+        """Changes the display from the current step of the trace to `step`."""
+        colors, added, removed, line = self.timeline.diff(self.trace_step, step)
+        for node, color in colors.items():
+            self.update_node_color(node, NODE_COLORS[color])
+        for edge, node in added:
+            self.update_edge_color(edge, node, HIGHLIGHT_COLOR)
+        for edge, node in removed:
+            self.renderer.clear_edge_color(edge, node)
+        self.highlight_code_line(line if line != NONE else None)
+        self.trace_step = step
+
+    def on_frame(self):
+        """Called by the renderer after each frame to update the widgets around the canvas."""
+        if not self.profiler.enabled:
+            self.apply_code_highlight()
+            if self.trace is not None:
+                self.update_timeline()
+            return
+        start = time.perf_counter()
+        self.apply_code_highlight()
+        self.profiler.record("code highlight", time.perf_counter() - start)
+        if self.trace is not None:
+            self.update_timeline()
+        # Redraw now instead of when Tk is idle, so that the cost of the redraw can be measured
+        start = time.perf_counter()
+        self.master.update_idletasks()
+        self.profiler.record("redraw", time.perf_counter() - start)
+
+    # --- Profiling ---
+    def toggle_profiler(self):
+        """Starts (from zero) or stops profiling, showing or hiding the profiler panel."""
+        if self.profile_after_id is not None:
+            self.master.after_cancel(self.profile_after_id)
+            self.profile_after_id = None
+        self.profiler.enabled = self.profile_enabled.get()
+        if self.profiler.enabled:
+            self.profiler.reset()
+            self.profile_frame.pack(after=self.controls_frame, padx=5, fill=tk.X)
+            self.refresh_profile()
+        else:
+            self.profile_frame.pack_forget()
+
+    def refresh_profile(self):
+        """Shows the latest rates and timings in the profiler panel."""
+        profiler = self.profiler
+        profiler.gauge("frontier", self.frontier_size)
+        rates = profiler.update_rates()
+        frames = rates.get("frame", 0.0)
+        lines = [
+            f"Steps/s      {rates.get('step', 0.0):>12,.0f}",
+            f"Frames/s     {frames:>12.1f}",
+            f"Frame p50/95 {profiler.percentile('frame', 0.5) * 1000:>6.1f}/{profiler.percentile('frame', 0.95) * 1000:.1f} ms",
+            f"Dirty/frame  {rates.get('dirty items', 0.0) / frames if frames else 0.0:>12.1f}",
+            f"Frontier     {self.frontier_size:>12,}",
+            "Mean ms:",
+        ]
+        for name in ("step", "itemconfig", "code highlight", "redraw", "render", "traversal"):
+            timing = profiler.timings.get(name)
+            if timing is not None:
+                lines.append(f"  {name:<14} {timing[1] / timing[0] * 1000:>9.3f}")
+        self.profile_label.config(text="\n".join(lines))
+        self.profile_after_id = self.master.after(PROFILE_REFRESH_MS, self.refresh_profile)
+
+    def export_profile(self):
+        """Saves everything the profiler recorded to a JSON file."""
+        path = filedialog.asksaveasfilename(title="Export Profile", defaultextension=".json",
+                                            filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        self.profiler.gauge("frontier", self.frontier_size)
         try:
-            if algo == "DFS":
-                self.visualize_dfs(start_node_val)
-            else: # BFS
-                self.visualize_bfs(start_node_val)
-        except Exception as e:
-            print(f"An error occurred during visualization: {e}")
-            self.reset_visualization() # Ensure reset even on error
-        finally:
-            # Use 'after' to re-enable buttons slightly after the visualization ends
-            # This ensures the last step is visible before buttons are active
-            self.master.after(DELAY_MS + 100, self.enable_controls)
+            self.profiler.export(path, algorithm=self.selected_algorithm.get(), nodes=len(self.graph),
+                                 adjacency_entries=self.graph.num_edges, max_fps=int(self.max_fps.get()),
+                                 speed=self.playback_speed())
+        except OSError as e:
+            messagebox.showerror("Export Profile", f"Could not write {os.path.basename(path)}:\n{e}")
+
+    def update_speed(self, value=None):
+        """Applies the speed slider to the running visualization."""
+        speed = self.playback_speed()
+        self.speed_label.config(text=f"{speed:.3g}x")
+        self.scheduler.set_speed(speed)
+
+    def update_max_fps(self, event=None):
+        """Applies the max frames per second setting to the renderer."""
+        self.renderer.set_max_fps(int(self.max_fps.get()))
+
+    def on_visualization_done(self):
+        """Called by the scheduler when a run finishes or is cancelled."""
+        # Re-enable buttons slightly after the visualization ends
+        # This ensures the last step is visible before buttons are active
+        self.pause_button.config(state=tk.DISABLED, text="Pause")
+        self.cancel_button.config(state=tk.DISABLED)
+        self.enable_after_id = self.master.after(100, self.enable_controls)
+
+    def on_visualization_error(self, error):
+        """Called by the scheduler when a step raises."""
+        print(f"An error occurred during visualization: {error}")
+        self.is_running = False
+        self.reset_visualization() # Ensure reset even on error
+        self.on_visualization_done()
 
 
     def enable_controls(self):
         """Re-enables control buttons and resets running flag."""
+        self.enable_after_id = None
         self.is_running = False
         self.run_button.config(state=tk.NORMAL)
         self.reset_button.config(state=tk.NORMAL)
+        self.layout_combo.config(state="readonly")
         self.highlight_code_line(None) # Clear code highlight
 
 
-    def visualize_dfs(self, start_node):
-        """Performs DFS traversal with visualization steps."""
-        self.highlight_code_line(0) # DFS function call
-        self.master.after(DELAY_MS)
-
-        visited = set()
-        stack = [(start_node, None)] # Store (node, parent_edge) for edge highlighting
-
-        self.highlight_code_line(1) # visited = set()
-        self.master.after(DELAY_MS)
-        self.highlight_code_line(2) # stack = [start_node]
-        self.master.after(DELAY_MS)
-
-        while stack:
-            self.highlight_code_line(3) # while stack:
-            self.master.after(DELAY_MS // 2) # Faster check
-
-            node, parent_node = stack.pop()
-            self.highlight_code_line(4) # node = stack.pop()
-            self.master.after(DELAY_MS)
-
-            self.highlight_code_line(5) # if node not in visited:
-            self.master.after(DELAY_MS)
-            if node not in visited:
-                # Visualization: Mark as visiting
-                self.highlight_code_line(6) # mark node as visiting
-                self.update_node_color(node, NODE_COLOR_VISITING)
-                # Highlight edge from parent if applicable
-                if parent_node:
-                    self.update_edge_color(parent_node, node, HIGHLIGHT_COLOR)
-                self.master.after(DELAY_MS)
-
-                visited.add(node)
-                self.highlight_code_line(7) # visited.add(node)
-                self.master.after(DELAY_MS)
-
-                # Visualization: Mark as visited
-                self.highlight_code_line(8) # mark node as visited
-                self.update_node_color(node, NODE_COLOR_VISITED)
-                self.master.after(DELAY_MS)
-
-                # Add neighbors to stack (reversed for intuitive order)
-                self.highlight_code_line(9) # for neighbor in reversed(graph[node]):
-                self.master.after(DELAY_MS // 2)
-                neighbors = reversed(graph.get(node, [])) # Use get for safety
-                for neighbor in neighbors:
-                    self.highlight_code_line(10) # if neighbor not in visited:
-                    self.master.after(DELAY_MS // 2)
-                    if neighbor not in visited:
-                        self.highlight_code_line(11) # stack.append(neighbor)
-                        stack.append((neighbor, node)) # Add neighbor and its parent
-                        self.master.after(DELAY_MS)
-                        # Visualization: Indicate edge consideration (optional, can be noisy)
-                        # self.highlight_code_line(12) # mark edge to neighbor
-                        # self.update_edge_color(node, neighbor, "orange")
-                        # self.master.after(DELAY_MS // 2)
-                    else:
-                         # Optional: Briefly show check on already visited neighbor
-                         self.update_node_color(neighbor, "lightgrey")
-                         self.master.after(DELAY_MS // 4)
-                         self.update_node_color(neighbor, NODE_COLOR_VISITED) # Revert color
-                         self.master.after(DELAY_MS // 4)
-            else:
-                 # Optional: Briefly show check on already visited node from stack
-                 self.update_node_color(node, "lightgrey")
-                 self.master.after(DELAY_MS // 4)
-                 if node in visited: # Ensure it was actually visited before changing back
-                     self.update_node_color(node, NODE_COLOR_VISITED)
-                 else: # Should not happen in standard DFS, but for safety
-                     self.update_node_color(node, NODE_COLOR_DEFAULT)
-                 self.master.after(DELAY_MS // 4)
+    def replay_trace(self, trace):
+        """Replays a recorded StepTrace, yielding the delay before each next step.
 
+        Playback continues from self.trace_step, so seeking on the timeline
+        while paused moves where it resumes.
+        """
+        while self.trace_step < len(trace):
+            line, node, color, edge, delay = trace[self.trace_step]
+            self.trace_step += 1
+            if line != NONE:
+                self.highlight_code_line(line)
+            if color != NONE:
+                self.update_node_color(node, NODE_COLORS[color])
+            if edge != NONE:
+                self.update_edge_color(edge, node, HIGHLIGHT_COLOR)
+            yield DELAY_MS * delay // traversal.DELAY_FULL
 
         self.highlight_code_line(None) # End of visualization
 
-
-    def visualize_bfs(self, start_node):
-        """Performs BFS traversal with visualization steps."""
-        self.highlight_code_line(0) # BFS function call
-        self.master.after(DELAY_MS)
-
-        visited = set()
-        queue = deque([(start_node, None)]) # Store (node, parent_node) for edge highlighting
-
-        self.highlight_code_line(1) # visited = set()
-        self.master.after(DELAY_MS)
-
-        self.highlight_code_line(2) # queue = deque([start_node])
-        visited.add(start_node)
-        self.highlight_code_line(3) # visited.add(start_node)
-        self.master.after(DELAY_MS)
-
-        # Visualization: Mark start node as visiting
-        self.highlight_code_line(4) # mark start_node as visiting
-        self.update_node_color(start_node, NODE_COLOR_VISITING)
-        self.master.after(DELAY_MS)
-
-        while queue:
-            self.highlight_code_line(5) # while queue:
-            self.master.after(DELAY_MS // 2) # Faster check
-
-            node, parent_node = queue.popleft()
-            self.highlight_code_line(6) # node = queue.popleft()
-            self.master.after(DELAY_MS)
-
-            # Visualization: Mark node as visited
-            self.highlight_code_line(7) # mark node as visited
-            self.update_node_color(node, NODE_COLOR_VISITED)
-            # Highlight edge from parent if applicable
-            if parent_node:
-                self.update_edge_color(parent_node, node, HIGHLIGHT_COLOR)
-            self.master.after(DELAY_MS)
-
-            self.highlight_code_line(8) # for neighbor in graph[node]:
-            self.master.after(DELAY_MS // 2)
-            neighbors = graph.get(node, []) # Use get for safety
-            for neighbor in neighbors:
-                self.highlight_code_line(9) # if neighbor not in visited:
-                self.master.after(DELAY_MS // 2)
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    self.highlight_code_line(10) # visited.add(neighbor)
-                    self.master.after(DELAY_MS)
-
-                    queue.append((neighbor, node)) # Add neighbor and its parent
-                    self.highlight_code_line(11) # queue.append(neighbor)
-                    self.master.after(DELAY_MS)
-
-                    # Visualization: Mark neighbor as visiting (about to be processed)
-                    self.highlight_code_line(12) # mark neighbor as visiting
-                    self.update_node_color(neighbor, NODE_COLOR_VISITING)
-                    self.master.after(DELAY_MS)
-
-                    # Visualization: Highlight edge being added
-                    self.highlight_code_line(13) # mark edge to neighbor
-                    self.update_edge_color(node, neighbor, HIGHLIGHT_COLOR) # Highlight edge earlier for BFS
-                    self.master.after(DELAY_MS)
-                else:
-                    # Optional: Briefly show check on already visited neighbor
-                    if neighbor in self.node_objects: # Check if neighbor exists visually
-                        current_color = self.canvas.itemcget(self.node_objects[neighbor], "fill")
-                        if current_color != NODE_COLOR_VISITING and current_color != NODE_COLOR_VISITED:
-                            # Only flash if not already highlighted
-                            self.update_node_color(neighbor, "lightgrey")
-                            self.master.after(DELAY_MS // 4)
-                            self.update_node_color(neighbor, current_color) # Revert color
-                            self.master.after(DELAY_MS // 4)
-
+    def replay_frames(self, trace, frames):
+        """Replays a StepTrace as `frames` evenly spaced states, skipping the steps in between.
+
+        Each frame applies only the net changes since the previous one, so
+        flashes and intermediate colors are never drawn; one frame shows
+        just the final coloring. Long frames are applied FRAME_CHUNK steps
+        at a time with a zero delay in between, which lets the scheduler
+        return to the event loop when its time budget is used up.
+        """
+        for frame in range(1, frames + 1):
+            stop = len(trace) * frame // frames
+            if stop <= self.trace_step:
+                continue # Already shown (the timeline was moved forward while paused)
+            line = NONE
+            while self.trace_step < stop:
+                end = min(self.trace_step + FRAME_CHUNK, stop)
+                colors, edges, chunk_line = trace.changes(self.trace_step, end)
+                self.trace_step = end
+                for node, color in colors.items():
+                    self.update_node_color(node, NODE_COLORS[color])
+                for edge, node in edges:
+                    self.update_edge_color(edge, node, HIGHLIGHT_COLOR)
+                if chunk_line != NONE:
+                    line = chunk_line
+                if self.trace_step < stop:
+                    yield 0
+            if frame < frames:
+                if line != NONE:
+                    self.highlight_code_line(line)
+                yield DELAY_MS
 
         self.highlight_code_line(None) # End of visualization
 
+    def sample_frame_count(self):
+        """Number of frames for Sampled playback; falls back to the default if the entry is invalid."""
+        try:
+            return max(self.sample_frames.get(), 1)
+        except (tk.TclError, ValueError):
+            self.sample_frames.set(DEFAULT_SAMPLE_FRAMES)
+            return DEFAULT_SAMPLE_FRAMES
 
     def reset_visualization(self, clear_code_highlight=True):
         """Resets the graph colors and clears highlights."""
         if self.is_running: # Prevent reset during active run
             return
 
-        # Reset node colors
-        for node, oval_id in self.node_objects.items():
-            self.canvas.itemconfig(oval_id, fill=NODE_COLOR_DEFAULT)
-
-        # Reset edge colors
-        for edge, line_id in self.edge_objects.items():
-             # Check if the item still exists before configuring
-            if line_id in self.canvas.find_all():
-                self.canvas.itemconfig(line_id, fill="gray", width=EDGE_WIDTH)
+        # Reset node and edge colors
+        self.renderer.reset_colors()
+        self.frontier_size = 0
+        self.trace_step = 0 # The default colors are the state before the first step
+        self.update_timeline()
 
         # Clear code highlight
         if clear_code_highlight:
             self.highlight_code_line(None)
 
-        self.master.update()
-
 
 # --- Main Execution ---
 if __name__ == "__main__":
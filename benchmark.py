@@ -0,0 +1,340 @@
+"""Benchmarks for the traversal engine, the layouts and the canvas renderer.
+
+Runs every benchmark on synthetic graphs (grid, Erdos-Renyi, scale-free and
+deep trees) of a configurable size and writes the results to a JSON file.
+The graphs are built from fixed seeds, so results taken on different
+commits describe the same work and can be compared with --compare.
+
+    python benchmark.py --nodes 10000 100000 --output bench.json
+    python benchmark.py --compare bench.json
+
+Traversal and layout benchmarks need no display. The render benchmark
+draws on a real (withdrawn) Tk canvas, so it needs an X server; on a
+headless machine run it under Xvfb (`xvfb-run python benchmark.py`).
+Without a display it is skipped. tkinter is only imported by the render
+benchmark.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import layout
+import theme
+import traversal
+from graphdata import GraphBuilder
+
+GRAPH_KINDS = ("grid", "er", "scale-free", "deep-tree")
+ALGORITHMS = ("DFS", "BFS", "Level BFS", "Bidirectional BFS", "Dijkstra", "A*")
+DEFAULT_NODES = (10000,)
+DEFAULT_OUTPUT = "benchmark.json"
+ER_AVERAGE_DEGREE = 4    # Average degree of the Erdos-Renyi graphs
+SCALE_FREE_EDGES = 2     # Edges added per node by preferential attachment
+DEEP_TREE_WINDOW = 3     # Tree nodes attach to one of the last few nodes, so depth is about n / 2
+FORCE_ITERATIONS = 5
+RENDER_FRAMES = 100      # Playback frames flushed by the render benchmark
+ZOOM_FRAMES = 30         # Zoom steps rendered by the render benchmark
+SEED = 1
+
+
+# --- Synthetic Graphs ---
+def grid_graph(n):
+    """Returns a square grid of about n nodes and its grid coordinates."""
+    side = max(math.isqrt(n), 1)
+    builder = GraphBuilder()
+    for row in range(side):
+        for col in range(side):
+            builder.add_node(f"{row},{col}")
+    for row in range(side):
+        for col in range(side):
+            if col + 1 < side:
+                builder.add_edge(f"{row},{col}", f"{row},{col + 1}")
+            if row + 1 < side:
+                builder.add_edge(f"{row},{col}", f"{row + 1},{col}")
+    return builder.build(), [(float(i % side), float(i // side)) for i in range(side * side)]
+
+
+def erdos_renyi(n, seed=SEED):
+    """Returns a G(n, m) random graph with average degree ER_AVERAGE_DEGREE."""
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    for i in range(n):
+        builder.add_node(str(i))
+    for _ in range(n * ER_AVERAGE_DEGREE // 2):
+        builder.add_edge(str(rng.randrange(n)), str(rng.randrange(n)))
+    return builder.build(), None
+
+
+def scale_free(n, seed=SEED):
+    """Returns a Barabasi-Albert graph: each new node links to SCALE_FREE_EDGES nodes by degree."""
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    builder.add_node("0")
+    ends = [0] # Every edge end once, so a uniform pick is proportional to degree
+    for i in range(1, n):
+        for _ in range(min(SCALE_FREE_EDGES, i)):
+            j = ends[rng.randrange(len(ends))]
+            builder.add_edge(str(i), str(j))
+            ends.extend((i, j))
+    return builder.build(), None
+
+
+def deep_tree(n, seed=SEED):
+    """Returns a random tree whose nodes attach to one of the last DEEP_TREE_WINDOW nodes."""
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    builder.add_node("0")
+    for i in range(1, n):
+        builder.add_edge(str(i), str(i - 1 - rng.randrange(min(i, DEEP_TREE_WINDOW))))
+    return builder.build(), None
+
+
+GENERATORS = {"grid": grid_graph, "er": erdos_renyi, "scale-free": scale_free, "deep-tree": deep_tree}
+
+
+# --- Measurement ---
+def percentiles(samples):
+    """Returns the p50/p90/p99/max of a list of timings, in milliseconds (nearest rank)."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, max(0, math.ceil(p * len(ordered)) - 1))] * 1000
+    return {"p50_ms": pick(0.5), "p90_ms": pick(0.9), "p99_ms": pick(0.99), "max_ms": ordered[-1] * 1000}
+
+
+def timed(func, repeat):
+    """Runs func() `repeat` times; returns (best time in seconds, last result)."""
+    best, result = math.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(func):
+    """Returns the peak Python heap use of one func() call, in KiB (measured separately from timing)."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+# --- Benchmarks ---
+def bench_traversal(graph, coords, algorithm, repeat):
+    goal = len(graph) - 1
+    if algorithm == "A*" and coords is None:
+        xs, ys = layout.circular_layout(graph)
+        coords = list(zip(xs, ys))
+    run = lambda: traversal.run(algorithm, graph, 0, goal=goal, coords=coords)
+    seconds, trace = timed(run, repeat)
+    return {
+        "steps": len(trace),
+        "visited": len(trace.order),
+        "seconds": seconds,
+        "steps_per_sec": len(trace) / seconds if seconds else None,
+        "peak_kib": peak_memory(run),
+    }
+
+
+def bench_layout(graph, name, repeat):
+    if name == "Force":
+        def run():
+            force = layout.ForceLayout(graph)
+            force.step(FORCE_ITERATIONS)
+            return force
+    elif name == "Layered":
+        run = lambda: layout.layered_layout(graph)
+    else:
+        run = lambda: layout.circular_layout(graph)
+    seconds, _ = timed(run, repeat)
+    result = {"seconds": seconds, "nodes_per_sec": len(graph) / seconds if seconds else None,
+              "peak_kib": peak_memory(run)}
+    if name == "Force":
+        result["iterations"] = FORCE_ITERATIONS
+        result["backend"] = "numpy" if layout.np is not None else "python"
+    return result
+
+
+def open_canvas():
+    """Returns (root, canvas, label_font) on a withdrawn Tk window, or None without a display."""
+    try:
+        import tkinter as tk
+        from tkinter import font
+        root = tk.Tk()
+    except Exception: # ImportError, or TclError when there is no display
+        return None
+    root.withdraw()
+    import app101
+    canvas = tk.Canvas(root, width=app101.CANVAS_WIDTH, height=app101.CANVAS_HEIGHT)
+    return root, canvas, font.Font(root=root, weight="bold")
+
+
+def bench_render(graph, tk_canvas):
+    """Times full renders at a range of zoom levels and the flushes of a BFS playback."""
+    import app101
+    root, canvas, label_font = tk_canvas
+    canvas.delete("all")
+    renderer = app101.GraphRenderer(canvas, label_font)
+    positions = layout.canvas_layout("Layered", graph, *theme.world_size(len(graph)), theme.LAYOUT_MARGIN)
+    renderer.set_graph(graph, positions)
+    renderer.fit()
+
+    def frame(draw):
+        # Cancel the renderer's own timers; frames are driven here
+        for after_id in (renderer.render_after_id, renderer.flush_after_id):
+            if after_id is not None:
+                canvas.after_cancel(after_id)
+        renderer.render_after_id = renderer.flush_after_id = None
+        start = time.perf_counter()
+        draw()
+        root.update_idletasks()
+        return time.perf_counter() - start
+
+    # Zoom in from the whole graph to the closest zoom, around the view center
+    render_times, items = [], 0
+    width, height = renderer.viewport_size()
+    factor = (app101.MAX_ZOOM / renderer.scale) ** (1 / max(ZOOM_FRAMES - 1, 1))
+    for _ in range(ZOOM_FRAMES):
+        render_times.append(frame(renderer.render))
+        items = max(items, len(canvas.find_all()))
+        renderer.zoom(factor, width / 2, height / 2)
+
+    renderer.fit()
+    frame(renderer.render)
+    trace = traversal.run("BFS", graph, 0)
+    colors = app101.NODE_COLORS
+    flush_times = []
+    per_frame = max(1, len(trace) // RENDER_FRAMES)
+    steps = iter(trace)
+    for _ in range(RENDER_FRAMES):
+        for _, (_, node, color, edge, _) in zip(range(per_frame), steps):
+            if color != traversal.NONE:
+                renderer.set_node_color(node, colors[color])
+            if edge != traversal.NONE:
+                renderer.set_edge_color(edge, node, app101.HIGHLIGHT_COLOR)
+        flush_times.append(frame(renderer.flush))
+    reset_time = frame(lambda: (renderer.reset_colors(), renderer.flush()))
+    return {
+        "render": percentiles(render_times),
+        "max_items": items,
+        "flush": percentiles(flush_times),
+        "steps_per_frame": per_frame,
+        "reset_ms": reset_time * 1000,
+    }
+
+
+# --- Driver ---
+def run_benchmarks(kinds, sizes, algorithms, repeat=3, render=True, log=print):
+    """Runs every benchmark and returns the list of result records."""
+    results = []
+    tk_canvas = open_canvas() if render else None
+    if render and tk_canvas is None:
+        log("render: skipped (no display; try xvfb-run)")
+    for kind in kinds:
+        for size in sizes:
+            start = time.perf_counter()
+            graph, coords = GENERATORS[kind](size)
+            base = {"graph": kind, "size": size, "nodes": len(graph), "edges": graph.num_edges}
+            results.append(dict(base, bench="build", case="generate", seconds=time.perf_counter() - start))
+            for algorithm in algorithms:
+                record = dict(base, bench="traversal", case=algorithm, **bench_traversal(graph, coords, algorithm, repeat))
+                results.append(record)
+                log(f"{kind:>10} {len(graph):>9} {algorithm:<18} {record['steps_per_sec']:>12,.0f} steps/s"
+                    f" {record['peak_kib']:>10,.0f} KiB")
+            for name in layout.LAYOUTS:
+                record = dict(base, bench="layout", case=name, **bench_layout(graph, name, 1 if name == "Force" else repeat))
+                results.append(record)
+                log(f"{kind:>10} {len(graph):>9} layout {name:<11} {record['seconds'] * 1000:>12,.1f} ms")
+            if tk_canvas is not None:
+                record = dict(base, bench="render", case="BFS playback", **bench_render(graph, tk_canvas))
+                results.append(record)
+                log(f"{kind:>10} {len(graph):>9} render p50 {record['render']['p50_ms']:.1f} ms,"
+                    f" p99 {record['render']['p99_ms']:.1f} ms; flush p50 {record['flush']['p50_ms']:.1f} ms,"
+                    f" p99 {record['flush']['p99_ms']:.1f} ms")
+    if tk_canvas is not None:
+        tk_canvas[0].destroy()
+    return results
+
+
+def environment():
+    """Describes the machine and commit, so result files can be told apart."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        import resource
+        max_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            max_rss_kib //= 1024 # Reported in bytes on macOS
+    except ImportError: # Not available on Windows
+        max_rss_kib = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(layout.np, "__version__", None),
+        "max_rss_kib": max_rss_kib,
+    }
+
+
+def result_key(record):
+    return (record["bench"], record["graph"], record["size"], record["case"])
+
+
+def main_metric(record):
+    """The number compared between result files (lower is better)."""
+    if record["bench"] == "render":
+        return record["flush"].get("p50_ms", 0) + record["render"].get("p50_ms", 0)
+    return record["seconds"]
+
+
+def compare(baseline, results, log=print):
+    """Prints how much each result changed against a baseline result file."""
+    old = {result_key(record): record for record in baseline["results"]}
+    for record in results:
+        before = old.get(result_key(record))
+        if before is None or not main_metric(before):
+            continue
+        ratio = main_metric(record) / main_metric(before)
+        log(f"{record['bench']:>9} {record['graph']:>10} {record['size']:>9} {record['case']:<18} x{ratio:.2f}"
+            + (" slower" if ratio > 1.1 else " faster" if ratio < 0.9 else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark traversal, layout and rendering on synthetic graphs.")
+    parser.add_argument("--nodes", type=int, nargs="+", default=list(DEFAULT_NODES), help="graph sizes (node counts)")
+    parser.add_argument("--graphs", nargs="+", choices=GRAPH_KINDS, default=list(GRAPH_KINDS))
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per case; the best is kept")
+    parser.add_argument("--no-render", action="store_true", help="skip the render benchmark")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file to write the results to")
+    parser.add_argument("--compare", metavar="BASELINE", help="result file to compare against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: # Read first; --output may be the same file
+            baseline = json.load(f)
+    results = run_benchmarks(args.graphs, args.nodes, args.algorithms, args.repeat, not args.no_render)
+    report = {"environment": environment(), "settings": vars(args), "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {len(results)} results to {args.output}")
+    if baseline is not None:
+        compare(baseline, results)
+
+
+if __name__ == "__main__":
+    main()
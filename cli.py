@@ -0,0 +1,196 @@
+"""Command-line entry point: run traversals without the GUI.
+
+Loads a graph file, runs an algorithm from one or more start nodes and
+writes the visit order, the parent tree and some statistics as JSON or
+CSV. Many start nodes can be run in parallel, one process per core:
+
+    python cli.py graph.csv --algorithm BFS --start A
+    python cli.py graph.csv --algorithm Dijkstra --start A --goal H --format csv
+    python cli.py graph.csv --all-starts --summary --jobs 8 --output stats.csv
+    python cli.py graph.csv --gui
+
+Only the engine modules are imported, so it starts in milliseconds and
+runs on machines without a display; tkinter (and the app) is imported
+only for --gui, and NumPy only by the algorithms and layouts that use it.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import loaders
+import traversal
+
+FORMATS = ("json", "csv")
+CHUNK_STARTS = 16 # Start nodes sent to a worker process at a time
+
+
+# --- Running ---
+def run_one(algorithm, graph, start, goal=traversal.NONE, coords=None, heuristic="Euclidean", summary=False):
+    """Runs `algorithm` from node id `start` and returns the result as a dict of plain data."""
+    started = time.perf_counter()
+    trace = traversal.run(algorithm, graph, start, goal=goal, coords=coords, heuristic=heuristic)
+    elapsed = time.perf_counter() - started
+    labels = graph.labels
+    # The shortest-path searches color the path they found, in order
+    path = []
+    for _, node, color, _, _ in trace:
+        if color == traversal.COLOR_PATH and (not path or path[-1] != node):
+            path.append(node)
+    record = {
+        "start": labels[start],
+        "goal": labels[goal] if goal != traversal.NONE else None,
+        "steps": len(trace),
+        "visited": len(trace.order),
+        "time_ms": round(elapsed * 1000, 3),
+    }
+    if goal != traversal.NONE:
+        record["path"] = [labels[node] for node in path] if path else None
+    if not summary:
+        record["order"] = [labels[node] for node in trace.order]
+        record["parent"] = {labels[node]: labels[trace.parent[node]] for node in trace.order
+                            if trace.parent[node] != traversal.NONE}
+    return record
+
+
+# Set in each worker process by _init_batch(), so the graph is sent once per process, not per start
+_batch = None
+
+
+def _init_batch(*args):
+    global _batch
+    _batch = args
+
+
+def _run_batch(start):
+    algorithm, graph, goal, coords, heuristic, summary = _batch
+    return run_one(algorithm, graph, start, goal, coords, heuristic, summary)
+
+
+def run_many(algorithm, graph, starts, goal=traversal.NONE, coords=None, heuristic="Euclidean",
+             summary=False, jobs=1):
+    """Yields run_one() for every start node id, in order, using up to `jobs` processes."""
+    if jobs <= 1 or len(starts) <= 1:
+        for start in starts:
+            yield run_one(algorithm, graph, start, goal, coords, heuristic, summary)
+        return
+    from concurrent.futures import ProcessPoolExecutor # Only batches need it; it is slow to import
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch,
+                             initargs=(algorithm, graph, goal, coords, heuristic, summary)) as pool:
+        yield from pool.map(_run_batch, starts, chunksize=CHUNK_STARTS)
+
+
+# --- Output ---
+def write_json(out, header, records):
+    json.dump(dict(header, runs=list(records)), out, indent=1)
+    out.write("\n")
+
+
+def write_csv(out, records, summary):
+    """One row per visited node (start, rank, node, parent), or with `summary` one row per run."""
+    writer = csv.writer(out, lineterminator="\n")
+    if summary:
+        writer.writerow(("start", "goal", "steps", "visited", "time_ms", "path"))
+        for record in records:
+            path = record.get("path")
+            writer.writerow((record["start"], record["goal"] or "", record["steps"], record["visited"],
+                             record["time_ms"], " ".join(path) if path else ""))
+        return
+    writer.writerow(("start", "rank", "node", "parent"))
+    for record in records:
+        parent = record["parent"]
+        for rank, node in enumerate(record["order"]):
+            writer.writerow((record["start"], rank, node, parent.get(node, "")))
+
+
+# --- GUI ---
+def open_gui(graph=None, name=None):
+    """Opens the visualizer, showing `graph` if given. Imports tkinter only now."""
+    import tkinter as tk
+    import app101
+    root = tk.Tk()
+    app = app101.GraphVisualizerApp(root)
+    if graph is not None:
+        app.set_graph(graph)
+        app.status_label.config(text=f"{name}: {len(graph)} nodes, {graph.num_edges} adjacency entries")
+    root.mainloop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run graph traversals without the GUI and print the results.")
+    parser.add_argument("graph", nargs="?", help="graph file (any format Open Graph... accepts)")
+    parser.add_argument("--algorithm", "-a", choices=list(traversal.ALGORITHMS), default="BFS")
+    parser.add_argument("--start", "-s", nargs="+", metavar="NODE", help="start node label(s) (default: the first node)")
+    parser.add_argument("--all-starts", action="store_true", help="run from every node")
+    parser.add_argument("--goal", "-g", help="goal node label, for the shortest-path searches")
+    parser.add_argument("--heuristic", choices=list(traversal.HEURISTICS), default="Euclidean", help="for A*")
+    parser.add_argument("--layout", default="Force", help="layout whose positions A* measures distances in")
+    parser.add_argument("--format", "-f", choices=FORMATS, help="output format (default: from --output, else json)")
+    parser.add_argument("--output", "-o", help="output file (default: standard output)")
+    parser.add_argument("--summary", action="store_true", help="statistics only, without visit orders and parent trees")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="processes for several start nodes (0: one per core)")
+    parser.add_argument("--gui", action="store_true", help="open the visualizer instead, with the graph loaded")
+    args = parser.parse_args(argv)
+
+    graph = None
+    if args.graph is not None:
+        try:
+            graph = loaders.load_graph(args.graph)
+        except (OSError, ValueError, SyntaxError) as e: # ElementTree parse errors are SyntaxErrors
+            parser.error(f"could not load {args.graph}: {e}")
+        if len(graph) == 0:
+            parser.error(f"{args.graph} contains no nodes")
+    if args.gui:
+        open_gui(graph, args.graph and os.path.basename(args.graph))
+        return 0
+    if graph is None:
+        parser.error("a graph file is required (or use --gui)")
+
+    if args.all_starts:
+        starts = list(range(len(graph)))
+    else:
+        missing = [label for label in args.start or () if label not in graph.index]
+        if missing:
+            parser.error(f"no node labeled {', '.join(missing)} in {args.graph}")
+        starts = [graph.index[label] for label in args.start] if args.start else [0]
+    goal = traversal.NONE
+    if args.goal is not None:
+        if args.goal not in graph.index:
+            parser.error(f"no node labeled {args.goal} in {args.graph}")
+        goal = graph.index[args.goal]
+    if args.algorithm in traversal.GOAL_REQUIRED and goal == traversal.NONE:
+        parser.error(f"{args.algorithm} needs --goal")
+    coords = None
+    if args.algorithm == "A*":
+        import layout # Only A* needs positions
+        import theme
+        if args.layout not in layout.LAYOUTS:
+            parser.error(f"--layout must be one of {', '.join(layout.LAYOUTS)}")
+        coords = layout.canvas_layout(args.layout, graph, *theme.world_size(len(graph)), theme.LAYOUT_MARGIN,
+                                      root=starts[0])
+    fmt = args.format or ("csv" if args.output and args.output.lower().endswith(".csv") else "json")
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    records = run_many(args.algorithm, graph, starts, goal, coords, args.heuristic, args.summary, jobs)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if fmt == "csv":
+            write_csv(out, records, args.summary)
+        else:
+            header = {"graph": args.graph, "nodes": len(graph), "adjacency_entries": graph.num_edges,
+                      "algorithm": args.algorithm}
+            write_json(out, header, records)
+    except ValueError as e: # E.g. negative edge weights
+        print(f"{args.algorithm} failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
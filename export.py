@@ -0,0 +1,473 @@
+"""Offscreen rendering of traversals to PNG frames, animated GIFs and MP4 videos.
+
+FrameRenderer draws a graph with Pillow in the canvas colors and sizes of
+theme.py, so frames look like the Tk canvas without needing a display. A
+frame applies only the net changes since the previous one
+(StepTrace.changes()) and repaints just the image tiles they touch, in
+the same order as a full redraw, so a frame costs O(changes), not
+O(graph). Frames are produced as fast as the CPU allows:
+
+    python export.py graph.csv --algorithm BFS --start A --output bfs.gif
+    python export.py graph.csv --layout Layered --frames 100 --output bfs.mp4
+    python export.py graph.csv --trace run.trace --output frames/
+
+The output format follows the extension: .gif, .mp4 (piped to a local
+ffmpeg, which encodes on all cores), anything else is a directory of
+numbered PNG files. PNG compression and GIF palette conversion run on a
+thread pool while the next frames are drawn, and Pillow's GIF writer
+stores only the changed rectangle of each frame.
+
+Pillow (`pip install pillow`) is only needed by this module. This module
+must not import tkinter.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError: # Optional; only needed to export
+    Image = None
+
+import layout
+import loaders
+import theme
+import traversal
+
+DEFAULT_SIZE = (800, 600)
+DEFAULT_FPS = 10
+DEFAULT_MAX_FRAMES = 200 # Longer runs are sampled down to this many frames (a GIF holds all of them in memory)
+DEFAULT_HOLD = 2.0       # Seconds the final frame stays on screen in a GIF or MP4
+MAX_LABELS = 500         # Like the canvas: with more nodes than this, nodes are drawn as points
+MAX_PENDING = 16         # Frames waiting to be encoded before drawing waits for the encoder
+CAPTION_HEIGHT = 24
+CAPTION_FONT_SIZE = 14
+LABEL_FONT_SIZE = 12     # At scale 1; scaled with the nodes
+TILE_SIZE = 32           # apply() repaints the image in square tiles of this many pixels
+OUTLINE_COLOR = "black"
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError: # Pillow < 10.1 has only its fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+# --- Offscreen Renderer ---
+class FrameRenderer:
+    """Draws a graph and its traversal colors onto a Pillow image.
+
+    The whole graph is fitted into the image (below the caption strip, if
+    any). Node and edge colors are kept like GraphRenderer keeps them; the
+    image is updated in place by apply(). Everything is painted in one
+    order: default edges, then highlighted edges, then nodes by id.
+    """
+
+    def __init__(self, graph, positions, width, height, caption=True):
+        if Image is None:
+            raise RuntimeError("Exporting needs Pillow (pip install pillow)")
+        self.graph = graph
+        self.width, self.height = width, height
+        self.caption_height = CAPTION_HEIGHT if caption else 0
+        self.image = Image.new("RGB", (width, height), theme.BACKGROUND_COLOR)
+        self.draw = ImageDraw.Draw(self.image)
+        self.scratch = Image.new("RGB", (width, height), theme.BACKGROUND_COLOR) # Used by repaint()
+        self.scratch_draw = ImageDraw.Draw(self.scratch)
+        self.node_colors = [theme.NODE_COLOR_DEFAULT] * len(graph)
+        self.edge_colors = {} # (min id, max id): color, for highlighted edges only
+
+        # Fit the nodes (plus a node radius and margin) into the area below the caption
+        pad = theme.LAYOUT_MARGIN
+        if positions:
+            min_x = min(x for x, _ in positions) - pad
+            min_y = min(y for _, y in positions) - pad
+            span_x = max(x for x, _ in positions) + pad - min_x
+            span_y = max(y for _, y in positions) + pad - min_y
+        else:
+            min_x = min_y = 0.0
+            span_x = span_y = 1.0
+        area = height - self.caption_height
+        self.scale = min(width / span_x, area / span_y)
+        off_x = (width - span_x * self.scale) / 2 - min_x * self.scale
+        off_y = self.caption_height + (area - span_y * self.scale) / 2 - min_y * self.scale
+        self.xy = [(x * self.scale + off_x, y * self.scale + off_y) for x, y in positions]
+
+        radius = theme.NODE_RADIUS * self.scale
+        self.labeled = radius >= theme.LABEL_MIN_RADIUS and len(graph) <= MAX_LABELS
+        self.radius = radius if self.labeled else min(max(radius, theme.POINT_RADIUS), theme.LABEL_MIN_RADIUS)
+        self.outline_width = max(round(theme.NODE_OUTLINE_WIDTH * self.scale), 1)
+        self.edge_width = max(round(theme.EDGE_WIDTH * self.scale), 1)
+        self.label_font = _font(max(round(LABEL_FONT_SIZE * self.scale), 6)) if self.labeled else None
+        self.caption_font = _font(CAPTION_FONT_SIZE) if caption else None
+
+        # Each tile lists the edges and nodes that may paint into it, so that apply() can
+        # repaint a tile from scratch without looking at the rest of the graph
+        self.cols = (width + TILE_SIZE - 1) // TILE_SIZE
+        self.rows = (height + TILE_SIZE - 1) // TILE_SIZE
+        self.edges = [] # (min id, max id) of every edge, once even if it is stored both ways
+        offsets, targets = graph.offsets, graph.targets
+        seen = set()
+        for u in range(len(graph)):
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                key = (u, v) if u < v else (v, u)
+                if key not in seen:
+                    seen.add(key)
+                    self.edges.append(key)
+        self.edge_tiles = {}
+        for key in self.edges:
+            for tile in self.tiles_of_edge(key):
+                self.edge_tiles.setdefault(tile, []).append(key)
+        self.node_boxes = [self.node_box(node) for node in range(len(graph))]
+        self.node_tiles = {}
+        for node, box in enumerate(self.node_boxes):
+            for tile in self.tiles_of_box(*box):
+                self.node_tiles.setdefault(tile, []).append(node)
+
+    # --- Drawing ---
+    def draw_all(self):
+        """Draws every edge, then every node, from scratch."""
+        self.draw.rectangle((0, 0, self.width, self.height), fill=theme.BACKGROUND_COLOR)
+        self.paint(self.draw, self.edges, range(len(self.graph)))
+
+    def paint(self, draw, edges, nodes):
+        """Paints `edges` and `nodes` with `draw` in the z-order of the image."""
+        xy = self.xy
+        highlighted = []
+        for key in edges:
+            color = self.edge_colors.get(key)
+            if color is not None:
+                highlighted.append((key, color))
+                continue
+            (x1, y1), (x2, y2) = xy[key[0]], xy[key[1]]
+            draw.line((x1, y1, x2, y2), fill=theme.EDGE_COLOR_DEFAULT, width=self.edge_width)
+        for key, color in highlighted:
+            (x1, y1), (x2, y2) = xy[key[0]], xy[key[1]]
+            draw.line((x1, y1, x2, y2), fill=color, width=self.edge_width + 1)
+        r = self.radius
+        for node in sorted(nodes):
+            x, y = xy[node]
+            if self.labeled:
+                draw.ellipse((x - r, y - r, x + r, y + r), fill=self.node_colors[node],
+                             outline=OUTLINE_COLOR, width=self.outline_width)
+                draw.text((x, y), self.graph.labels[node], fill=theme.TEXT_COLOR, font=self.label_font, anchor="mm")
+            else:
+                draw.rectangle((x - r, y - r, x + r, y + r), fill=self.node_colors[node])
+
+    def draw_caption(self, text):
+        if self.caption_height:
+            self.draw.rectangle((0, 0, self.width, self.caption_height - 1), fill=theme.BACKGROUND_COLOR)
+            self.draw.text((6, self.caption_height // 2), text, fill=theme.TEXT_COLOR, font=self.caption_font,
+                           anchor="lm")
+
+    def apply(self, colors, edges):
+        """Applies the (colors, edges) of StepTrace.changes(), repainting only the tiles they touch."""
+        dirty = set()
+        for edge, node in edges:
+            key = (edge, node) if edge < node else (node, edge)
+            self.edge_colors[key] = theme.HIGHLIGHT_COLOR
+            dirty.update(self.tiles_of_edge(key))
+        for node, color in colors.items():
+            self.node_colors[node] = theme.NODE_COLORS[color]
+            dirty.update(self.tiles_of_box(*self.node_boxes[node]))
+        self.repaint(dirty)
+
+    def repaint(self, tiles):
+        """Redraws the given (column, row) tiles from scratch, exactly as draw_all() would."""
+        if len(tiles) * 2 > self.cols * self.rows: # Cheaper to redraw everything
+            self.draw_all()
+            return
+        edges, nodes = set(), set()
+        for tile in tiles:
+            edges.update(self.edge_tiles.get(tile, ()))
+            nodes.update(self.node_tiles.get(tile, ()))
+        # Runs of adjacent tiles in a row are copied as one rectangle
+        boxes = []
+        for ty, tx in sorted((ty, tx) for tx, ty in tiles):
+            if (tx - 1, ty) in tiles:
+                continue
+            end = tx + 1
+            while (end, ty) in tiles:
+                end += 1
+            boxes.append((tx * TILE_SIZE, ty * TILE_SIZE, min(end * TILE_SIZE, self.width),
+                          min((ty + 1) * TILE_SIZE, self.height)))
+        # Pillow cannot clip, so the items are painted onto a scratch image in the image's own
+        # coordinates (shifted lines are not always rasterized the same) and the tiles copied over
+        for x0, y0, x1, y1 in boxes:
+            self.scratch_draw.rectangle((x0, y0, x1 - 1, y1 - 1), fill=theme.BACKGROUND_COLOR)
+        self.paint(self.scratch_draw, edges, nodes)
+        for box in boxes:
+            self.image.paste(self.scratch.crop(box), box)
+
+    # --- Tiles ---
+    def node_box(self, node):
+        """Bounding box of everything drawn for `node` (its label may be wider than the node)."""
+        x, y = self.xy[node]
+        r = self.radius + 1
+        box = (x - r, y - r, x + r, y + r)
+        if self.labeled:
+            left, top, right, bottom = self.draw.textbbox((x, y), self.graph.labels[node], font=self.label_font,
+                                                          anchor="mm")
+            box = (min(box[0], left - 1), min(box[1], top - 1), max(box[2], right + 1), max(box[3], bottom + 1))
+        return box
+
+    def tiles_of_box(self, x0, y0, x1, y1):
+        """Yields the (column, row) of every tile of the image the rectangle overlaps."""
+        for ty in range(max(int(y0 // TILE_SIZE), 0), min(int(y1 // TILE_SIZE), self.rows - 1) + 1):
+            for tx in range(max(int(x0 // TILE_SIZE), 0), min(int(x1 // TILE_SIZE), self.cols - 1) + 1):
+                yield tx, ty
+
+    def tiles_of_edge(self, key):
+        """Yields the tiles the line of edge `key`, at its highlighted width, may paint into."""
+        (x1, y1), (x2, y2) = self.xy[key[0]], self.xy[key[1]]
+        if x1 > x2:
+            x1, y1, x2, y2 = x2, y2, x1, y1
+        pad = self.edge_width + 2
+        if x2 - x1 < TILE_SIZE: # Short across: its bounding box is tight enough
+            yield from self.tiles_of_box(x1 - pad, min(y1, y2) - pad, x2 + pad, max(y1, y2) + pad)
+            return
+        slope = (y2 - y1) / (x2 - x1)
+        for tx in range(max(int((x1 - pad) // TILE_SIZE), 0), min(int((x2 + pad) // TILE_SIZE), self.cols - 1) + 1):
+            # The stretch of the line above this column of tiles, widened by the line width
+            left = min(max(tx * TILE_SIZE - pad, x1), x2)
+            right = min(max((tx + 1) * TILE_SIZE + pad, x1), x2)
+            top, bottom = sorted((y1 + (left - x1) * slope, y1 + (right - x1) * slope))
+            for ty in range(max(int((top - pad) // TILE_SIZE), 0),
+                            min(int((bottom + pad) // TILE_SIZE), self.rows - 1) + 1):
+                yield tx, ty
+
+
+# --- Frame Selection ---
+def frame_stops(trace, frames=None, max_frames=DEFAULT_MAX_FRAMES):
+    """Step counts after which a frame is taken (the first frame, at step 0, is implied).
+
+    With `frames`, the run is split into that many evenly spaced frames,
+    like Sampled playback. Otherwise there is a frame after every step
+    that pauses (steps with no delay are shown with the next one), sampled
+    down to `max_frames` if there are more.
+    """
+    steps = len(trace)
+    if frames:
+        stops = sorted({steps * frame // frames for frame in range(1, frames + 1)} - {0})
+    else:
+        delays = trace.events[traversal.STRIDE - 1::traversal.STRIDE]
+        stops = [step + 1 for step, delay in enumerate(delays) if delay]
+        if not stops or stops[-1] != steps:
+            stops.append(steps)
+        if max_frames and len(stops) > max_frames:
+            stops = [stops[len(stops) * frame // max_frames - 1] for frame in range(1, max_frames + 1)]
+    return [stop for stop in stops if stop > 0]
+
+
+# --- Writers ---
+class PngWriter:
+    """Saves frames as numbered PNG files in a directory, compressing on a thread pool."""
+
+    def __init__(self, directory, pool):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pool = pool
+        self.pending = deque()
+        self.count = 0
+
+    def write(self, image):
+        path = os.path.join(self.directory, f"frame_{self.count:05d}.png")
+        self.pending.append(self.pool.submit(image.copy().save, path))
+        self.count += 1
+        while len(self.pending) > MAX_PENDING:
+            self.pending.popleft().result()
+
+    def close(self, hold):
+        while self.pending:
+            self.pending.popleft().result()
+
+
+class GifWriter:
+    """Collects palette frames (converted on a thread pool) and writes one looping GIF."""
+
+    def __init__(self, path, pool, fps):
+        self.path = path
+        self.pool = pool
+        self.duration = round(1000 / fps)
+        self.frames = []
+        # Fixed palette: the theme colors plus a gray ramp for anti-aliased text
+        colors = {theme.BACKGROUND_COLOR, theme.TEXT_COLOR, theme.EDGE_COLOR_DEFAULT, theme.HIGHLIGHT_COLOR,
+                  OUTLINE_COLOR, *theme.NODE_COLORS}
+        palette = [value for name in sorted(colors) for value in Image.new("RGB", (1, 1), name).getpixel((0, 0))]
+        palette += [value for level in range(0, 256, 17) for value in (level, level, level)]
+        self.palette = Image.new("P", (1, 1))
+        self.palette.putpalette(palette)
+
+    def write(self, image):
+        self.frames.append(self.pool.submit(image.copy().quantize, palette=self.palette, dither=0))
+
+    def close(self, hold):
+        frames = [future.result() for future in self.frames]
+        if not frames:
+            return
+        durations = [self.duration] * len(frames)
+        durations[-1] += round(hold * 1000)
+        frames[0].save(self.path, save_all=True, append_images=frames[1:], duration=durations, loop=0,
+                       optimize=False) # Keep the shared palette; optimizing it costs more than drawing
+
+
+class Mp4Writer:
+    """Pipes raw frames to ffmpeg, which encodes them (H.264) on its own threads."""
+
+    def __init__(self, path, width, height, fps):
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("MP4 export needs ffmpeg on the PATH; export a GIF or PNG frames instead")
+        self.fps = fps
+        self.last = None
+        self.process = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+             "-c:v", "libx264", "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE)
+
+    def write(self, image):
+        self.last = image.tobytes()
+        self.process.stdin.write(self.last)
+
+    def close(self, hold):
+        if self.last is not None:
+            for _ in range(round(hold * self.fps)): # Video has no per-frame durations
+                self.process.stdin.write(self.last)
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed with exit code {self.process.returncode}")
+
+
+# --- Export ---
+def export_trace(trace, graph, positions, output, frames=None, max_frames=DEFAULT_MAX_FRAMES, fps=DEFAULT_FPS,
+                 size=DEFAULT_SIZE, hold=DEFAULT_HOLD, caption=True, workers=None, progress=None):
+    """Renders `trace` offscreen and writes it to `output`; returns the number of frames.
+
+    `positions` are the world (x, y) of each node, as used by the canvas.
+    `progress`, if given, is called with (frames done, frames total).
+    """
+    extension = os.path.splitext(output)[1].lower()
+    width, height = size
+    if extension == ".mp4": # yuv420p needs even dimensions
+        width += width % 2
+        height += height % 2
+    renderer = FrameRenderer(graph, positions, width, height, caption)
+    stops = frame_stops(trace, frames, max_frames)
+    code = traversal.PSEUDO_CODE.get(trace.algorithm, [])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if extension == ".gif":
+            writer = GifWriter(output, pool, fps)
+        elif extension == ".mp4":
+            writer = Mp4Writer(output, width, height, fps)
+        else:
+            writer = PngWriter(output, pool)
+        renderer.draw_all()
+        renderer.draw_caption(f"{trace.algorithm}  step 0 / {len(trace)}")
+        writer.write(renderer.image)
+        shown, line = 0, traversal.NONE
+        for done, stop in enumerate(stops, 1):
+            colors, edges, last_line = trace.changes(shown, stop)
+            renderer.apply(colors, edges)
+            shown = stop
+            if last_line != traversal.NONE:
+                line = last_line
+            text = f"{trace.algorithm}  step {stop} / {len(trace)}"
+            if line != traversal.NONE and line < len(code):
+                text += f"   {code[line].strip()}"
+            renderer.draw_caption(text)
+            writer.write(renderer.image)
+            if progress:
+                progress(done, len(stops))
+        writer.close(hold)
+    return len(stops) + 1
+
+
+def parse_size(text):
+    """Parses WIDTHxHEIGHT (e.g. 800x600)."""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width < 16 or height < 16:
+        raise argparse.ArgumentTypeError("the frame size must be at least 16x16")
+    return width, height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a graph traversal to PNG frames, a GIF or an MP4 without a display.")
+    parser.add_argument("graph", help="graph file (any format Open Graph... accepts)")
+    parser.add_argument("--output", "-o", required=True, help="file.gif, file.mp4 or a directory for PNG frames")
+    parser.add_argument("--algorithm", choices=list(traversal.ALGORITHMS), default="BFS")
+    parser.add_argument("--start", help="start node label (default: the first node)")
+    parser.add_argument("--goal", help="goal node label, for the shortest-path searches")
+    parser.add_argument("--heuristic", choices=list(traversal.HEURISTICS), default="Euclidean", help="for A*")
+    parser.add_argument("--trace", help="replay a trace saved with StepTrace.save() instead of running the algorithm;"
+                        " it must have been recorded on this graph (same node labels)")
+    parser.add_argument("--layout", choices=layout.LAYOUTS, default="Force")
+    parser.add_argument("--frames", type=int, help="split the run into this many evenly spaced frames")
+    parser.add_argument("--max-frames", type=int, default=DEFAULT_MAX_FRAMES,
+                        help="sample longer runs down to this many frames (0: no limit)")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="frames per second of a GIF or MP4")
+    parser.add_argument("--size", type=parse_size, default=DEFAULT_SIZE, help="frame size as WIDTHxHEIGHT")
+    parser.add_argument("--hold", type=float, default=DEFAULT_HOLD, help="seconds to show the final frame")
+    parser.add_argument("--workers", type=int, help="encoding threads (default: one per core, up to 32)")
+    parser.add_argument("--no-caption", action="store_true", help="leave out the step counter and code line")
+    args = parser.parse_args(argv)
+    if args.frames is not None and args.frames < 1:
+        parser.error("--frames must be at least 1")
+    if args.fps <= 0:
+        parser.error("--fps must be positive")
+
+    try:
+        graph = loaders.load_graph(args.graph)
+    except (OSError, ValueError, SyntaxError) as e:
+        parser.error(f"could not load {args.graph}: {e}")
+    if len(graph) == 0:
+        parser.error(f"{args.graph} contains no nodes")
+    start = graph.index.get(args.start, None) if args.start is not None else 0
+    goal = graph.index.get(args.goal, None) if args.goal is not None else traversal.NONE
+    if start is None or goal is None:
+        parser.error(f"no node labeled {args.start if start is None else args.goal!r} in {args.graph}")
+
+    started = time.perf_counter()
+    positions = layout.canvas_layout(args.layout, graph, *theme.world_size(len(graph)), theme.LAYOUT_MARGIN,
+                                     root=start)
+    if args.trace:
+        trace = traversal.StepTrace.load(args.trace)
+        if len(trace.labels) != len(graph):
+            parser.error(f"{args.trace} was recorded on a graph with {len(trace.labels)} nodes, not {len(graph)}")
+        if trace.labels != graph.labels:
+            parser.error(f"{args.trace} was recorded on a graph with other node labels than {args.graph}")
+    else:
+        try:
+            trace = traversal.run(args.algorithm, graph, start, goal=goal, coords=positions, heuristic=args.heuristic)
+        except ValueError as e: # E.g. negative edge weights
+            parser.error(str(e))
+    print(f"{len(graph)} nodes, {len(trace)} steps ({time.perf_counter() - started:.2f} s for layout and traversal)")
+
+    def show_progress(done, total):
+        if done == total or done % 25 == 0:
+            print(f"\rframe {done} / {total}", end="", flush=True)
+
+    started = time.perf_counter()
+    try:
+        count = export_trace(trace, graph, positions, args.output, frames=args.frames, max_frames=args.max_frames,
+                             fps=args.fps, size=args.size, hold=args.hold, caption=not args.no_caption,
+                             workers=args.workers, progress=show_progress)
+    except (RuntimeError, OSError) as e:
+        print(f"\nexport failed: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"\nwrote {count} frames to {args.output} in {elapsed:.2f} s ({count / elapsed:.0f} frames/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
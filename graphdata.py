@@ -0,0 +1,477 @@
+"""Compact graph storage for the traversal engine.
+
+Node labels are interned to integer ids 0..n-1 and adjacency is stored in
+compressed-sparse-row (CSR) form: the neighbors of node u are
+targets[offsets[u]:offsets[u + 1]]. Edge weights, if the graph has any,
+are kept in a parallel array. Labels are only needed at the UI boundary;
+algorithms work on the integer ids. This module must not import tkinter.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import json
+
+
+class Graph:
+    """Integer-indexed graph with CSR adjacency arrays."""
+    __slots__ = ("labels", "index", "offsets", "targets", "weights", "_reverse")
+
+    def __init__(self, labels, offsets, targets, index=None, weights=None):
+        self.labels = labels   # Node id -> label
+        if index is None:
+            index = {label: i for i, label in enumerate(labels)}
+        self.index = index     # Label -> node id
+        self.offsets = offsets # array('l') of len(labels) + 1 row starts
+        self.targets = targets # array('l') of neighbor ids, one row per node
+        self.weights = weights # array('d') parallel to targets, or None if every edge weighs 1
+        self._reverse = None   # Cached reverse()
+
+    @classmethod
+    def from_adjacency(cls, adjacency):
+        """Builds a Graph from a label-keyed adjacency dict such as `graph`."""
+        labels = list(adjacency)
+        index = {label: i for i, label in enumerate(labels)}
+        for neighbors in adjacency.values():
+            for v in neighbors:
+                if v not in index:
+                    index[v] = len(labels)
+                    labels.append(v)
+        offsets = array('l', [0])
+        targets = array('l')
+        for label in labels:
+            targets.extend([index[v] for v in adjacency.get(label, ())])
+            offsets.append(len(targets))
+        return cls(labels, offsets, targets)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getstate__(self):
+        # The reverse graph is only a cache; a worker process rebuilds it if needed
+        return self.labels, self.index, self.offsets, self.targets, self.weights
+
+    def __setstate__(self, state):
+        self.labels, self.index, self.offsets, self.targets, self.weights = state
+        self._reverse = None
+
+    @property
+    def num_edges(self):
+        """Number of stored (directed) adjacency entries."""
+        return len(self.targets)
+
+    def neighbors(self, node):
+        """Returns the neighbor ids of `node` as an array slice."""
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def degree(self, node):
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def edge_weights(self, node):
+        """Returns the weights of the edges of `node`, in the order of neighbors(node)."""
+        if self.weights is None:
+            return array('d', [1.0]) * self.degree(node)
+        return self.weights[self.offsets[node]:self.offsets[node + 1]]
+
+    def reverse(self):
+        """Returns the graph with every edge u -> v turned into v -> u (same node ids).
+
+        The result is built once, cached, and kept in step by every edit of
+        this graph; it shares the labels, so it must not be edited itself. If
+        every edge already has its reverse (with the same weight), as in an
+        undirected graph, the graph itself is returned.
+        """
+        if self._reverse is None:
+            self._reverse = self._build_reverse()
+        return self._reverse
+
+    def _build_reverse(self):
+        n = len(self.labels)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        counts = array('l', [0]) * (n + 1)
+        for v in targets:
+            counts[v + 1] += 1
+        for u in range(n):
+            counts[u + 1] += counts[u]
+        slots = counts[:-1]
+        rows = array('l', [0]) * len(targets)
+        rev_weights = array('d', [0.0]) * len(targets) if weights is not None else None
+        for u in range(n):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                rows[slots[v]] = u
+                if rev_weights is not None:
+                    rev_weights[slots[v]] = weights[i]
+                slots[v] += 1
+        for u in range(n):
+            forward = slice(offsets[u], offsets[u + 1])
+            backward = slice(counts[u], counts[u + 1])
+            if weights is None:
+                same = sorted(targets[forward]) == sorted(rows[backward])
+            else:
+                same = sorted(zip(targets[forward], weights[forward])) == sorted(zip(rows[backward], rev_weights[backward]))
+            if not same:
+                return Graph(self.labels, counts, rows, self.index, rev_weights)
+        return self
+
+    def edges(self):
+        """Yields every stored (u, v) adjacency entry."""
+        offsets, targets = self.offsets, self.targets
+        for u in range(len(self.labels)):
+            for i in range(offsets[u], offsets[u + 1]):
+                yield u, targets[i]
+
+    def to_adjacency(self):
+        """Converts back to a label-keyed adjacency dict."""
+        labels = self.labels
+        return {labels[u]: [labels[v] for v in self.neighbors(u)] for u in range(len(labels))}
+
+    # --- Editing ---
+    # Edits change the CSR arrays in place: an edge is inserted at the end of its
+    # row or deleted from it, which moves the later entries (one memmove) and
+    # shifts the later row offsets. No edit rebuilds the graph, and node ids stay
+    # the same, except that remove_node() gives the last node the removed id.
+    # A cached reverse() gets the mirrored edit, so it never has to be rebuilt.
+    def add_node(self, label):
+        """Adds an isolated node and returns its id (the existing id if `label` is taken)."""
+        node = self.index.get(label)
+        if node is None:
+            node = self.index[label] = len(self.labels)
+            self.labels.append(label)
+            self.offsets.append(self.offsets[-1])
+            if self._reverse is not None and self._reverse is not self:
+                self._reverse.offsets.append(self._reverse.offsets[-1])
+        return node
+
+    def add_edge(self, u, v, weight=None, directed=False):
+        """Adds the edge u -> v between node ids (and v -> u unless `directed`).
+
+        Returns the (u, v) adjacency entries that were added; entries that
+        already exist keep their weight.
+        """
+        reverse = self._mirror(not directed or u == v)
+        added = []
+        for a, b in ((u, v),) if directed or u == v else ((u, v), (v, u)):
+            if b in self.neighbors(a):
+                continue
+            self._insert_entry(a, b, weight)
+            if reverse is not None:
+                reverse._insert_entry(b, a, weight)
+            added.append((a, b))
+        return added
+
+    def remove_edge(self, u, v, directed=False):
+        """Removes the edge u -> v (and v -> u unless `directed`); returns the entries removed."""
+        reverse = self._mirror(not directed or u == v)
+        removed = []
+        for a, b in ((u, v),) if directed or u == v else ((u, v), (v, u)):
+            if b not in self.neighbors(a):
+                continue
+            self._delete_entry(a, b)
+            if reverse is not None:
+                reverse._delete_entry(b, a)
+            removed.append((a, b))
+        return removed
+
+    def remove_node(self, node):
+        """Removes `node` and all edges to and from it.
+
+        To keep ids dense, the last node takes over the id `node`. Returns
+        the old id of the node that moved, or None if `node` was the last.
+        The in-edges are found in reverse(), so only the rows of the
+        neighbors of `node` and of the last node are visited.
+        """
+        reverse = self.reverse()
+        mirror = reverse if reverse is not self else None # Removing every edge of a node keeps a graph symmetric
+        for u in set(reverse.neighbors(node)):
+            self._delete_entry(u, node)
+            if mirror is not None:
+                mirror._delete_entry(node, u)
+        for v in set(self.neighbors(node)):
+            self._delete_entry(node, v)
+            if mirror is not None:
+                mirror._delete_entry(v, node)
+        last = len(self.labels) - 1
+        del self.index[self.labels[node]]
+        if node == last:
+            self.labels.pop()
+            self.offsets.pop()
+            if mirror is not None:
+                mirror.offsets.pop()
+            return None
+
+        # Move the row of the last node to the (now empty) row of `node`, then
+        # point the edges to the last node at its new id
+        incoming, outgoing = reverse.neighbors(last), self.neighbors(last)
+        self._move_last_row(node)
+        self._retarget(incoming, last, node)
+        if mirror is not None:
+            mirror._move_last_row(node)
+            mirror._retarget(outgoing, last, node)
+        label = self.labels.pop()
+        self.labels[node] = label
+        self.index[label] = node
+        return last
+
+    def _mirror(self, symmetric):
+        """Returns the cached reverse that an edit must be mirrored in, or None.
+
+        A graph that is its own reverse stays so through a `symmetric` edit;
+        before any other edit, a copy of its arrays becomes its reverse.
+        """
+        reverse = self._reverse
+        if reverse is self:
+            if symmetric:
+                return None
+            weights = self.weights[:] if self.weights is not None else None
+            reverse = self._reverse = Graph(self.labels, self.offsets[:], self.targets[:], self.index, weights)
+        return reverse
+
+    def _insert_entry(self, a, b, weight=None):
+        """Appends b to the row of a."""
+        if weight is not None and weight != 1.0 and self.weights is None:
+            self.weights = array('d', [1.0]) * len(self.targets)
+        end = self.offsets[a + 1]
+        self.targets.insert(end, b)
+        if self.weights is not None:
+            self.weights.insert(end, 1.0 if weight is None else weight)
+        self._shift_rows(a + 1, 1)
+
+    def _delete_entry(self, a, b):
+        """Deletes b from the row of a."""
+        i = self.offsets[a] + self.neighbors(a).index(b)
+        del self.targets[i]
+        if self.weights is not None:
+            del self.weights[i]
+        self._shift_rows(a + 1, -1)
+
+    def _move_last_row(self, node):
+        """Moves the row of the last node into the empty row of `node` and drops the last offset."""
+        last = len(self.offsets) - 2
+        start, end = self.offsets[last], self.offsets[last + 1]
+        row = self.targets[start:end]
+        del self.targets[start:end]
+        if self.weights is not None:
+            row_weights = self.weights[start:end]
+            del self.weights[start:end]
+        self.offsets.pop()
+        at = self.offsets[node]
+        self.targets[at:at] = row
+        if self.weights is not None:
+            self.weights[at:at] = row_weights
+        self._shift_rows(node + 1, len(row))
+
+    def _retarget(self, rows, old, new):
+        """Replaces `old` with `new` in the given rows (ids from before `old` moved to `new`)."""
+        for u in rows:
+            if u == old:
+                u = new
+            self.targets[self.offsets[u] + self.neighbors(u).index(old)] = new
+
+    def _shift_rows(self, first, delta):
+        """Adds `delta` to the offsets of rows `first`..n (after an insert into or delete from row first-1)."""
+        offsets = self.offsets
+        offsets[first:] = array(offsets.typecode, [offset + delta for offset in offsets[first:]])
+
+    def save(self, path, **info):
+        """Saves the graph in a compact binary form (JSON header + raw arrays).
+
+        Extra keyword arguments are stored in the header and returned by
+        read_info(), e.g. to validate a cache entry.
+        """
+        labels = "\0".join(self.labels).encode("utf-8")
+        header = json.dumps(dict(info, nodes=len(self.labels), edges=len(self.targets),
+                                 labels=len(labels), weighted=self.weights is not None)).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(GRAPH_MAGIC)
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            f.write(labels)
+            self.offsets.tofile(f)
+            self.targets.tofile(f)
+            if self.weights is not None:
+                self.weights.tofile(f)
+
+    @staticmethod
+    def read_info(path):
+        """Returns the header dict of a file written by save()."""
+        with open(path, "rb") as f:
+            return _read_header(f)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a graph written by save()."""
+        with open(path, "rb") as f:
+            header = _read_header(f)
+            labels = f.read(header["labels"]).decode("utf-8")
+            labels = labels.split("\0") if header["nodes"] else []
+            offsets = array('l')
+            offsets.fromfile(f, header["nodes"] + 1)
+            targets = array('l')
+            targets.fromfile(f, header["edges"])
+            weights = None
+            if header.get("weighted"):
+                weights = array('d')
+                weights.fromfile(f, header["edges"])
+        return cls(labels, offsets, targets, weights=weights)
+
+
+GRAPH_MAGIC = b"GVG1"
+
+
+def _read_header(f):
+    if f.read(len(GRAPH_MAGIC)) != GRAPH_MAGIC:
+        raise ValueError("not a saved graph file")
+    size = int.from_bytes(f.read(4), "little")
+    return json.loads(f.read(size).decode("utf-8"))
+
+
+class GraphBuilder:
+    """Builds a Graph incrementally from a stream of nodes and edges.
+
+    Edges are appended to flat id arrays as they arrive and only turned into
+    CSR rows by build(), so no per-node Python lists are kept. The built
+    graph has weights only if at least one edge was given one; the other
+    edges then weigh 1.
+    """
+    __slots__ = ("labels", "index", "sources", "targets", "weights", "weighted")
+
+    def __init__(self):
+        self.labels = []
+        self.index = {}
+        self.sources = array('l')
+        self.targets = array('l')
+        self.weights = array('d')
+        self.weighted = False
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add_node(self, label):
+        """Interns `label` and returns its node id."""
+        node = self.index.get(label)
+        if node is None:
+            node = self.index[label] = len(self.labels)
+            self.labels.append(label)
+        return node
+
+    def add_edge(self, u, v, directed=False, weight=None):
+        """Adds the edge u -> v between two labels (and v -> u unless `directed`)."""
+        u = self.add_node(u)
+        v = self.add_node(v)
+        if weight is None:
+            weight = 1.0
+        else:
+            self.weighted = True
+        self.sources.append(u)
+        self.targets.append(v)
+        self.weights.append(weight)
+        if not directed and u != v:
+            self.sources.append(v)
+            self.targets.append(u)
+            self.weights.append(weight)
+
+    def build(self):
+        """Returns the Graph, with duplicate edges dropped and insertion order kept.
+
+        Of duplicate edges, the first one added (and its weight) is kept.
+        """
+        n = len(self.labels)
+        sources, targets = self.sources, self.targets
+        weights = self.weights if self.weighted else None
+
+        # Counting sort of the edges by source node
+        counts = array('l', [0]) * (n + 1)
+        for u in sources:
+            counts[u + 1] += 1
+        for u in range(n):
+            counts[u + 1] += counts[u]
+        slots = counts[:-1]
+        rows = array('l', [0]) * len(targets)
+        if weights is None:
+            for u, v in zip(sources, targets):
+                rows[slots[u]] = v
+                slots[u] += 1
+        else:
+            row_weights = array('d', [0.0]) * len(targets)
+            for u, v, w in zip(sources, targets, weights):
+                rows[slots[u]] = v
+                row_weights[slots[u]] = w
+                slots[u] += 1
+
+        offsets = array('l', [0])
+        out = array('l')
+        out_weights = array('d') if weights is not None else None
+        for u in range(n):
+            row = rows[counts[u]:counts[u + 1]]
+            if weights is None:
+                if len(row) > 1:
+                    row = dict.fromkeys(row) # Drop duplicates, keep first occurrence order
+                out.extend(row)
+            else:
+                first = {} # Neighbor: weight of its first edge
+                for v, w in zip(row, row_weights[counts[u]:counts[u + 1]]):
+                    first.setdefault(v, w)
+                out.extend(first)
+                out_weights.extend(first.values())
+            offsets.append(len(out))
+        return Graph(self.labels, offsets, out, self.index, out_weights)
+
+
+class Bitmap:
+    """Fixed-size set of node ids stored as one bit per node."""
+    __slots__ = ("bits",)
+
+    def __init__(self, size):
+        self.bits = bytearray((size + 7) >> 3)
+
+    def __contains__(self, node):
+        return self.bits[node >> 3] >> (node & 7) & 1 == 1
+
+    def add(self, node):
+        self.bits[node >> 3] |= 1 << (node & 7)
+
+    def discard(self, node):
+        self.bits[node >> 3] &= ~(1 << (node & 7)) & 0xFF
+
+    def clear(self):
+        self.bits[:] = bytes(len(self.bits))
+
+    def __len__(self):
+        return int.from_bytes(self.bits, "little").bit_count()
+
+
+class LabelIndex:
+    """Node labels sorted case-insensitively, for finding labels by prefix.
+
+    A prefix search is two binary searches plus the matches returned, so
+    a picker can search 100k+ labels on every keystroke. add() and remove()
+    keep it in step with graph edits.
+    """
+    __slots__ = ("keys", "labels")
+
+    def __init__(self, labels=()):
+        pairs = sorted(((str(label).casefold(), label) for label in labels), key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.labels = [label for _, label in pairs]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, label):
+        key = str(label).casefold()
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.labels.insert(i, label)
+
+    def remove(self, label):
+        key = str(label).casefold()
+        i = bisect_left(self.keys, key)
+        while self.labels[i] != label: # Labels that differ only in case share a key
+            i += 1
+        del self.keys[i], self.labels[i]
+
+    def prefix(self, text, limit):
+        """Returns up to `limit` labels starting with `text` (ignoring case), in sorted order."""
+        key = str(text).casefold()
+        i = bisect_left(self.keys, key)
+        end = min(bisect_left(self.keys, key + "\U0010ffff", i), i + limit)
+        return self.labels[i:end]
@@ -0,0 +1,396 @@
+"""Automatic node layouts for graphdata.Graph.
+
+Every layout works in abstract coordinates; to_canvas() fits the result to
+a canvas. layered_layout() and circular_layout() are single O(n + m)
+passes. ForceLayout is a Fruchterman-Reingold layout whose repulsion is
+approximated with a quadtree of uniform grids: exact between nodes in
+neighboring cells of the finest level, and between cell centroids at
+every coarser level (each pair of nodes at exactly one level, so every
+distance band is covered). An iteration costs about O(n) instead of
+O(n^2). It is refined a few iterations at a time with step(), which
+lets the GUI animate it between frames. NumPy is used for the force
+computation when it is installed; otherwise a pure-Python version of the
+same scheme runs.
+This module must not import tkinter.
+"""
+from array import array
+from collections import deque
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError: # Optional; ForceLayout falls back to pure Python
+    np = None
+
+COOLING = 0.92          # Temperature factor applied after every force iteration
+MIN_TEMPERATURE = 1e-3  # Force layout stops once moves are capped below this (in units of the layout width)
+GRAVITY = 0.01          # Pull towards the center, keeps disconnected parts together
+LEAF_NODES = 4          # Average nodes per cell at the finest level of the repulsion quadtree
+# Interaction list offsets: cells within 3 cells but outside the 3x3 block (filtered by parity)
+FAR_OFFSETS = tuple((ox, oy) for oy in range(-3, 4) for ox in range(-3, 4) if max(abs(ox), abs(oy)) >= 2)
+
+
+# --- Simple Layouts ---
+def circular_layout(graph):
+    """Places the nodes evenly on a circle, in id order."""
+    n = len(graph)
+    step = 2 * math.pi / max(n, 1)
+    xs = array('d', (math.cos(i * step) for i in range(n)))
+    ys = array('d', (math.sin(i * step) for i in range(n)))
+    return xs, ys
+
+
+def layered_layout(graph, root=0):
+    """Places nodes in rows by BFS depth from `root` (like a tree drawing).
+
+    Components not reachable from `root` are laid out below it, each from
+    its lowest node id.
+    """
+    n = len(graph)
+    offsets, targets = graph.offsets, graph.targets
+    level = array('l', [-1]) * n
+    rows = [] # Node ids per level, in discovery order
+    base = 0  # First level of the current component
+    for root_node in [root] + list(range(n)):
+        if n == 0 or level[root_node] != -1:
+            continue
+        level[root_node] = base
+        queue = deque([root_node])
+        while queue:
+            u = queue.popleft()
+            depth = level[u]
+            if depth == len(rows):
+                rows.append([])
+            rows[depth].append(u)
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if level[v] == -1:
+                    level[v] = depth + 1
+                    queue.append(v)
+        base = len(rows)
+
+    xs = array('d', [0.0]) * n
+    ys = array('d', [0.0]) * n
+    for depth, row in enumerate(rows):
+        for i, u in enumerate(row):
+            xs[u] = (i + 1) / (len(row) + 1)
+            ys[u] = depth
+    return xs, ys
+
+
+def to_canvas(xs, ys, width, height, margin, keep_aspect=True):
+    """Fits layout coordinates into a width x height canvas, as a list of (x, y)."""
+    if not len(xs):
+        return []
+    min_x, max_x = min(xs), max(xs)
+    min_y, max_y = min(ys), max(ys)
+    span_x, span_y = max_x - min_x, max_y - min_y
+    scale_x = (width - 2 * margin) / span_x if span_x else 0.0
+    scale_y = (height - 2 * margin) / span_y if span_y else 0.0
+    if keep_aspect:
+        scale_x = scale_y = min(s for s in (scale_x, scale_y) if s) if (scale_x or scale_y) else 0.0
+    # Center the drawing on the canvas
+    off_x = (width - span_x * scale_x) / 2 - min_x * scale_x
+    off_y = (height - span_y * scale_y) / 2 - min_y * scale_y
+    return [(x * scale_x + off_x, y * scale_y + off_y) for x, y in zip(xs, ys)]
+
+
+# --- Force-Directed Layout ---
+class ForceLayout:
+    """Incrementally refined, grid-accelerated force-directed layout.
+
+    Nodes repel each other (k^2 / d) and edges pull their ends together
+    (d^2 / k), where k is the ideal edge length. Call step() repeatedly
+    until it returns False; positions() returns the current coordinates.
+    """
+
+    def __init__(self, graph, xs=None, ys=None, seed=0):
+        n = len(graph)
+        self.n = n
+        self.k = math.sqrt(1.0 / max(n, 1)) # Ideal edge length for a unit-square drawing
+        self.temperature = 0.1
+        self.iterations = 0
+        if xs is None:
+            # Starting from the layered layout avoids most of the folds a random start
+            # leaves. Each row gets a band as tall as its share of the nodes and its
+            # nodes are scattered inside it, so the start density is even.
+            rng = random.Random(seed)
+            lx, ly = layered_layout(graph)
+            band_start = [0] * (int(max(ly, default=0)) + 2)
+            for y in ly:
+                band_start[int(y) + 1] += 1
+            band_size = band_start[1:]
+            for row in range(1, len(band_start)):
+                band_start[row] += band_start[row - 1]
+            xs = [x + rng.random() * self.k for x in lx]
+            ys = [(band_start[int(y)] + rng.random() * band_size[int(y)]) / n for y in ly]
+        # Each stored adjacency entry pulls with half strength, so undirected edges count once
+        sources = array('l')
+        for u in range(n):
+            sources.extend([u] * graph.degree(u))
+        if np is not None:
+            self.x = np.array(xs, dtype=np.float64)
+            self.y = np.array(ys, dtype=np.float64)
+            self.sources = np.frombuffer(sources, dtype=sources.typecode).astype(np.int64)
+            self.targets = np.frombuffer(graph.targets, dtype=graph.targets.typecode).astype(np.int64)
+        else:
+            self.x = array('d', xs)
+            self.y = array('d', ys)
+            self.sources = sources
+            self.targets = graph.targets
+
+    @property
+    def done(self):
+        return self.temperature < MIN_TEMPERATURE or self.n < 2
+
+    def positions(self):
+        """Returns the current (xs, ys) coordinates as arrays."""
+        if np is not None:
+            return array('d', self.x.tolist()), array('d', self.y.tolist())
+        return self.x, self.y
+
+    def step(self, iterations=1):
+        """Runs up to `iterations` force iterations; returns False once converged."""
+        for _ in range(iterations):
+            if self.done:
+                return False
+            if np is not None:
+                self._step_numpy()
+            else:
+                self._step_python()
+            self.temperature *= COOLING
+            self.iterations += 1
+        return not self.done
+
+    def _grid(self):
+        """Finest-level cell coordinates (gx, gy) of every node, and the number of levels.
+
+        Level L of the quadtree splits the bounding square into 2^L x 2^L
+        cells; the finest level holds about LEAF_NODES nodes per cell, and
+        the cells of a level are the parents (gx >> 1, gy >> 1) of the next.
+        """
+        depth = max(2, math.ceil(math.log(max(self.n / LEAF_NODES, 1.0), 4)))
+        side = 1 << depth
+        if np is not None:
+            min_x, min_y = self.x.min(), self.y.min()
+            span = max(float(self.x.max() - min_x), float(self.y.max() - min_y), 1e-9)
+            gx = np.minimum(((self.x - min_x) * (side / span)).astype(np.int64), side - 1)
+            gy = np.minimum(((self.y - min_y) * (side / span)).astype(np.int64), side - 1)
+        else:
+            min_x, min_y = min(self.x), min(self.y)
+            span = max(max(self.x) - min_x, max(self.y) - min_y, 1e-9)
+            gx = [min(int((v - min_x) * (side / span)), side - 1) for v in self.x]
+            gy = [min(int((v - min_y) * (side / span)), side - 1) for v in self.y]
+        return gx, gy, depth
+
+    def _step_numpy(self):
+        x, y, n, k = self.x, self.y, self.n, self.k
+        k2 = k * k
+        dx = np.zeros(n)
+        dy = np.zeros(n)
+        gx, gy, depth = self._grid()
+        side = 1 << depth
+
+        # Near field: exact repulsion between the nodes of each finest cell and of the
+        # 3x3 block around it; each pair of cells is visited once (a half stencil)
+        key = gy * side + gx
+        keys, cell_of, counts = np.unique(key, return_inverse=True, return_counts=True)
+        order = np.argsort(cell_of, kind="stable")
+        starts = np.cumsum(counts) - counts
+        kx, ky = keys % side, keys // side
+        for ox, oy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+            neighbor = _find_cells(keys, kx + ox, ky + oy, side)
+            found = neighbor >= 0
+            node_counts = np.where(found, counts[np.maximum(neighbor, 0)], 0)[cell_of]
+            total = int(node_counts.sum())
+            if not total:
+                continue
+            i = np.repeat(np.arange(n), node_counts)
+            # Position of each pair inside its node's run of candidates
+            within = np.arange(total) - np.repeat(np.cumsum(node_counts) - node_counts, node_counts)
+            j = order[np.repeat(starts[neighbor[cell_of]], node_counts) + within]
+            if (ox, oy) == (0, 0): # Same cell: each pair once
+                keep = i < j
+                i, j = i[keep], j[keep]
+            ex, ey = x[i] - x[j], y[i] - y[j]
+            force = k2 / np.maximum(ex * ex + ey * ey, 1e-12)
+            fx, fy = ex * force, ey * force
+            dx += np.bincount(i, fx, minlength=n) - np.bincount(j, fx, minlength=n)
+            dy += np.bincount(i, fy, minlength=n) - np.bincount(j, fy, minlength=n)
+
+        # Far field, level by level from the finest: a cell is repelled by the centroids
+        # of its interaction list (the children of its parent's neighbors that are not its
+        # own neighbors), so every pair outside the near field is counted at exactly one
+        # level. The force is computed at the cell's centroid and applied to its nodes.
+        mass = counts.astype(np.float64)
+        sum_x = np.bincount(cell_of, x, minlength=len(keys))
+        sum_y = np.bincount(cell_of, y, minlength=len(keys))
+        node_cell = cell_of
+        for level in range(depth, 1, -1):
+            side = 1 << level
+            cent_x, cent_y = sum_x / mass, sum_y / mass
+            kx, ky = keys % side, keys // side
+            fx = np.zeros(len(keys))
+            fy = np.zeros(len(keys))
+            for ox, oy in FAR_OFFSETS:
+                # Children of the parent's neighbors lie 2 below to 3 above an even
+                # coordinate, and 3 below to 2 above an odd one
+                ok = ((kx & 1) == 0) if ox == 3 else ((kx & 1) == 1) if ox == -3 else None
+                if oy in (3, -3):
+                    oky = (ky & 1) == (0 if oy == 3 else 1)
+                    ok = oky if ok is None else ok & oky
+                source = np.arange(len(keys)) if ok is None else np.nonzero(ok)[0]
+                other = _find_cells(keys, kx[source] + ox, ky[source] + oy, side)
+                found = other >= 0
+                source, other = source[found], other[found]
+                ex, ey = cent_x[source] - cent_x[other], cent_y[source] - cent_y[other]
+                force = k2 * mass[other] / np.maximum(ex * ex + ey * ey, 1e-12)
+                fx[source] += ex * force
+                fy[source] += ey * force
+            dx += fx[node_cell]
+            dy += fy[node_cell]
+            # Merge into the parent cells for the next level
+            keys, parent = np.unique((ky >> 1) * (side >> 1) + (kx >> 1), return_inverse=True)
+            mass = np.bincount(parent, mass, minlength=len(keys))
+            sum_x = np.bincount(parent, sum_x, minlength=len(keys))
+            sum_y = np.bincount(parent, sum_y, minlength=len(keys))
+            node_cell = parent[node_cell]
+
+        # Attraction along edges
+        s, t = self.sources, self.targets
+        if len(s):
+            ex, ey = x[t] - x[s], y[t] - y[s]
+            pull = np.sqrt(ex * ex + ey * ey) / k * 0.5
+            fx, fy = ex * pull, ey * pull
+            dx += np.bincount(s, fx, minlength=n) - np.bincount(t, fx, minlength=n)
+            dy += np.bincount(s, fy, minlength=n) - np.bincount(t, fy, minlength=n)
+
+        # Gravity towards the center of mass
+        dx -= GRAVITY * (x - x.mean()) / k
+        dy -= GRAVITY * (y - y.mean()) / k
+
+        # Move, capping each displacement at the current temperature
+        length = np.maximum(np.sqrt(dx * dx + dy * dy), 1e-12)
+        scale = np.minimum(length, self.temperature) / length
+        x += dx * scale
+        y += dy * scale
+
+    def _step_python(self):
+        x, y, n, k = self.x, self.y, self.n, self.k
+        k2 = k * k
+        dx = [0.0] * n
+        dy = [0.0] * n
+        gx, gy, depth = self._grid()
+
+        # Near field: exact repulsion from the nodes in the 3x3 block of finest cells
+        grid = {}
+        for i in range(n):
+            grid.setdefault((gx[i], gy[i]), []).append(i)
+        for (cx, cy), members in grid.items():
+            nearby = []
+            for oy in (-1, 0, 1):
+                for ox in (-1, 0, 1):
+                    nearby.extend(grid.get((cx + ox, cy + oy), ()))
+            for i in members:
+                xi, yi = x[i], y[i]
+                fx = fy = 0.0
+                for j in nearby:
+                    if i != j:
+                        ex, ey = xi - x[j], yi - y[j]
+                        force = k2 / max(ex * ex + ey * ey, 1e-12)
+                        fx += ex * force
+                        fy += ey * force
+                dx[i] += fx
+                dy[i] += fy
+
+        # Far field: the same interaction lists as the NumPy version. Each level's force
+        # is added to the cell's children on the way down, so a finest cell ends up with
+        # the sum over all its ancestors.
+        cells = {key: [len(members), sum(x[i] for i in members), sum(y[i] for i in members)]
+                 for key, members in grid.items()}
+        levels = []
+        for level in range(depth, 1, -1):
+            field = {}
+            for (cx, cy), (mass, sx, sy) in cells.items():
+                px, py = sx / mass, sy / mass
+                fx = fy = 0.0
+                for ox, oy in FAR_OFFSETS:
+                    if (ox == 3 and cx & 1) or (ox == -3 and not cx & 1) or \
+                       (oy == 3 and cy & 1) or (oy == -3 and not cy & 1):
+                        continue
+                    other = cells.get((cx + ox, cy + oy))
+                    if other is not None:
+                        ex, ey = px - other[1] / other[0], py - other[2] / other[0]
+                        force = k2 * other[0] / max(ex * ex + ey * ey, 1e-12)
+                        fx += ex * force
+                        fy += ey * force
+                field[(cx, cy)] = (fx, fy)
+            levels.append(field)
+            parents = {}
+            for (cx, cy), (mass, sx, sy) in cells.items():
+                parent = parents.setdefault((cx >> 1, cy >> 1), [0, 0.0, 0.0])
+                parent[0] += mass
+                parent[1] += sx
+                parent[2] += sy
+            cells = parents
+        total = {}
+        for field in reversed(levels): # Coarsest first
+            total = {(cx, cy): (fx + total.get((cx >> 1, cy >> 1), (0.0, 0.0))[0],
+                                fy + total.get((cx >> 1, cy >> 1), (0.0, 0.0))[1])
+                     for (cx, cy), (fx, fy) in field.items()}
+        for (cx, cy), members in grid.items():
+            fx, fy = total.get((cx, cy), (0.0, 0.0))
+            for i in members:
+                dx[i] += fx
+                dy[i] += fy
+
+        # Attraction along edges
+        for s, t in zip(self.sources, self.targets):
+            ex, ey = x[t] - x[s], y[t] - y[s]
+            pull = math.sqrt(ex * ex + ey * ey) / k * 0.5
+            dx[s] += ex * pull
+            dy[s] += ey * pull
+            dx[t] -= ex * pull
+            dy[t] -= ey * pull
+
+        # Gravity towards the center of mass, then capped moves
+        mean_x, mean_y = sum(x) / n, sum(y) / n
+        temperature = self.temperature
+        for i in range(n):
+            fx = dx[i] - GRAVITY * (x[i] - mean_x) / k
+            fy = dy[i] - GRAVITY * (y[i] - mean_y) / k
+            length = math.sqrt(fx * fx + fy * fy)
+            if length > 1e-12:
+                scale = min(length, temperature) / length
+                x[i] += fx * scale
+                y[i] += fy * scale
+
+
+def _find_cells(keys, cx, cy, side):
+    """Index of cell (cx, cy) of a level in its sorted `keys`, or -1 where it is empty or off the grid."""
+    inside = (cx >= 0) & (cx < side) & (cy >= 0) & (cy < side)
+    wanted = cy * side + cx
+    pos = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+    return np.where(inside & (keys[pos] == wanted), pos, -1)
+
+
+LAYOUTS = ("Layered", "Circular", "Force")
+
+
+def canvas_layout(name, graph, width, height, margin, root=0):
+    """Computes the LAYOUTS layout `name` and fits it to a width x height canvas.
+
+    The force layout is run until it settles. `root` is the top node of
+    the layered layout.
+    """
+    if name == "Layered":
+        xs, ys = layered_layout(graph, root)
+        return to_canvas(xs, ys, width, height, margin, keep_aspect=False)
+    if name == "Circular":
+        xs, ys = circular_layout(graph)
+    else:
+        force = ForceLayout(graph)
+        while force.step(100):
+            pass
+        xs, ys = force.positions()
+    return to_canvas(xs, ys, width, height, margin)
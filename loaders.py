@@ -0,0 +1,348 @@
+"""Graph file loaders.
+
+Reads edge lists / CSV, adjacency JSON and GraphML into a graphdata.Graph.
+Every loader streams its input (edge lists are memory-mapped, JSON is
+decoded incrementally, GraphML uses iterparse) and feeds a GraphBuilder, so
+the raw text is never held in memory. load_graph() keeps a binary copy of
+each parsed file in CACHE_DIR, so reopening an unchanged file only reads
+the arrays back. This module must not import tkinter.
+"""
+import codecs
+import hashlib
+import json
+import mmap
+import os
+import xml.etree.ElementTree as ET
+from array import array
+
+from graphdata import Graph, GraphBuilder
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "graph-visualizer")
+CACHE_VERSION = 2 # Version 2 added edge weights
+CHUNK_SIZE = 1 << 20       # Bytes read per chunk by the streaming parsers
+PROGRESS_INTERVAL = 1 << 16 # Records between progress callbacks
+
+# Header rows recognized in CSV edge lists (first two fields, in any case)
+EDGE_LIST_HEADERS = {("source", "target"), ("src", "dst"), ("from", "to"), ("u", "v"), ("node1", "node2")}
+
+
+# --- Edge List / CSV ---
+def load_edge_list(path, directed=False, progress=None, header=None):
+    """Loads a whitespace- or comma-separated edge list ("u v" per line).
+
+    Blank lines and lines starting with '#' or '%' are skipped. A line with
+    a single field adds an isolated node. A numeric third column is the
+    edge weight ("u v 2.5"); other extra columns are ignored.
+
+    `header` says whether the first line is a header row. By default it is
+    one only if it is comma-separated, starts with a known pair such as
+    "source,target", and neither name is a node label elsewhere in the
+    file; otherwise it is the first edge, with the same node ids and
+    neighbor order as if it had been read as one.
+    """
+    builder = GraphBuilder()
+    total = os.path.getsize(path)
+    if total == 0:
+        return builder.build()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        first = True
+        pending = None # Possible header row, decided once every label is known
+        for count, raw in enumerate(iter(mm.readline, b"")):
+            line = raw.strip()
+            if not line or line[0] in b"#%":
+                continue
+            fields = line.split(b",") if b"," in line else line.split()
+            fields = [field.strip().decode("utf-8") for field in fields]
+            if first:
+                first = False
+                if header:
+                    continue
+                if header is None and b"," in line and tuple(field.lower() for field in fields[:2]) in EDGE_LIST_HEADERS:
+                    pending = fields
+                    continue
+            if len(fields) == 1:
+                builder.add_node(fields[0])
+            else:
+                builder.add_edge(fields[0], fields[1], directed, _weight(fields))
+            if progress and count % PROGRESS_INTERVAL == 0:
+                progress(mm.tell(), total)
+    if pending is not None and (pending[0] in builder.index or pending[1] in builder.index):
+        builder = _with_first_edge(builder, pending, directed) # The names are nodes: an edge
+    if progress:
+        progress(total, total)
+    return builder.build()
+
+
+def _weight(fields):
+    """Returns the numeric third field of an edge list line, or None."""
+    if len(fields) > 2:
+        try:
+            return float(fields[2])
+        except ValueError:
+            pass
+    return None
+
+
+def _with_first_edge(builder, fields, directed):
+    """Returns a copy of `builder` with the edge of line `fields` added before all the others.
+
+    Node ids and neighbor order come out as if the edge had been read
+    first. Every edge is copied, but only for a first line that looked like
+    a header and turned out not to be one.
+    """
+    first = GraphBuilder()
+    first.add_edge(fields[0], fields[1], directed, _weight(fields))
+    ids = array('l', [first.add_node(label) for label in builder.labels])
+    first.sources.extend(ids[node] for node in builder.sources)
+    first.targets.extend(ids[node] for node in builder.targets)
+    first.weights.extend(builder.weights)
+    first.weighted = first.weighted or builder.weighted
+    return first
+
+
+# --- Adjacency JSON ---
+def load_adjacency_json(path, progress=None):
+    """Loads a JSON object mapping each node to a list of its neighbors.
+
+    The file has the same shape as the built-in `graph` dict, e.g.
+    {"A": ["B", "C"], "B": ["A"], ...}. For a weighted graph, a node maps
+    to an object of neighbor: weight pairs instead, e.g. {"A": {"B": 2.5}}.
+    It is decoded one neighbor at a time from fixed-size chunks, so even a
+    huge neighbor list is never decoded as a whole.
+    """
+    builder = GraphBuilder()
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        reader = _JsonChunkReader(f, total, progress)
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.expect("}")
+        else:
+            count = 0
+            while True:
+                label = reader.value()
+                if not isinstance(label, str):
+                    raise ValueError(f"{path}: expected a node label, got {label!r}")
+                reader.expect(":")
+                kind = reader.peek()
+                builder.add_node(label)
+                if kind == "{":
+                    for neighbor, weight in reader.entries():
+                        if not isinstance(weight, (int, float)):
+                            raise ValueError(f"{path}: weight of edge {label!r} -> {neighbor!r} must be a number")
+                        builder.add_edge(label, neighbor, directed=True, weight=float(weight))
+                elif kind == "[":
+                    for neighbor in reader.array():
+                        builder.add_edge(label, str(neighbor), directed=True)
+                else:
+                    raise ValueError(f"{path}: neighbors of {label!r} must be a list or an object")
+                count += 1
+                if progress and count % PROGRESS_INTERVAL == 0:
+                    reader.report()
+                if reader.peek() == "}":
+                    reader.expect("}")
+                    break
+                reader.expect(",")
+    if progress:
+        progress(total, total)
+    return builder.build()
+
+
+class _JsonChunkReader:
+    """Decodes consecutive JSON values from a binary file, one chunk at a time."""
+
+    def __init__(self, f, total, progress):
+        self.f = f
+        self.total = total
+        self.progress = progress
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Reads another chunk; returns False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        self.eof = not chunk
+        # Drop the consumed prefix so the buffer stays about one chunk long
+        self.buf = self.buf[self.pos:] + self.decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character ("" at end of file)."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"malformed JSON: expected {char!r} at byte ~{self.f.tell()}")
+        self.pos += 1
+
+    def array(self):
+        """Yields the values of the next JSON array one at a time.
+
+        Decoding the array as one value would start over from its first
+        element after every chunk read, which is quadratic in its length.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def entries(self):
+        """Yields the (key, value) pairs of the next JSON object one at a time, like array()."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key, self.value()
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def value(self):
+        """Decodes the next JSON value, reading more chunks while it is incomplete."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number may continue in the next chunk
+            if end == len(self.buf) and not self.eof and not isinstance(value, (str, list, dict)):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def report(self):
+        self.progress(self.f.tell(), self.total)
+
+
+# --- GraphML ---
+def load_graphml(path, progress=None):
+    """Loads the nodes and edges of the first graph in a GraphML file.
+
+    Edge weights are read from the edge data whose key is named "weight".
+    """
+    builder = GraphBuilder()
+    total = os.path.getsize(path)
+    directed = False
+    graph_elem = None
+    weight_key = None
+    count = 0
+    with open(path, "rb") as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if event == "end" and elem is graph_elem:
+                break # Any further graphs are ignored
+            if event == "start":
+                if tag == "graph" and graph_elem is None:
+                    graph_elem = elem
+                    directed = elem.get("edgedefault", "undirected") == "directed"
+                continue
+            if tag == "key":
+                if elem.get("attr.name") == "weight" and elem.get("for", "edge") in ("edge", "all"):
+                    weight_key = elem.get("id")
+                continue
+            if tag == "node":
+                builder.add_node(elem.get("id"))
+            elif tag == "edge":
+                edge_directed = elem.get("directed")
+                edge_directed = directed if edge_directed is None else edge_directed == "true"
+                weight = None
+                if weight_key is not None:
+                    for data in elem:
+                        if data.get("key") == weight_key and data.text:
+                            weight = float(data.text)
+                builder.add_edge(elem.get("source"), elem.get("target"), edge_directed, weight)
+            else:
+                continue
+            # Free the parsed element and detach it from the graph element
+            elem.clear()
+            if graph_elem is not None:
+                graph_elem.clear()
+            count += 1
+            if progress and count % PROGRESS_INTERVAL == 0:
+                progress(f.tell(), total)
+    if progress:
+        progress(total, total)
+    return builder.build()
+
+
+LOADERS = {
+    ".csv": load_edge_list,
+    ".txt": load_edge_list,
+    ".tsv": load_edge_list,
+    ".edges": load_edge_list,
+    ".el": load_edge_list,
+    ".json": load_adjacency_json,
+    ".graphml": load_graphml,
+    ".xml": load_graphml,
+}
+
+
+# --- Cache ---
+def cache_path(path):
+    """Returns the cache file used for the graph file at `path`."""
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, key + ".gvg")
+
+
+def load_graph(path, progress=None, use_cache=True):
+    """Loads a graph file, picking the loader from its extension.
+
+    The parsed graph is cached in binary form; the cache entry is reused as
+    long as the file's size and modification time are unchanged.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in LOADERS:
+        raise ValueError(f"Unsupported graph file type: {ext or path}")
+    stat = os.stat(path)
+    source = {"version": CACHE_VERSION, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    cached = cache_path(path)
+    if use_cache and os.path.exists(cached):
+        try:
+            info = Graph.read_info(cached)
+            if all(info.get(key) == value for key, value in source.items()):
+                graph = Graph.load(cached)
+                if progress:
+                    progress(stat.st_size, stat.st_size)
+                return graph
+        except (OSError, ValueError, EOFError):
+            pass # Unreadable cache entry; parse the file again
+
+    graph = LOADERS[ext](path, progress=progress)
+    if use_cache:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = cached + ".tmp"
+            graph.save(tmp, **source)
+            os.replace(tmp, cached)
+        except OSError:
+            pass # Caching is best effort
+    return graph
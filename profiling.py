@@ -0,0 +1,108 @@
+"""Lightweight instrumentation for the visualizer.
+
+A Profiler collects named counters, timings (count, total and a log2
+histogram of durations) and gauges (last value of e.g. the frontier size).
+Recording is a few dictionary updates and is skipped entirely while the
+profiler is disabled, so the GUI can leave its probes in place. snapshot()
+summarizes everything for display and export() writes it to a JSON file
+for offline analysis. This module must not import tkinter.
+"""
+import json
+import math
+import time
+
+HIST_BUCKETS = 24 # Bucket i holds durations in [2^i, 2^(i+1)) microseconds; the last one is open-ended
+
+
+class Profiler:
+    """Counters, timing histograms and gauges, keyed by phase name."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.started = time.perf_counter()
+        self.counters = {}   # name: count
+        self.timings = {}    # name: [count, total seconds, max seconds, histogram list]
+        self.gauges = {}     # name: last value
+        self.rates = {}      # name: events per second over the last window
+        self.window_start = self.started
+        self.window_counts = {}
+
+    # --- Recording ---
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name, seconds):
+        """Adds one timing sample of `seconds` to phase `name`."""
+        if not self.enabled:
+            return
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = [0, 0.0, 0.0, [0] * HIST_BUCKETS]
+        timing[0] += 1
+        timing[1] += seconds
+        if seconds > timing[2]:
+            timing[2] = seconds
+        micros = seconds * 1e6
+        bucket = int(math.log2(micros)) if micros >= 1 else 0
+        timing[3][min(bucket, HIST_BUCKETS - 1)] += 1
+
+    def gauge(self, name, value):
+        if self.enabled:
+            self.gauges[name] = value
+
+    # --- Reporting ---
+    def update_rates(self):
+        """Recomputes the per-second rate of every counter and timing since the last call."""
+        now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed <= 0:
+            return self.rates
+        counts = dict(self.counters)
+        counts.update((name, timing[0]) for name, timing in self.timings.items())
+        self.rates = {name: (count - self.window_counts.get(name, 0)) / elapsed for name, count in counts.items()}
+        self.window_counts = counts
+        self.window_start = now
+        return self.rates
+
+    def percentile(self, name, p):
+        """Upper bound (in seconds) of the histogram bucket holding the p-th fraction of `name`'s samples."""
+        timing = self.timings.get(name)
+        if timing is None or timing[0] == 0:
+            return 0.0
+        rank = p * timing[0]
+        seen = 0
+        for bucket, count in enumerate(timing[3]):
+            seen += count
+            if seen >= rank:
+                return min(2 ** (bucket + 1) / 1e6, timing[2])
+        return timing[2]
+
+    def snapshot(self):
+        """Returns everything recorded so far as plain data."""
+        timings = {}
+        for name, (count, total, longest, histogram) in self.timings.items():
+            timings[name] = {
+                "count": count,
+                "total_s": total,
+                "mean_ms": total / count * 1000 if count else 0.0,
+                "p50_ms": self.percentile(name, 0.5) * 1000,
+                "p95_ms": self.percentile(name, 0.95) * 1000,
+                "max_ms": longest * 1000,
+                "histogram_us": {f"{2 ** i}": n for i, n in enumerate(histogram) if n},
+            }
+        return {
+            "elapsed_s": time.perf_counter() - self.started,
+            "counters": dict(self.counters),
+            "timings": timings,
+            "gauges": dict(self.gauges),
+            "rates": dict(self.rates),
+        }
+
+    def export(self, path, **info):
+        """Writes snapshot() (plus any extra keyword fields) to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(info, **self.snapshot()), f, indent=1)
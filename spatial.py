@@ -0,0 +1,153 @@
+"""Uniform-grid spatial index over node positions.
+
+The grid has at most about MAX_CELLS cells however many nodes there are,
+so a query costs O(cells overlapped + nodes in them). The renderer uses it
+for viewport culling, and its per-cell centroids double as the aggregated
+points drawn when a view holds too many nodes. For hit-testing the pointer
+(hover and click selection) the renderer keeps a second grid from
+for_hit_testing(), with a few nodes per cell however many nodes there
+are, so nearest() looks at a handful of nodes. This module must not
+import tkinter.
+"""
+import math
+
+MAX_CELLS = 4096 # Upper bound on the number of grid cells
+HIT_NODES = 4    # Average nodes per cell of a hit-testing grid
+
+
+class SpatialGrid:
+    """Buckets node ids into square cells by their (x, y) position."""
+    __slots__ = ("positions", "cell_size", "min_x", "min_y", "cells", "centroids")
+
+    def __init__(self, positions, max_cells=MAX_CELLS, centroids=True):
+        self.positions = positions
+        if positions:
+            min_x = min(x for x, _ in positions)
+            min_y = min(y for _, y in positions)
+            span_x = max(x for x, _ in positions) - min_x
+            span_y = max(y for _, y in positions) - min_y
+        else:
+            min_x = min_y = span_x = span_y = 0.0
+        self.min_x, self.min_y = min_x, min_y
+        # Square cells sized so that the bounding box holds about max_cells of them
+        self.cell_size = max(math.sqrt(max(span_x, 1.0) * max(span_y, 1.0) / max_cells), 1.0)
+        cells = {}
+        size = self.cell_size
+        for node, (x, y) in enumerate(positions):
+            key = (int((x - min_x) // size), int((y - min_y) // size))
+            members = cells.get(key)
+            if members is None:
+                cells[key] = [node]
+            else:
+                members.append(node)
+        self.cells = cells
+        self.centroids = {} if centroids else None # Not kept up to date when None
+        for key, members in cells.items() if centroids else ():
+            self.centroids[key] = (sum(positions[i][0] for i in members) / len(members),
+                                   sum(positions[i][1] for i in members) / len(members))
+
+    @classmethod
+    def for_hit_testing(cls, positions):
+        """Returns a grid for nearest() with about HIT_NODES nodes per cell and no centroids.
+
+        The cells are sized for len(positions) nodes and insert() keeps
+        them, so a grid that nodes are added to slows down as its cells
+        fill; rebuild it once the node count has doubled, as the renderer
+        does.
+        """
+        return cls(positions, max_cells=max(len(positions) // HIT_NODES, 1), centroids=False)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def nearest(self, x, y, radius):
+        """Returns the id of the node nearest to (x, y) within `radius`, or None.
+
+        Only the cells overlapping the square around the point are searched,
+        so hit-testing costs about the same however many nodes there are.
+        """
+        positions = self.positions
+        best, best_distance = None, radius * radius
+        for _, members in self.cells_in(x - radius, y - radius, x + radius, y + radius):
+            for node in members:
+                nx, ny = positions[node]
+                distance = (nx - x) * (nx - x) + (ny - y) * (ny - y)
+                if distance <= best_distance:
+                    best, best_distance = node, distance
+        return best
+
+    # --- Updates ---
+    # The cell size and origin stay fixed, so nodes added far outside the
+    # original bounding box just land in new cells. Positions are read from
+    # the shared positions list: insert a node after setting its position,
+    # remove it before changing it.
+    def insert(self, node):
+        """Adds node id `node` at its current position."""
+        x, y = self.positions[node]
+        key = self.cell_of(x, y)
+        members = self.cells.setdefault(key, [])
+        count = len(members)
+        members.append(node)
+        if self.centroids is None:
+            return
+        cx, cy = self.centroids.get(key, (0.0, 0.0))
+        self.centroids[key] = ((cx * count + x) / (count + 1), (cy * count + y) / (count + 1))
+
+    def remove(self, node):
+        """Removes node id `node`, which must still be at the position it was inserted at."""
+        x, y = self.positions[node]
+        key = self.cell_of(x, y)
+        members = self.cells[key]
+        members.remove(node)
+        count = len(members)
+        if not count:
+            del self.cells[key]
+            if self.centroids is not None:
+                del self.centroids[key]
+            return
+        if self.centroids is None:
+            return
+        cx, cy = self.centroids[key]
+        self.centroids[key] = ((cx * (count + 1) - x) / count, (cy * (count + 1) - y) / count)
+
+    def move(self, node, x, y):
+        """Moves node id `node` to (x, y), updating the shared positions list too."""
+        self.remove(node)
+        self.positions[node] = (x, y)
+        self.insert(node)
+
+    def cell_of(self, x, y):
+        """Returns the key of the cell containing the point (x, y)."""
+        return (int((x - self.min_x) // self.cell_size), int((y - self.min_y) // self.cell_size))
+
+    def cells_in(self, x0, y0, x1, y1):
+        """Yields (key, members) for every non-empty cell overlapping the rectangle."""
+        cx0, cy0 = self.cell_of(x0, y0)
+        cx1, cy1 = self.cell_of(x1, y1)
+        cells = self.cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # The rectangle spans more cells than exist; filter the occupied ones instead
+            for key, members in cells.items():
+                if cx0 <= key[0] <= cx1 and cy0 <= key[1] <= cy1:
+                    yield key, members
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                members = cells.get((cx, cy))
+                if members:
+                    yield (cx, cy), members
+
+    def count(self, x0, y0, x1, y1):
+        """Upper bound on the nodes inside the rectangle (nodes in overlapping cells)."""
+        return sum(len(members) for _, members in self.cells_in(x0, y0, x1, y1))
+
+    def query(self, x0, y0, x1, y1):
+        """Returns the ids of the nodes inside the rectangle."""
+        positions = self.positions
+        found = []
+        for _, members in self.cells_in(x0, y0, x1, y1):
+            for node in members:
+                x, y = positions[node]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    found.append(node)
+        return found
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def tk_root():
+    """A hidden Tk root window; tests using it are skipped without a display."""
+    tk = pytest.importorskip("tkinter")
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"Tk is not available: {e}")
+    root.withdraw()
+    yield root
+    root.destroy()
@@ -0,0 +1,59 @@
+"""Tests for the playback logic of the app (need a Tk display)."""
+import pytest
+
+import app101
+import traversal
+
+
+@pytest.fixture
+def app(tk_root):
+    return app101.GraphVisualizerApp(tk_root)
+
+
+def test_instant_playback_is_split_into_chunks(app, monkeypatch):
+    trace = traversal.run("BFS", app.graph, 0)
+    list(app.replay_trace(trace))
+    expected_nodes = list(app.renderer.node_colors)
+    expected_edges = dict(app.renderer.edge_colors)
+    app.reset_visualization()
+
+    monkeypatch.setattr(app101, "FRAME_CHUNK", 7)
+    delays = list(app.replay_frames(trace, 1))
+    assert delays == [0] * (-(-len(trace) // 7) - 1)
+    assert app.renderer.node_colors == expected_nodes
+    assert app.renderer.edge_colors == expected_edges
+
+
+def test_open_graph_asks_before_stopping_a_run(app, monkeypatch):
+    asked, opened = [], []
+    monkeypatch.setattr(app101.filedialog, "askopenfilename", lambda **options: opened.append(True) or "")
+    app.run_visualization()
+    assert app.is_running
+
+    monkeypatch.setattr(app101.messagebox, "askyesno", lambda *args: asked.append(args) or False)
+    app.open_graph_file()
+    assert len(asked) == 1 and opened == [] and app.is_running
+
+    monkeypatch.setattr(app101.messagebox, "askyesno", lambda *args: True)
+    app.open_graph_file()
+    assert opened == [True]
+    assert not app.worker.busy and not app.scheduler.running
+
+
+def test_edits_match_a_fresh_render(app):
+    app.renderer.render()
+    applied = app.apply_edits([("add_edge", "A", "Z"), ("remove_node", "B"), ("remove_edge", "A", "C"),
+                               ("add_edge", "Z", "I"), ("remove_node", "missing")])
+    assert applied == 4
+    assert app.graph.to_adjacency()["Z"] == ["A", "I"]
+    edges, nodes = set(app.renderer.edge_objects), set(app.renderer.node_objects)
+    app.renderer.render()
+    assert set(app.renderer.edge_objects) == edges
+    assert set(app.renderer.node_objects) == nodes
+
+
+def test_edits_before_the_index_is_built(app):
+    app.move_nodes(list(app.positions)) # As a layout does; the index is rebuilt by the next render
+    assert app.apply_edits([("add_edge", "A", "Z"), ("remove_node", "A")]) == 2
+    app.renderer.render()
+    assert len(app.renderer.index) == len(app.graph) == 9
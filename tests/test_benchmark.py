@@ -0,0 +1,31 @@
+"""Tests for the benchmark harness (the render benchmark is not run)."""
+import json
+
+import benchmark
+
+
+def test_percentiles_use_nearest_rank():
+    stats = benchmark.percentiles([i / 1000 for i in range(1, 101)])
+    assert stats == {"p50_ms": 50.0, "p90_ms": 90.0, "p99_ms": 99.0, "max_ms": 100.0}
+    assert benchmark.percentiles([]) == {}
+
+
+def test_generators_are_deterministic():
+    for kind, generate in benchmark.GENERATORS.items():
+        first, _ = generate(200)
+        again, _ = generate(200)
+        assert first.offsets == again.offsets and first.targets == again.targets, kind
+    tree, _ = benchmark.deep_tree(200)
+    assert tree.num_edges == 2 * 199
+
+
+def test_main_writes_and_compares_results(tmp_path, capsys):
+    output = str(tmp_path / "bench.json")
+    argv = ["--nodes", "100", "--graphs", "grid", "--algorithms", "BFS", "--repeat", "1", "--no-render"]
+    benchmark.main(argv + ["--output", output])
+    with open(output, encoding="utf-8") as f:
+        report = json.load(f)
+    cases = {(record["bench"], record["case"]) for record in report["results"]}
+    assert ("traversal", "BFS") in cases and ("layout", "Force") in cases
+    benchmark.main(argv + ["--output", output, "--compare", output])
+    assert "traversal       grid       100 BFS" in capsys.readouterr().out
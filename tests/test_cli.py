@@ -0,0 +1,56 @@
+"""Tests for the command-line output of cli.py."""
+import csv
+import json
+
+import pytest
+
+import cli
+import loaders
+
+
+@pytest.fixture
+def graph_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "graph.csv"
+    path.write_text("A,B\nA,C\nB,D\nC,D\nD,E\n")
+    return str(path)
+
+
+def test_json_output(graph_file, capsys):
+    assert cli.main([graph_file, "--algorithm", "BFS", "--start", "A"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert (report["nodes"], report["adjacency_entries"], report["algorithm"]) == (5, 10, "BFS")
+    [run] = report["runs"]
+    assert run["start"] == "A" and run["order"] == ["A", "B", "C", "D", "E"]
+    assert run["parent"] == {"B": "A", "C": "A", "D": "B", "E": "D"}
+
+
+def test_csv_output_and_paths(graph_file, tmp_path):
+    output = tmp_path / "runs.csv"
+    assert cli.main([graph_file, "-a", "Dijkstra", "-s", "A", "E", "-g", "E", "--summary", "-o", str(output)]) == 0
+    rows = list(csv.DictReader(output.open(newline="")))
+    assert [(row["start"], row["goal"], row["path"]) for row in rows] == [("A", "E", "A B D E"), ("E", "E", "E")]
+
+    output = tmp_path / "order.csv"
+    assert cli.main([graph_file, "-s", "E", "-o", str(output)]) == 0
+    rows = list(csv.reader(output.open(newline="")))
+    assert rows[0] == ["start", "rank", "node", "parent"]
+    assert rows[1:3] == [["E", "0", "E", ""], ["E", "1", "D", "E"]]
+
+
+def test_all_starts_in_parallel_match_serial(graph_file, capsys):
+    cli.main([graph_file, "--all-starts", "--summary"])
+    serial = json.loads(capsys.readouterr().out)["runs"]
+    cli.main([graph_file, "--all-starts", "--summary", "--jobs", "2"])
+    parallel = json.loads(capsys.readouterr().out)["runs"]
+    strip = lambda runs: [dict(run, time_ms=None) for run in runs]
+    assert strip(parallel) == strip(serial)
+
+
+def test_errors(graph_file, capsys):
+    with pytest.raises(SystemExit):
+        cli.main([graph_file, "--start", "Z"])
+    assert "no node labeled Z" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        cli.main([graph_file, "--algorithm", "A*"])
+    assert "needs --goal" in capsys.readouterr().err
@@ -0,0 +1,65 @@
+"""Tests for the offscreen exporter: incremental frames against full redraws, and the command line."""
+import random
+
+import pytest
+
+import loaders
+import traversal
+from graphdata import GraphBuilder
+
+pytest.importorskip("PIL")
+from PIL import ImageChops
+
+import export
+
+
+def crowded_graph(n, edges, seed):
+    """Returns a random graph and random positions packed tightly enough for nodes and edges to overlap."""
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    for node in range(n):
+        builder.add_node(f"node {node}")
+    for _ in range(edges):
+        builder.add_edge(f"node {rng.randrange(n)}", f"node {rng.randrange(n)}")
+    graph = builder.build()
+    side = n ** 0.5 * 30
+    return graph, [(rng.random() * side, rng.random() * side) for _ in range(len(graph))]
+
+
+# Enough frames that most of them repaint tiles rather than falling back to draw_all()
+@pytest.mark.parametrize("n, edges, labeled, frames", [(40, 80, True, 12), (800, 1600, False, 200)])
+def test_apply_matches_draw_all(n, edges, labeled, frames):
+    graph, positions = crowded_graph(n, edges, seed=n)
+    trace = traversal.run("BFS", graph, 0)
+    renderer = export.FrameRenderer(graph, positions, 320, 240, caption=False)
+    assert renderer.labeled == labeled
+    renderer.draw_all()
+    full = export.FrameRenderer(graph, positions, 320, 240, caption=False)
+    shown = 0
+    for stop in export.frame_stops(trace, frames=frames):
+        colors, changed_edges, _ = trace.changes(shown, stop)
+        renderer.apply(colors, changed_edges)
+        shown = stop
+        full.node_colors = list(renderer.node_colors)
+        full.edge_colors = dict(renderer.edge_colors)
+        full.draw_all()
+        assert ImageChops.difference(renderer.image, full.image).getbbox() is None, f"frame at step {stop}"
+
+
+def test_main_writes_png_frames_and_checks_traces(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(loaders, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "graph.csv"
+    path.write_text("A,B\nB,C\nC,D\n")
+    frames = tmp_path / "frames"
+    argv = [str(path), "--layout", "Circular", "--size", "160x120", "--hold", "0"]
+    assert export.main(argv + ["--frames", "4", "--output", str(frames)]) == 0
+    assert len(list(frames.iterdir())) >= 4
+
+    other = tmp_path / "other.csv"
+    other.write_text("W,X\nX,Y\nY,Z\n") # Same size, other labels
+    graph = loaders.load_graph(str(other))
+    trace_path = tmp_path / "run.trace"
+    traversal.run("BFS", graph, 0).save(trace_path)
+    with pytest.raises(SystemExit):
+        export.main(argv + ["--trace", str(trace_path), "--output", str(tmp_path / "again")])
+    assert "other node labels" in capsys.readouterr().err
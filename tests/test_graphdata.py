@@ -0,0 +1,173 @@
+"""Tests for the CSR graph storage of graphdata."""
+import pickle
+import random
+from array import array
+
+import traversal
+from graphdata import Bitmap, Graph, LabelIndex
+from traversal import COLOR_PATH
+
+ADJACENCY = {
+    'A': ['B', 'C'],
+    'B': ['A', 'D'],
+    'C': ['A'],
+    'D': ['B', 'E'], # E has no row of its own
+}
+
+
+def test_csr_round_trip():
+    graph = Graph.from_adjacency(ADJACENCY)
+    assert graph.labels == ['A', 'B', 'C', 'D', 'E']
+    assert list(graph.offsets) == [0, 2, 4, 5, 7, 7]
+    assert list(graph.neighbors(graph.index['D'])) == [graph.index['B'], graph.index['E']]
+    assert graph.degree(graph.index['E']) == 0
+    assert graph.num_edges == 7
+    assert list(graph.edges())[:2] == [(0, 1), (0, 2)]
+    assert graph.to_adjacency() == dict(ADJACENCY, E=[])
+
+
+def test_save_and_load(tmp_path):
+    graph = Graph.from_adjacency(ADJACENCY)
+    path = str(tmp_path / "graph.gvg")
+    graph.save(path, source="test")
+    assert Graph.read_info(path)["source"] == "test"
+    loaded = Graph.load(path)
+    assert loaded.labels == graph.labels
+    assert loaded.offsets == graph.offsets and loaded.targets == graph.targets
+    empty = str(tmp_path / "empty.gvg")
+    Graph.from_adjacency({}).save(empty)
+    assert Graph.load(empty).labels == []
+
+
+def test_bitmap():
+    seen = Bitmap(20)
+    for node in (0, 7, 8, 19):
+        seen.add(node)
+    seen.discard(7)
+    assert [node for node in range(20) if node in seen] == [0, 8, 19]
+    assert len(seen) == 3
+    seen.clear()
+    assert len(seen) == 0
+
+
+def path_of(trace):
+    return [node for _, node, color, _, _ in trace if color == COLOR_PATH]
+
+
+def test_undirected_reverse_is_the_graph():
+    graph = Graph.from_adjacency({'a': ['b', 'c'], 'b': ['a'], 'c': ['a']})
+    assert graph.reverse() is graph
+
+
+def test_reverse_is_cached():
+    graph = Graph.from_adjacency({'a': ['b'], 'b': ['c'], 'c': []})
+    reverse = graph.reverse()
+    assert graph.reverse() is reverse
+    assert reverse.to_adjacency() == {'a': [], 'b': ['a'], 'c': ['b']}
+
+
+def test_reverse_with_different_weights_is_a_new_graph():
+    graph = Graph(['a', 'b'], array('l', [0, 1, 2]), array('l', [1, 0]), weights=array('d', [1.0, 2.0]))
+    reverse = graph.reverse()
+    assert reverse is not graph
+    assert list(reverse.edge_weights(0)) == [2.0]
+
+
+def test_pickle_drops_the_cache():
+    graph = Graph.from_adjacency({'a': ['b'], 'b': []})
+    graph.reverse()
+    copy = pickle.loads(pickle.dumps(graph))
+    assert copy._reverse is None
+    assert list(copy.reverse().neighbors(1)) == [0]
+
+
+def test_bidirectional_bfs_uses_the_reverse_graph():
+    graph = Graph.from_adjacency({'a': ['b'], 'b': ['c'], 'c': ['d'], 'd': []})
+    a, d = graph.index['a'], graph.index['d']
+    assert path_of(traversal.run("Bidirectional BFS", graph, a, d)) == [0, 1, 2, 3]
+    assert path_of(traversal.run("Bidirectional BFS", graph, d, a)) == []
+
+
+def test_remove_node_renumbers_the_last_node():
+    graph = Graph.from_adjacency({'a': ['b'], 'b': ['c', 'd'], 'c': ['d'], 'd': ['b', 'd']})
+    assert graph.remove_node(graph.index['b']) == 3
+    assert graph.labels == ['a', 'd', 'c']
+    assert graph.to_adjacency() == {'a': [], 'd': ['d'], 'c': ['d']}
+    assert graph.remove_node(graph.index['c']) is None
+    assert graph.to_adjacency() == {'a': [], 'd': ['d']}
+
+
+def random_edits(graph, rng, count, directed):
+    """Applies `count` random node and edge edits to `graph`."""
+    for i in range(count):
+        n = len(graph)
+        kind = rng.random()
+        if kind < 0.1 or n < 2:
+            graph.add_node(f"new{i}")
+        elif kind < 0.2:
+            graph.remove_node(rng.randrange(n))
+        elif kind < 0.6:
+            graph.add_edge(rng.randrange(n), rng.randrange(n), directed=directed)
+        else:
+            u = rng.randrange(n)
+            if graph.degree(u):
+                graph.remove_edge(u, rng.choice(graph.neighbors(u)), directed=directed)
+
+
+def rows(graph):
+    return [sorted(graph.neighbors(u)) for u in range(len(graph))]
+
+
+def test_edits_keep_the_reverse_in_step():
+    rng = random.Random(3)
+    for directed in (False, True):
+        adjacency = {i: [j for j in range(30) if j != i and rng.random() < 0.1] for i in range(30)}
+        graph = Graph.from_adjacency(adjacency)
+        if not directed:
+            graph = Graph.from_adjacency({u: sorted(set(vs) | {v for v in adjacency if u in adjacency[v]}) for u, vs in adjacency.items()})
+        graph.reverse()
+        for _ in range(20):
+            random_edits(graph, rng, 10, directed)
+            cached = graph.reverse()
+            fresh = Graph(list(graph.labels), graph.offsets[:], graph.targets[:])._build_reverse()
+            assert rows(cached) == rows(fresh)
+            assert cached.labels is graph.labels
+        assert (graph.reverse() is graph) == (not directed)
+
+
+def test_directed_edit_separates_a_symmetric_reverse():
+    graph = Graph.from_adjacency({'a': ['b'], 'b': ['a', 'c'], 'c': ['b']})
+    assert graph.reverse() is graph
+    graph.add_edge(graph.index['a'], graph.index['c'], directed=True)
+    reverse = graph.reverse()
+    assert reverse is not graph
+    assert reverse.to_adjacency() == {'a': ['b'], 'b': ['a', 'c'], 'c': ['b', 'a']}
+
+
+def test_bidirectional_bfs_follows_edits():
+    graph = Graph.from_adjacency({'a': ['b'], 'b': ['c'], 'c': []})
+    a, c = graph.index['a'], graph.index['c']
+    assert path_of(traversal.run("Bidirectional BFS", graph, a, c)) == [a, graph.index['b'], c]
+    d = graph.add_node('d')
+    graph.add_edge(a, d, directed=True)
+    graph.add_edge(d, c, directed=True)
+    graph.remove_node(graph.index['b'])
+    a, c, d = graph.index['a'], graph.index['c'], graph.index['d']
+    assert path_of(traversal.run("Bidirectional BFS", graph, a, c)) == [a, d, c]
+    assert path_of(traversal.run("Bidirectional BFS", graph, c, a)) == []
+
+
+def test_label_index_prefix_search():
+    index = LabelIndex(["beta", "Alpha", "alps", "ALE", "b", 12, "120"])
+    assert index.prefix("al", 10) == ["ALE", "Alpha", "alps"]
+    assert index.prefix("AL", 2) == ["ALE", "Alpha"]
+    assert index.prefix("12", 10) == [12, "120"]
+    assert index.prefix("", 3) == [12, "120", "ALE"]
+    assert index.prefix("x", 10) == []
+    index.add("alp")
+    index.remove("Alpha")
+    index.remove(12)
+    assert index.prefix("alp", 10) == ["alp", "alps"]
+    assert index.prefix("12", 10) == ["120"]
+    assert len(index) == 6
+    assert LabelIndex([1, "1", "B", "b"]).prefix("", 10) == [1, "1", "B", "b"] # Equal keys keep their order
@@ -0,0 +1,83 @@
+"""Convergence and accuracy tests for the force-directed layout."""
+import math
+import random
+
+import pytest
+
+import layout
+from graphdata import GraphBuilder
+
+
+def grid(side):
+    builder = GraphBuilder()
+    for row in range(side):
+        for col in range(side):
+            builder.add_node((row, col))
+            if col:
+                builder.add_edge((row, col - 1), (row, col))
+            if row:
+                builder.add_edge((row - 1, col), (row, col))
+    return builder.build()
+
+
+def scattered(n, seed=2):
+    """Returns an edgeless graph and random start coordinates for it."""
+    builder = GraphBuilder()
+    for node in range(n):
+        builder.add_node(node)
+    rng = random.Random(seed)
+    return builder.build(), [rng.random() for _ in range(n)], [rng.gauss(0.5, 0.15) for _ in range(n)]
+
+
+def repulsion(monkeypatch, graph, xs, ys, use_numpy):
+    """Returns the displacement of one uncapped, gravity-free step, i.e. the repulsive force."""
+    monkeypatch.setattr(layout, "np", layout.np if use_numpy else None)
+    monkeypatch.setattr(layout, "GRAVITY", 0.0)
+    force = layout.ForceLayout(graph, xs, ys)
+    force.temperature = 1e9
+    force.step()
+    after_x, after_y = force.positions()
+    return [a - b for a, b in zip(after_x, xs)], [a - b for a, b in zip(after_y, ys)]
+
+
+def test_grid_converges_untangled():
+    side = 20
+    graph = grid(side)
+    force = layout.ForceLayout(graph)
+    while force.step(10):
+        pass
+    assert force.iterations <= 100
+    xs, ys = force.positions()
+    edges = sorted(math.hypot(xs[u] - xs[v], ys[u] - ys[v]) for u in range(len(graph)) for v in graph.neighbors(u))
+    span = max(max(xs) - min(xs), max(ys) - min(ys))
+    # Unfolded: edges about one grid step long, opposite corners far apart, no collapsed nodes
+    assert edges[len(edges) // 2] < 2 * span / side
+    assert edges[0] > 0.2 * span / side
+    last = len(graph) - 1
+    assert math.hypot(xs[0] - xs[last], ys[0] - ys[last]) > 0.8 * span
+
+
+def test_repulsion_matches_all_pairs():
+    np = pytest.importorskip("numpy")
+    graph, xs, ys = scattered(1500)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        got_x, got_y = repulsion(monkeypatch, graph, xs, ys, use_numpy=True)
+    x, y = np.array(xs), np.array(ys)
+    ex, ey = x[:, None] - x[None, :], y[:, None] - y[None, :]
+    d2 = ex * ex + ey * ey
+    np.fill_diagonal(d2, np.inf)
+    k2 = 1.0 / len(graph)
+    want_x, want_y = (ex * k2 / d2).sum(1), (ey * k2 / d2).sum(1)
+    error = np.hypot(np.array(got_x) - want_x, np.array(got_y) - want_y) / np.median(np.hypot(want_x, want_y))
+    # Every distance band is approximated, so no node is far off
+    assert np.median(error) < 0.15
+    assert np.percentile(error, 99) < 0.5
+
+
+def test_python_step_matches_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    graph, xs, ys = scattered(600, seed=5)
+    fast_x, fast_y = repulsion(monkeypatch, graph, xs, ys, use_numpy=True)
+    slow_x, slow_y = repulsion(monkeypatch, graph, xs, ys, use_numpy=False)
+    scale = max(map(abs, fast_x + fast_y))
+    assert max(abs(a - b) for a, b in zip(fast_x + fast_y, slow_x + slow_y)) < 1e-9 * scale
@@ -0,0 +1,78 @@
+"""Tests for the graph file loaders."""
+import os
+
+import loaders
+
+
+def load(tmp_path, text, **options):
+    path = tmp_path / "graph.csv"
+    path.write_text(text)
+    return loaders.load_edge_list(str(path), **options)
+
+
+def test_csv_header_row_is_skipped(tmp_path):
+    graph = load(tmp_path, "source,target\nA,B\nB,C\n")
+    assert graph.labels == ["A", "B", "C"]
+    assert graph.num_edges == 4
+
+
+def test_first_edge_named_like_a_header_is_kept_in_order(tmp_path):
+    graph = load(tmp_path, "u,v\nv,w\nu,x\n")
+    assert graph.labels == ["u", "v", "w", "x"]
+    assert graph.to_adjacency() == {"u": ["v", "x"], "v": ["u", "w"], "w": ["v"], "x": ["u"]}
+
+
+def test_whitespace_first_line_is_an_edge(tmp_path):
+    graph = load(tmp_path, "from to\nA B\n")
+    assert graph.to_adjacency()["from"] == ["to"]
+
+
+def test_explicit_header_option(tmp_path):
+    assert "u" in load(tmp_path, "u,v\nA,B\n", header=False).index
+    assert "x" not in load(tmp_path, "x y\nA B\n", header=True).index
+
+
+def test_adjacency_json_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, "CHUNK_SIZE", 7)
+    neighbors = [f"n{i}" for i in range(200)]
+    path = tmp_path / "graph.json"
+    path.write_text('{"hub": [%s], "n0": []}' % ", ".join(f'"{label}"' for label in neighbors))
+    graph = loaders.load_adjacency_json(str(path))
+    assert graph.labels == ["hub"] + neighbors
+    assert graph.to_adjacency()["hub"] == neighbors
+
+
+
+def test_weights(tmp_path, monkeypatch):
+    graph = load(tmp_path, "u,v,2.5\nv,w,x\n")
+    assert graph.labels == ["u", "v", "w"]
+    assert list(graph.edge_weights(graph.index["v"])) == [2.5, 1.0]
+    monkeypatch.setattr(loaders, "CHUNK_SIZE", 5)
+    path = tmp_path / "graph.json"
+    path.write_text('{"a": {"b": 2, "c": 0.5}, "b": ["a"]}')
+    graph = loaders.load_adjacency_json(str(path))
+    assert list(graph.edge_weights(graph.index["a"])) == [2.0, 0.5]
+    assert list(graph.edge_weights(graph.index["b"])) == [1.0]
+
+def test_graphml_reads_only_the_first_graph(tmp_path):
+    path = tmp_path / "graph.graphml"
+    path.write_text(
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">'
+        '<graph edgedefault="directed"><node id="A"/><node id="B"/><edge source="A" target="B"/></graph>'
+        '<graph edgedefault="undirected"><node id="C"/><edge source="C" target="A"/></graph>'
+        '</graphml>')
+    graph = loaders.load_graphml(str(path))
+    assert graph.to_adjacency() == {"A": ["B"], "B": []}
+
+
+def test_load_graph_reuses_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "graph.csv"
+    path.write_text("A,B\nB,C\n")
+    os.utime(path, ns=(10**18, 10**18))
+    assert loaders.load_graph(str(path)).labels == ["A", "B", "C"]
+    path.write_text("X,Y\nY,Z\n")
+    os.utime(path, ns=(10**18, 10**18)) # Same size and time: the cache entry is used
+    assert loaders.load_graph(str(path)).labels == ["A", "B", "C"]
+    os.utime(path, ns=(2 * 10**18, 2 * 10**18))
+    assert loaders.load_graph(str(path)).labels == ["X", "Y", "Z"]
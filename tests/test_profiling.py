@@ -0,0 +1,44 @@
+"""Tests for the profiling counters, histograms and gauges."""
+import json
+
+from profiling import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    profiler.count("steps")
+    profiler.record("flush", 0.01)
+    profiler.gauge("frontier", 5)
+    snapshot = profiler.snapshot()
+    assert (snapshot["counters"], snapshot["timings"], snapshot["gauges"]) == ({}, {}, {})
+
+
+def test_timings_and_percentiles(tmp_path):
+    profiler = Profiler(enabled=True)
+    for _ in range(90):
+        profiler.record("flush", 0.000003) # Bucket [2, 4) us
+    for _ in range(10):
+        profiler.record("flush", 0.0005)   # Bucket [256, 512) us
+    profiler.count("steps", 7)
+    profiler.gauge("frontier", 12)
+    assert profiler.percentile("flush", 0.5) == 4e-6
+    assert profiler.percentile("flush", 0.95) == 0.0005 # Capped at the longest sample
+    assert profiler.percentile("missing", 0.5) == 0.0
+
+    path = tmp_path / "profile.json"
+    profiler.export(str(path), graph="grid")
+    data = json.loads(path.read_text())
+    assert data["graph"] == "grid"
+    assert data["counters"] == {"steps": 7} and data["gauges"] == {"frontier": 12}
+    assert data["timings"]["flush"]["count"] == 100
+    assert data["timings"]["flush"]["histogram_us"] == {"2": 90, "256": 10}
+
+
+def test_rates_count_events_since_the_last_window():
+    profiler = Profiler(enabled=True)
+    profiler.count("steps", 10)
+    profiler.window_start -= 2.0 # Pretend the window started two seconds ago
+    rates = profiler.update_rates()
+    assert 4.9 < rates["steps"] <= 5.0
+    profiler.window_start -= 1.0
+    assert profiler.update_rates()["steps"] < 0.1
@@ -0,0 +1,126 @@
+"""Tests for the viewport renderer of the app (need a Tk display)."""
+import math
+import tkinter as tk
+
+import pytest
+
+import app101
+import theme
+from graphdata import GraphBuilder
+
+
+@pytest.fixture
+def renderer(tk_root):
+    canvas = tk.Canvas(tk_root, width=theme.CANVAS_WIDTH, height=theme.CANVAS_HEIGHT)
+    return app101.GraphRenderer(canvas, ("Helvetica", 10))
+
+
+def star(leaves):
+    builder = GraphBuilder()
+    for i in range(leaves):
+        builder.add_edge("hub", f"n{i}")
+    return builder.build()
+
+
+def test_index_is_rebuilt_once_per_render(renderer):
+    graph = star(3)
+    renderer.set_graph(graph, [(100.0, 100.0), (50.0, 50.0), (150.0, 50.0), (100.0, 150.0)])
+    renderer.render()
+    for shift in (1.0, 2.0, 3.0): # e.g. layout progress messages arriving within one frame
+        renderer.set_positions([(x + shift, y) for x, y in renderer.positions])
+    assert renderer.index.positions[0] == (100.0, 100.0)
+    renderer.set_node_color(1, theme.NODE_COLOR_VISITED)
+    renderer.render()
+    assert renderer.index.positions[0] == (106.0, 100.0)
+    assert renderer.cell_colors[renderer.index.cell_of(56.0, 50.0)] == theme.NODE_COLOR_VISITED
+    assert set(renderer.node_objects) == {0, 1, 2, 3}
+
+
+def test_hub_edges_are_sampled(renderer, monkeypatch):
+    monkeypatch.setattr(app101, "MAX_EDGE_SCAN", 100)
+    leaves = 20000
+    graph = star(leaves)
+    # The hub and a few leaves are in view, the other leaves far to the right
+    positions = [(300.0, 200.0)] + [(200.0 + 50 * i, 100.0) if i < 5 else (5000.0 + i, 300.0)
+                                    for i in range(leaves)]
+    renderer.set_graph(graph, positions)
+    hidden = graph.index["n777"] # Not among the sampled entries of the hub's row
+    renderer.set_edge_color(0, hidden, theme.HIGHLIGHT_COLOR)
+    renderer.render()
+    assert (0, hidden) in renderer.edge_objects
+    assert all((0, graph.index[f"n{i}"]) in renderer.edge_objects for i in range(5))
+    assert len(renderer.canvas.find_all()) < 100
+
+
+def test_colors_are_applied_once_per_frame(renderer):
+    graph = star(3)
+    renderer.set_graph(graph, [(100.0, 100.0), (50.0, 50.0), (150.0, 50.0), (100.0, 150.0)])
+    renderer.render()
+    item = renderer.node_objects[1]
+    for color in (theme.NODE_COLOR_VISITING, theme.NODE_COLOR_CHECKING, theme.NODE_COLOR_VISITED):
+        renderer.set_node_color(1, color)
+    renderer.set_edge_color(0, 1, theme.HIGHLIGHT_COLOR)
+    assert renderer.canvas.itemcget(item, "fill") == theme.NODE_COLOR_DEFAULT
+    assert renderer.flush() == 2
+    assert renderer.canvas.itemcget(item, "fill") == theme.NODE_COLOR_VISITED
+    assert renderer.canvas.itemcget(renderer.edge_objects[(0, 1)], "fill") == theme.HIGHLIGHT_COLOR
+    assert renderer.flush() == 0
+
+
+def test_scheduler_runs_every_due_step_in_one_tick(tk_root):
+    done = []
+    scheduler = app101.StepScheduler(tk_root, on_finish=lambda: done.append(True))
+    scheduler.set_speed(app101.SPEED_MAX)
+    ran = []
+
+    def steps():
+        for i in range(100):
+            ran.append(i)
+            yield 1 # 1 ms at 4096x speed: far shorter than a timer tick
+
+    scheduler.start(steps())
+    scheduler._unschedule()
+    scheduler._tick()
+    assert len(ran) == 100 and done == [True]
+
+
+def test_reset_restores_only_touched_items(renderer):
+    graph = star(50)
+    positions = [(300.0, 200.0)] + [(300.0 + 150 * math.cos(i / 8), 200.0 + 150 * math.sin(i / 8))
+                                    for i in range(50)]
+    renderer.set_graph(graph, positions)
+    renderer.render()
+    renderer.set_node_color(3, theme.NODE_COLOR_VISITED)
+    renderer.set_node_color(0, theme.NODE_COLOR_START)
+    renderer.set_edge_color(0, 3, theme.HIGHLIGHT_COLOR)
+    renderer.flush()
+    assert renderer.touched_nodes == {0, 3}
+
+    renderer.reset_colors()
+    assert renderer.touched_nodes == set() and renderer.edge_colors == {}
+    assert renderer.dirty_nodes == {0, 3} and renderer.dirty_edges == {(0, 3)}
+    assert renderer.flush() == 3
+    assert set(renderer.node_colors) == {theme.NODE_COLOR_DEFAULT}
+    canvas = renderer.canvas
+    assert canvas.itemcget(renderer.node_objects[3], "fill") == theme.NODE_COLOR_DEFAULT
+    assert canvas.itemcget(renderer.edge_objects[(0, 3)], "fill") == theme.EDGE_COLOR_DEFAULT
+
+
+def test_node_at_uses_a_hit_grid_rebuilt_as_nodes_are_added(renderer):
+    graph = star(3)
+    renderer.set_graph(graph, [(100.0, 100.0), (50.0, 50.0), (150.0, 50.0), (100.0, 150.0)])
+    renderer.render()
+    sx, sy = renderer.to_screen(2)
+    assert renderer.node_at(sx + 1, sy) == 2
+    assert renderer.node_at(sx + 500, sy) is None
+    hit_index = renderer.hit_index
+    for i in range(4):
+        graph.add_node(f"new{i}")
+        renderer.add_node(60.0 + 10 * i, 120.0)
+    assert renderer.hit_index is hit_index # Four more nodes fit the cells built for four
+    assert renderer.node_at(*renderer.to_screen(7)) == 7
+    graph.add_node("new4")
+    renderer.add_node(200.0, 200.0)
+    assert renderer.hit_index is None
+    assert renderer.node_at(*renderer.to_screen(8)) == 8
+    assert renderer.hit_size == 9
@@ -0,0 +1,73 @@
+"""Tests for the uniform-grid spatial index."""
+import random
+
+from spatial import SpatialGrid
+
+
+def make_grid(n=2000, seed=1):
+    rng = random.Random(seed)
+    positions = [(rng.uniform(-500, 500), rng.uniform(0, 3000)) for _ in range(n)]
+    return positions, SpatialGrid(positions, max_cells=64)
+
+
+def test_query_matches_brute_force():
+    positions, grid = make_grid()
+    for rect in ((-100, 200, 50, 900), (-1000, -1000, 1000, 5000), (600, 0, 700, 10), (0, 0, 0, 0)):
+        x0, y0, x1, y1 = rect
+        expected = [node for node, (x, y) in enumerate(positions) if x0 <= x <= x1 and y0 <= y <= y1]
+        assert sorted(grid.query(*rect)) == expected
+        assert grid.count(*rect) >= len(expected)
+
+
+def test_cells_and_centroids():
+    positions, grid = make_grid()
+    assert len(grid.cells) <= 64 * 2
+    assert sum(len(members) for _, members in grid.cells_in(-500, 0, 500, 3000)) == len(positions)
+    for key, members in grid.cells.items():
+        assert all(grid.cell_of(*positions[node]) == key for node in members)
+        cx, cy = grid.centroids[key]
+        assert abs(cx - sum(positions[node][0] for node in members) / len(members)) < 1e-9
+
+
+def test_empty_grid():
+    grid = SpatialGrid([])
+    assert len(grid) == 0
+    assert grid.query(0, 0, 100, 100) == []
+
+
+def test_insert_remove_and_move():
+    positions, grid = make_grid(n=500)
+    rng = random.Random(2)
+    for node in range(0, 500, 3):
+        grid.move(node, rng.uniform(-800, 800), rng.uniform(-200, 3500))
+    positions.append((5000.0, 5000.0)) # Far outside the original bounding box
+    grid.insert(500)
+    grid.remove(7)
+    rect = (-900, -300, 900, 3600)
+    expected = [node for node, (x, y) in enumerate(positions) if node != 7 and rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]]
+    assert sorted(grid.query(*rect)) == expected
+    assert grid.query(4900, 4900, 5100, 5100) == [500]
+    for key, members in grid.cells.items():
+        cx, cy = grid.centroids[key]
+        assert abs(cx - sum(positions[node][0] for node in members) / len(members)) < 1e-6
+        assert abs(cy - sum(positions[node][1] for node in members) / len(members)) < 1e-6
+
+
+def test_nearest_matches_brute_force():
+    positions, grid = make_grid()
+    hit_grid = SpatialGrid.for_hit_testing(positions)
+    assert len(hit_grid.cells) > len(grid.cells) and hit_grid.centroids is None
+    rng = random.Random(5)
+    for _ in range(200):
+        x, y, radius = rng.uniform(-600, 600), rng.uniform(-100, 3100), rng.uniform(1, 60)
+        in_reach = [((nx - x) ** 2 + (ny - y) ** 2, node) for node, (nx, ny) in enumerate(positions)
+                    if (nx - x) ** 2 + (ny - y) ** 2 <= radius * radius]
+        expected = min(in_reach)[0] if in_reach else None
+        for found in (grid.nearest(x, y, radius), hit_grid.nearest(x, y, radius)):
+            if expected is None:
+                assert found is None
+            else:
+                nx, ny = positions[found]
+                assert (nx - x) ** 2 + (ny - y) ** 2 == expected
+    hit_grid.move(0, 10000.0, 10000.0)
+    assert hit_grid.nearest(10000.5, 10000.0, 1.0) == 0
@@ -0,0 +1,174 @@
+"""Regression tests for the headless traversal engine."""
+import io
+import random
+
+import traversal
+from graphdata import Graph
+from traversal import NONE
+
+# The built-in example graph of app101
+EXAMPLE = {
+    'A': ['B', 'C', 'D'],
+    'B': ['A', 'E'],
+    'C': ['A', 'F', 'G'],
+    'D': ['A', 'H'],
+    'E': ['B'],
+    'F': ['C'],
+    'G': ['C', 'I'],
+    'H': ['D'],
+    'I': ['G'],
+}
+
+BFS_COLORS = [
+    ('A', 'visiting'), ('A', 'visited'), ('B', 'visiting'), ('C', 'visiting'), ('D', 'visiting'),
+    ('B', 'visited'), ('E', 'visiting'), ('C', 'visited'), ('F', 'visiting'), ('G', 'visiting'),
+    ('D', 'visited'), ('H', 'visiting'), ('E', 'visited'), ('F', 'visited'), ('G', 'visited'),
+    ('I', 'visiting'), ('H', 'visited'), ('I', 'visited'),
+]
+
+
+def color_steps(trace):
+    labels = trace.labels
+    return [(labels[node], traversal.COLOR_NAMES[color]) for _, node, color, _, _ in trace if color != NONE]
+
+
+def test_bfs_trace_is_pinned():
+    graph = Graph.from_adjacency(EXAMPLE)
+    trace = traversal.run("BFS", graph, graph.index['A'])
+    assert len(trace) == 88
+    assert list(trace)[:4] == [(0, NONE, NONE, NONE, 4), (1, NONE, NONE, NONE, 4),
+                               (3, NONE, NONE, NONE, 4), (4, 0, 1, NONE, 4)]
+    assert color_steps(trace) == BFS_COLORS
+    assert [graph.labels[node] for node in trace.order] == list("ABCDEFGHI")
+    parents = {graph.labels[node]: graph.labels[trace.parent[node]] for node in trace.order
+               if trace.parent[node] != NONE}
+    assert parents == {'B': 'A', 'C': 'A', 'D': 'A', 'E': 'B', 'F': 'C', 'G': 'C', 'H': 'D', 'I': 'G'}
+
+
+def test_dfs_visit_order_is_pinned():
+    graph = Graph.from_adjacency(EXAMPLE)
+    trace = traversal.run("DFS", graph, graph.index['A'])
+    assert len(trace) == 106
+    assert [graph.labels[node] for node in trace.order] == list("ABECFGIDH")
+
+
+def test_saved_trace_loads_the_same_steps(tmp_path):
+    graph = Graph.from_adjacency(EXAMPLE)
+    for algorithm in ("DFS", "BFS", "Level BFS"):
+        trace = traversal.run(algorithm, graph, graph.index['A'])
+        path = tmp_path / "trace.bin"
+        trace.save(path)
+        loaded = traversal.StepTrace.load(path)
+        assert (loaded.algorithm, loaded.labels, loaded.start) == (trace.algorithm, trace.labels, trace.start)
+        assert list(loaded) == list(trace)
+        assert list(loaded.order) == list(trace.order)
+        assert list(loaded.parent) == list(trace.parent)
+        before, after = io.StringIO(), io.StringIO()
+        trace.dump(before)
+        loaded.dump(after)
+        assert after.getvalue() == before.getvalue()
+
+
+def replay(trace, start, stop, colors, edges):
+    """Applies steps start..stop-1 one by one."""
+    for line, node, color, edge, _ in list(trace)[start:stop]:
+        if color != NONE:
+            colors[node] = color
+        if edge != NONE:
+            edges.add((edge, node))
+
+
+def test_changes_match_step_by_step_replay():
+    graph = Graph.from_adjacency(EXAMPLE)
+    trace = traversal.run("DFS", graph, graph.index['A'])
+    for cuts in ([0, len(trace)], [0, 17, 50, 51, len(trace)]):
+        colors, edges, expected_colors, expected_edges = {}, set(), {}, set()
+        for start, stop in zip(cuts, cuts[1:]):
+            frame_colors, frame_edges, line = trace.changes(start, stop)
+            colors.update(frame_colors)
+            edges.update(frame_edges)
+            replay(trace, start, stop, expected_colors, expected_edges)
+            assert colors == expected_colors and edges == expected_edges
+            lines = [step[0] for step in list(trace)[start:stop] if step[0] != NONE]
+            assert line == (lines[-1] if lines else NONE)
+    assert set(colors.values()) == {traversal.COLOR_NAMES.index('visited')}
+
+
+def state_at(trace, step):
+    """Node colors, highlighted edges and code line after `step` steps, by full replay."""
+    colors, edges = [traversal.COLOR_DEFAULT] * len(trace.labels), set()
+    line = NONE
+    for step_line, node, color, edge, _ in list(trace)[:step]:
+        if step_line != NONE:
+            line = step_line
+        if color != NONE:
+            colors[node] = color
+        if edge != NONE:
+            edges.add(frozenset((edge, node)))
+    return colors, edges, line
+
+
+def test_timeline_diff_matches_full_replay():
+    graph = Graph.from_adjacency(EXAMPLE)
+    trace = traversal.run("BFS", graph, graph.index['A'])
+    timeline = traversal.Timeline(trace, interval=8)
+    moves = [(0, len(trace)), (len(trace), 0), (10, 13), (13, 10), (5, 40), (40, 41), (87, 3), (16, 16), (3, 11)]
+    for current, target in moves:
+        colors, edges, line = state_at(trace, current)
+        changed, added, removed, new_line = timeline.diff(current, target)
+        for node, color in changed.items():
+            colors[node] = color
+        edges |= {frozenset(edge) for edge in added}
+        edges -= {frozenset(edge) for edge in removed}
+        assert (colors, edges, new_line) == state_at(trace, target)
+        assert timeline.line_at(target) == new_line
+
+
+def bfs_depths(graph, root):
+    depth = [NONE] * len(graph)
+    if root == NONE:
+        return depth
+    depth[root] = 0
+    queue = [root]
+    for u in queue:
+        for v in graph.neighbors(u):
+            if depth[v] == NONE:
+                depth[v] = depth[u] + 1
+                queue.append(v)
+    return depth
+
+
+def test_bfs_levels_repair_matches_a_fresh_bfs():
+    rng = random.Random(4)
+    for directed in (False, True):
+        graph = Graph.from_adjacency({i: [j for j in range(40) if j != i and rng.random() < 0.05] for i in range(40)})
+        levels = traversal.BfsLevels(graph, 0)
+        assert list(levels.depth) == bfs_depths(graph, 0)
+        for i in range(300):
+            n = len(graph)
+            kind = rng.random()
+            before = list(levels.depth)
+            if kind < 0.1:
+                graph.add_node(f"new{i}")
+                levels.node_added()
+                changed = set()
+            elif kind < 0.15 and n > 2:
+                node = rng.randrange(n)
+                changed = set()
+                for v in list(graph.neighbors(node)):
+                    changed |= levels.edges_removed(graph.remove_edge(node, v, directed=True))
+                for u in set(graph.reverse().neighbors(node)):
+                    changed |= levels.edges_removed(graph.remove_edge(u, node, directed=True))
+                moved = graph.remove_node(node)
+                levels.node_removed(node, moved)
+                before = None
+            elif kind < 0.6:
+                changed = levels.edges_added(graph.add_edge(rng.randrange(n), rng.randrange(n), directed=directed))
+            else:
+                u = rng.randrange(n)
+                if not graph.degree(u):
+                    continue
+                changed = levels.edges_removed(graph.remove_edge(u, rng.choice(graph.neighbors(u)), directed=directed))
+            assert list(levels.depth) == bfs_depths(graph, levels.root)
+            if before is not None:
+                assert changed == {v for v in range(len(before)) if before[v] != levels.depth[v]}
@@ -0,0 +1,63 @@
+"""Tests for the background worker (thread pool only, so no processes are spawned)."""
+import time
+
+import pytest
+
+import traversal
+import worker
+from graphdata import Graph
+
+EXAMPLE = {'A': ['B', 'C'], 'B': ['A', 'D'], 'C': ['A', 'D'], 'D': ['B', 'C']}
+
+
+@pytest.fixture
+def pool():
+    jobs = worker.Worker(use_processes=False)
+    yield jobs
+    jobs.close()
+
+
+def wait_for(pool, timeout=10.0):
+    """Polls the worker until it has no live job; returns every event it sent."""
+    events = []
+    deadline = time.perf_counter() + timeout
+    while pool.busy:
+        assert time.perf_counter() < deadline, "worker timed out"
+        events.extend(pool.poll())
+        time.sleep(0.005)
+    return events
+
+
+def test_traversal_result_carries_its_timeline(pool):
+    graph = Graph.from_adjacency(EXAMPLE)
+    pool.run_traversal("BFS", graph, 0)
+    [(channel, kind, (trace, timeline))] = wait_for(pool)
+    assert (channel, kind) == ("run", worker.RESULT)
+    assert list(trace) == list(traversal.run("BFS", graph, 0))
+    assert timeline.trace is trace and len(timeline) == len(trace)
+
+
+def test_errors_and_superseded_jobs(pool):
+    graph = Graph.from_adjacency(EXAMPLE)
+    pool.run_traversal("No such algorithm", graph, 0)
+    [(channel, kind, message)] = wait_for(pool)
+    assert (channel, kind) == ("run", worker.ERROR) and message
+
+    pool.run_traversal("DFS", graph, 0)
+    pool.run_traversal("BFS", graph, 0) # Supersedes the DFS run
+    events = wait_for(pool)
+    assert [value[0].algorithm for _, _, value in events] == ["BFS"]
+
+    pool.run_traversal("DFS", graph, 0)
+    assert pool.cancel("run") and not pool.busy
+    assert pool.poll() == []
+
+
+def test_force_layout_streams_positions(pool):
+    graph = Graph.from_adjacency(EXAMPLE)
+    pool.compute_layout("Force", graph, 600, 400, 25)
+    events = wait_for(pool)
+    assert events[-1][:2] == ("layout", worker.RESULT)
+    positions = events[-1][2]
+    assert len(positions) == len(graph)
+    assert all(25 <= x <= 575 and 25 <= y <= 375 for x, y in positions)
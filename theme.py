@@ -0,0 +1,40 @@
+"""Sizes and colors shared by the Tk canvas and the offscreen exporter.
+
+Color names are Tk color names that Pillow understands as well, so a frame
+written by export.py looks like the canvas. This module must not import
+tkinter.
+"""
+import math
+
+# --- Sizes ---
+NODE_RADIUS = 20
+NODE_OUTLINE_WIDTH = 2
+EDGE_WIDTH = 2
+CANVAS_WIDTH = 600
+CANVAS_HEIGHT = 400
+LAYOUT_MARGIN = NODE_RADIUS + 5 # Keep laid out nodes this far from the canvas border
+NODE_SPACING = 3 * NODE_RADIUS # Typical distance between laid out nodes of large graphs (at zoom 1)
+LABEL_MIN_RADIUS = 8     # Below this on-screen node radius, nodes are drawn as unlabeled points
+POINT_RADIUS = 2         # Half size of a node drawn as a point
+
+# --- Colors ---
+NODE_COLOR_DEFAULT = "lightblue"
+NODE_COLOR_VISITING = "yellow"
+NODE_COLOR_VISITED = "deepskyblue"
+NODE_COLOR_START = "lightgreen"
+NODE_COLOR_CHECKING = "lightgrey"
+NODE_COLOR_PATH = "orange"
+TEXT_COLOR = "black"
+EDGE_COLOR_DEFAULT = "gray"
+HIGHLIGHT_COLOR = "lightcoral"
+SELECTION_COLOR = "blue" # Ring around the selected start node
+BACKGROUND_COLOR = "white"
+
+# Canvas colors for the traversal engine's color codes (indexed by code)
+NODE_COLORS = (NODE_COLOR_DEFAULT, NODE_COLOR_VISITING, NODE_COLOR_VISITED, NODE_COLOR_CHECKING, NODE_COLOR_PATH)
+
+
+def world_size(node_count):
+    """Size of the area to lay a graph out in; large graphs get room to spread out."""
+    spread = max(1.0, math.sqrt(node_count) * NODE_SPACING / CANVAS_HEIGHT)
+    return CANVAS_WIDTH * spread, CANVAS_HEIGHT * spread
@@ -0,0 +1,885 @@
+"""Headless graph traversal engine.
+
+Runs DFS, BFS, level-synchronous BFS, bidirectional BFS, Dijkstra and A* on
+a graphdata.Graph without any GUI and records every visualization step in a
+compact StepTrace. GraphVisualizerApp replays the trace on its canvas; the
+same trace can be saved, dumped as text and diffed in regression checks.
+This module must not import tkinter.
+"""
+from array import array
+from bisect import bisect_left
+from collections import deque
+import heapq
+import json
+import math
+
+from graphdata import Bitmap
+
+np = None # NumPy, imported by level_bfs on first use: importing it takes longer than most runs
+_numpy_checked = False
+
+# --- Pseudo Code ---
+DFS_CODE = [
+    "DFS(graph, start_node):",
+    "  visited = set()",
+    "  stack = [start_node]",
+    "  while stack:",
+    "    node = stack.pop()",
+    "    if node not in visited:",
+    "      mark node as visiting", # Visualization Step
+    "      visited.add(node)",
+    "      mark node as visited",  # Visualization Step
+    "      for neighbor in reversed(graph[node]):", # Reverse for visual order
+    "        if neighbor not in visited:",
+    "          stack.append(neighbor)",
+    "          mark edge to neighbor", # Visualization Step
+]
+
+BFS_CODE = [
+    "BFS(graph, start_node):",
+    "  visited = set()",
+    "  queue = deque([start_node])",
+    "  visited.add(start_node)",
+    "  mark start_node as visiting", # Visualization Step
+    "  while queue:",
+    "    node = queue.popleft()",
+    "    mark node as visited",    # Visualization Step
+    "    for neighbor in graph[node]:",
+    "      if neighbor not in visited:",
+    "        visited.add(neighbor)",
+    "        queue.append(neighbor)",
+    "        mark neighbor as visiting", # Visualization Step
+    "        mark edge to neighbor",   # Visualization Step
+]
+
+LEVEL_BFS_CODE = [
+    "LevelBFS(graph, start_node):",
+    "  visited = {start_node}",
+    "  frontier = [start_node]",
+    "  mark start_node as visiting",   # Visualization Step
+    "  while frontier:",
+    "    mark frontier as visited",    # Visualization Step (whole level at once)
+    "    neighbors = graph[frontier]", # One batch for the whole level
+    "    next = neighbors - visited",
+    "    visited |= next",
+    "    mark next as visiting",       # Visualization Step (whole level at once)
+    "    frontier = next",
+]
+
+BIDIRECTIONAL_BFS_CODE = [
+    "BidirectionalBFS(graph, start, goal):",
+    "  front, back = [start], [goal]",
+    "  mark start and goal as visiting", # Visualization Step
+    "  while front and back:",
+    "    side = smaller of front, back",
+    "    for node in side:",
+    "      mark node as visited",        # Visualization Step
+    "      for neighbor in graph[node]:",  # Reversed edges for the back side
+    "        if neighbor seen from the other side:",
+    "          mark path and return",    # Visualization Step
+    "        if neighbor not seen:",
+    "          mark neighbor as visiting", # Visualization Step
+    "    side = neighbors found",
+]
+
+DIJKSTRA_CODE = [
+    "Dijkstra(graph, start_node, goal):",
+    "  dist = {start_node: 0}",
+    "  heap = [(0, start_node)]",
+    "  mark start_node as visiting", # Visualization Step
+    "  while heap:",
+    "    d, node = heappop(heap)",
+    "    if node in settled: continue",
+    "    settle node, mark as visited", # Visualization Step
+    "    if node == goal: break",
+    "    for neighbor, w in graph[node]:",
+    "      if d + w < dist[neighbor]:",
+    "        dist[neighbor] = d + w",
+    "        heappush(heap, (d + w, neighbor))",
+    "        mark neighbor as visiting", # Visualization Step
+    "  mark path to goal",              # Visualization Step
+]
+
+ASTAR_CODE = [
+    "AStar(graph, start_node, goal, h):",
+    "  g = {start_node: 0}",
+    "  heap = [(h(start_node), start_node)]",
+    "  mark start_node as visiting", # Visualization Step
+    "  while heap:",
+    "    f, node = heappop(heap)",
+    "    if node in closed: continue",
+    "    close node, mark as visited", # Visualization Step
+    "    if node == goal: break",
+    "    for neighbor, w in graph[node]:",
+    "      if g[node] + w < g[neighbor]:",
+    "        g[neighbor] = g[node] + w",
+    "        heappush(heap, (g[neighbor] + h(neighbor), neighbor))",
+    "        mark neighbor as visiting", # Visualization Step
+    "  mark path to goal",             # Visualization Step
+]
+
+# --- Step Encoding ---
+# Node color codes; the GUI maps them to its own color names
+COLOR_DEFAULT = 0
+COLOR_VISITING = 1
+COLOR_VISITED = 2
+COLOR_CHECKING = 3 # Brief flash on an already visited node
+COLOR_PATH = 4     # Node on the path found to the goal
+COLOR_NAMES = ("default", "visiting", "visited", "checking", "path")
+
+NONE = -1 # Marks an unused field in a step (no line change, no color, no edge)
+
+# Delays are stored in quarters of one full step delay
+DELAY_FULL = 4
+DELAY_HALF = 2
+DELAY_QUARTER = 1
+
+FIELDS = ("line", "node", "color", "edge", "delay")
+STRIDE = len(FIELDS)
+
+CHECKPOINT_INTERVAL = 1 << 14 # Steps between Timeline snapshots; bounds the replay cost of a seek
+DIFF_CHUNK = 4096 # Bytes compared at once when diffing two color snapshots
+
+
+class StepTrace:
+    """Array-backed record of the visualization steps of one traversal.
+
+    Each step is the tuple (line, node, color, edge, delay): highlight code
+    line `line`, set node `node` to color code `color`, highlight the edge
+    between `edge` and `node`, then wait `delay` quarter steps. Unused fields
+    are NONE. Nodes are integer ids into `labels`.
+    """
+    __slots__ = ("algorithm", "labels", "start", "events", "order", "parent")
+
+    def __init__(self, algorithm, labels, start):
+        self.algorithm = algorithm
+        self.labels = labels
+        self.start = start
+        self.events = array('i')  # STRIDE ints per step, interleaved
+        self.order = array('i')   # Node ids in the order they were visited
+        self.parent = array('i', [NONE]) * len(labels) # Traversal tree
+
+    def __len__(self):
+        return len(self.events) // STRIDE
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("step index out of range")
+        offset = index * STRIDE
+        return tuple(self.events[offset:offset + STRIDE])
+
+    def __iter__(self):
+        it = iter(self.events)
+        return zip(*[it] * STRIDE)
+
+    def changes(self, start=0, stop=None):
+        """Returns the net effect of steps start..stop-1 as (colors, edges, line).
+
+        `colors` maps each recolored node to its last color code, `edges` lists
+        the highlighted (edge, node) pairs in order, and `line` is the last
+        highlighted code line (NONE if there is none). Applying them after the
+        state at `start` gives the state at `stop` without replaying each step.
+        """
+        if stop is None:
+            stop = len(self)
+        colors = {}
+        edges = {} # Used as an ordered set
+        last_line = NONE
+        it = iter(self.events[start * STRIDE:stop * STRIDE])
+        for line, node, color, edge, _ in zip(*[it] * STRIDE):
+            if line != NONE:
+                last_line = line
+            if color != NONE:
+                colors[node] = color
+            if edge != NONE:
+                edges[(edge, node)] = None
+        return colors, list(edges), last_line
+
+    def dump(self, fp):
+        """Writes the trace as readable text, one step per line, for diffing."""
+        labels = self.labels
+        fp.write(f"# {self.algorithm} from {labels[self.start]}: {len(self)} steps\n")
+        for line, node, color, edge, delay in self:
+            fp.write("\t".join((
+                str(line),
+                labels[node] if node != NONE else "-",
+                COLOR_NAMES[color] if color != NONE else "-",
+                labels[edge] if edge != NONE else "-",
+                str(delay),
+            )) + "\n")
+
+    def save(self, path):
+        """Saves the trace in a compact binary form (JSON header + raw arrays)."""
+        header = json.dumps({
+            "algorithm": self.algorithm, "labels": self.labels, "start": self.start,
+            "events": len(self.events), "order": len(self.order),
+        }).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            self.events.tofile(f)
+            self.order.tofile(f)
+            self.parent.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a trace written by save()."""
+        with open(path, "rb") as f:
+            size = int.from_bytes(f.read(4), "little")
+            header = json.loads(f.read(size).decode("utf-8"))
+            trace = cls(header["algorithm"], header["labels"], header["start"])
+            trace.events.fromfile(f, header["events"])
+            trace.order.fromfile(f, header["order"])
+            trace.parent = array('i')
+            trace.parent.fromfile(f, len(trace.labels))
+        return trace
+
+
+class Timeline:
+    """Random access to the states of a StepTrace, for seeking back and forth.
+
+    The state after `step` steps is the color code of every node plus the
+    highlighted edges. Node colors are snapshotted every `interval` steps
+    (one byte per node, so the frontier is the set of nodes still colored
+    visiting); any other state is the nearest earlier snapshot plus at most
+    `interval` steps replayed with StepTrace.changes(). Edges are only ever
+    added, so the step at which each one is first highlighted is enough to
+    know which ones are shown at any step.
+    """
+    __slots__ = ("trace", "interval", "checkpoints", "lines", "edge_keys", "edge_steps")
+
+    def __init__(self, trace, interval=CHECKPOINT_INTERVAL):
+        self.trace = trace
+        self.interval = interval
+        colors = bytearray(len(trace.labels)) # All COLOR_DEFAULT
+        self.checkpoints = [] # Node color codes after k * interval steps
+        self.lines = array('i') # Code line highlighted after k * interval steps
+        line = NONE
+        self.edge_keys = []   # Highlighted (edge, node) pairs in the order they first appear
+        self.edge_steps = array('i') # Step index at which each of them first appears
+        seen = set()
+        for step, (step_line, node, color, edge, _) in enumerate(trace):
+            if step % interval == 0:
+                self.checkpoints.append(bytes(colors))
+                self.lines.append(line)
+            if step_line != NONE:
+                line = step_line
+            if color != NONE:
+                colors[node] = color
+            if edge != NONE:
+                key = (edge, node) if edge < node else (node, edge)
+                if key not in seen:
+                    seen.add(key)
+                    self.edge_keys.append((edge, node))
+                    self.edge_steps.append(step)
+        if len(trace) % interval == 0:
+            self.checkpoints.append(bytes(colors))
+            self.lines.append(line)
+
+    def __len__(self):
+        return len(self.trace)
+
+    def colors_at(self, step):
+        """Returns the node color codes after `step` steps as a bytearray."""
+        base = step // self.interval * self.interval
+        colors = bytearray(self.checkpoints[step // self.interval])
+        for node, color in self.trace.changes(base, step)[0].items():
+            colors[node] = color
+        return colors
+
+    def line_at(self, step):
+        """Returns the code line highlighted after `step` steps (NONE if there is none)."""
+        events = self.trace.events
+        base = step // self.interval * self.interval
+        for offset in range((step - 1) * STRIDE, base * STRIDE - 1, -STRIDE):
+            if events[offset] != NONE:
+                return events[offset]
+        return self.lines[step // self.interval]
+
+    def diff(self, current, target):
+        """Returns what changes when moving the display from step `current` to step `target`.
+
+        The result is (colors, added, removed, line): the new color code of
+        every node that differs, the (edge, node) pairs to highlight and to
+        clear, and the code line to highlight. Short forward moves replay
+        the steps in between; other moves compare two snapshots.
+        """
+        if 0 <= target - current <= self.interval:
+            colors = self.trace.changes(current, target)[0]
+        else:
+            old, new = self.colors_at(current), self.colors_at(target)
+            colors = {}
+            # Compare in chunks so that only the differing parts are scanned per node
+            for start in range(0, len(new), DIFF_CHUNK):
+                stop = start + DIFF_CHUNK
+                if old[start:stop] != new[start:stop]:
+                    for node in range(start, min(stop, len(new))):
+                        if old[node] != new[node]:
+                            colors[node] = new[node]
+        # Edges first highlighted in [low, high) are the ones that appear or disappear
+        low = bisect_left(self.edge_steps, min(current, target))
+        high = bisect_left(self.edge_steps, max(current, target))
+        edges = self.edge_keys[low:high]
+        if target >= current:
+            return colors, edges, [], self.line_at(target)
+        return colors, [], edges, self.line_at(target)
+
+
+# --- Traversals ---
+def dfs(graph, start):
+    """Runs DFS on a Graph from node id `start` and returns its StepTrace."""
+    trace = StepTrace("DFS", graph.labels, start)
+    emit = trace.events.extend
+    visit = trace.order.append
+    parent = trace.parent
+    offsets, targets = graph.offsets, graph.targets
+    visited = Bitmap(len(graph)).bits # Tested inline below; method calls dominate the loop otherwise
+
+    emit((0, NONE, NONE, NONE, DELAY_FULL)) # DFS function call
+    emit((1, NONE, NONE, NONE, DELAY_FULL)) # visited = set()
+    emit((2, NONE, NONE, NONE, DELAY_FULL)) # stack = [start_node]
+    stack = [(start, NONE)] # Store (node, parent) for edge highlighting
+
+    while stack:
+        emit((3, NONE, NONE, NONE, DELAY_HALF)) # while stack:
+        node, parent_node = stack.pop()
+        emit((4, NONE, NONE, NONE, DELAY_FULL)) # node = stack.pop()
+        emit((5, NONE, NONE, NONE, DELAY_FULL)) # if node not in visited:
+        if not visited[node >> 3] & (1 << (node & 7)):
+            emit((6, node, COLOR_VISITING, parent_node, DELAY_FULL)) # mark node as visiting
+            visited[node >> 3] |= 1 << (node & 7)
+            visit(node)
+            parent[node] = parent_node
+            emit((7, NONE, NONE, NONE, DELAY_FULL)) # visited.add(node)
+            emit((8, node, COLOR_VISITED, NONE, DELAY_FULL)) # mark node as visited
+            emit((9, NONE, NONE, NONE, DELAY_HALF)) # for neighbor in reversed(graph[node]):
+            for neighbor in reversed(targets[offsets[node]:offsets[node + 1]]):
+                emit((10, NONE, NONE, NONE, DELAY_HALF)) # if neighbor not in visited:
+                if not visited[neighbor >> 3] & (1 << (neighbor & 7)):
+                    stack.append((neighbor, node))
+                    emit((11, NONE, NONE, NONE, DELAY_FULL)) # stack.append(neighbor)
+                else:
+                    # Briefly show the check on an already visited neighbor
+                    emit((NONE, neighbor, COLOR_CHECKING, NONE, DELAY_QUARTER))
+                    emit((NONE, neighbor, COLOR_VISITED, NONE, DELAY_QUARTER))
+        else:
+            # Briefly show the check on an already visited node from the stack
+            emit((NONE, node, COLOR_CHECKING, NONE, DELAY_QUARTER))
+            emit((NONE, node, COLOR_VISITED, NONE, DELAY_QUARTER))
+    return trace
+
+
+def bfs(graph, start):
+    """Runs BFS on a Graph from node id `start` and returns its StepTrace."""
+    trace = StepTrace("BFS", graph.labels, start)
+    emit = trace.events.extend
+    visit = trace.order.append
+    parent = trace.parent
+    offsets, targets = graph.offsets, graph.targets
+    visited = Bitmap(len(graph)).bits # Tested inline below; method calls dominate the loop otherwise
+
+    emit((0, NONE, NONE, NONE, DELAY_FULL)) # BFS function call
+    emit((1, NONE, NONE, NONE, DELAY_FULL)) # visited = set()
+    queue = deque([(start, NONE)]) # Store (node, parent) for edge highlighting
+    visited[start >> 3] |= 1 << (start & 7)
+    emit((3, NONE, NONE, NONE, DELAY_FULL)) # visited.add(start_node)
+    emit((4, start, COLOR_VISITING, NONE, DELAY_FULL)) # mark start_node as visiting
+
+    while queue:
+        emit((5, NONE, NONE, NONE, DELAY_HALF)) # while queue:
+        node, parent_node = queue.popleft()
+        visit(node)
+        parent[node] = parent_node
+        emit((6, NONE, NONE, NONE, DELAY_FULL)) # node = queue.popleft()
+        emit((7, node, COLOR_VISITED, parent_node, DELAY_FULL)) # mark node as visited
+        emit((8, NONE, NONE, NONE, DELAY_HALF)) # for neighbor in graph[node]:
+        for neighbor in targets[offsets[node]:offsets[node + 1]]:
+            emit((9, NONE, NONE, NONE, DELAY_HALF)) # if neighbor not in visited:
+            # Visited neighbors are already colored visiting/visited, so there is nothing to flash
+            if not visited[neighbor >> 3] & (1 << (neighbor & 7)):
+                visited[neighbor >> 3] |= 1 << (neighbor & 7)
+                emit((10, NONE, NONE, NONE, DELAY_FULL)) # visited.add(neighbor)
+                queue.append((neighbor, node))
+                emit((11, NONE, NONE, NONE, DELAY_FULL)) # queue.append(neighbor)
+                emit((12, neighbor, COLOR_VISITING, NONE, DELAY_FULL)) # mark neighbor as visiting
+                emit((13, neighbor, NONE, node, DELAY_FULL)) # mark edge to neighbor
+    return trace
+
+
+def level_bfs(graph, start):
+    """Runs a level-synchronous BFS from node id `start` and returns its StepTrace.
+
+    The frontier is expanded one whole level at a time. With NumPy, the
+    neighbors of a level are gathered, filtered and deduplicated with array
+    operations and the level's steps are written as one block; without it,
+    the same batches are built in pure Python.
+    """
+    trace = StepTrace("Level BFS", graph.labels, start)
+    emit = trace.events.extend
+    emit((0, NONE, NONE, NONE, DELAY_FULL)) # LevelBFS function call
+    emit((1, NONE, NONE, NONE, DELAY_FULL)) # visited = {start_node}
+    emit((2, NONE, NONE, NONE, DELAY_FULL)) # frontier = [start_node]
+    emit((3, start, COLOR_VISITING, NONE, DELAY_FULL)) # mark start_node as visiting
+    if _load_numpy() is not None:
+        _level_bfs_numpy(graph, start, trace)
+    else:
+        _level_bfs_python(graph, start, trace)
+    return trace
+
+
+def _load_numpy():
+    """Imports NumPy the first time it is needed; returns None if it is not installed."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError: # Optional; level_bfs falls back to pure Python
+            pass
+    return np
+
+
+def _emit_level(events, line, nodes, color, edges=None):
+    """Records one step for `line`, then recolors all `nodes` at once (no delay until the last)."""
+    events.extend((line, NONE, NONE, NONE, 0 if len(nodes) else DELAY_FULL))
+    if not len(nodes):
+        return
+    if np is not None and isinstance(nodes, np.ndarray):
+        block = np.empty((len(nodes), STRIDE), dtype=np.int32)
+        block[:, 0] = NONE
+        block[:, 1] = nodes
+        block[:, 2] = color
+        block[:, 3] = NONE if edges is None else edges
+        block[:, 4] = 0
+        block[-1, 4] = DELAY_FULL
+        events.frombytes(block.tobytes())
+        return
+    for i, node in enumerate(nodes):
+        events.extend((NONE, node, color, NONE if edges is None else edges[i],
+                       DELAY_FULL if i == len(nodes) - 1 else 0))
+
+
+def _level_bfs_python(graph, start, trace):
+    emit = trace.events.extend
+    parent = trace.parent
+    offsets, targets = graph.offsets, graph.targets
+    visited = Bitmap(len(graph)).bits
+    visited[start >> 3] |= 1 << (start & 7)
+    frontier = [start]
+    while frontier:
+        emit((4, NONE, NONE, NONE, DELAY_HALF)) # while frontier:
+        trace.order.extend(frontier)
+        _emit_level(trace.events, 5, frontier, COLOR_VISITED) # mark frontier as visited
+        emit((6, NONE, NONE, NONE, DELAY_HALF)) # neighbors = graph[frontier]
+        found, parents = [], []
+        for node in frontier:
+            for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                if not visited[neighbor >> 3] & (1 << (neighbor & 7)):
+                    visited[neighbor >> 3] |= 1 << (neighbor & 7)
+                    found.append(neighbor)
+                    parents.append(node)
+                    parent[neighbor] = node
+        emit((7, NONE, NONE, NONE, DELAY_HALF)) # next = neighbors - visited
+        emit((8, NONE, NONE, NONE, DELAY_HALF)) # visited |= next
+        _emit_level(trace.events, 9, found, COLOR_VISITING, parents) # mark next as visiting
+        emit((10, NONE, NONE, NONE, DELAY_HALF)) # frontier = next
+        frontier = found
+
+
+def _level_bfs_numpy(graph, start, trace):
+    emit = trace.events.extend
+    offsets = np.frombuffer(graph.offsets, dtype=graph.offsets.typecode).astype(np.int64)
+    if len(graph.targets):
+        targets = np.frombuffer(graph.targets, dtype=graph.targets.typecode).astype(np.int64)
+    else:
+        targets = np.zeros(0, dtype=np.int64)
+    visited = np.zeros(len(graph), dtype=bool)
+    visited[start] = True
+    parent = np.full(len(graph), NONE, dtype=np.int32)
+    frontier = np.array([start], dtype=np.int64)
+    while len(frontier):
+        emit((4, NONE, NONE, NONE, DELAY_HALF)) # while frontier:
+        trace.order.frombytes(frontier.astype(np.int32).tobytes())
+        _emit_level(trace.events, 5, frontier, COLOR_VISITED) # mark frontier as visited
+        emit((6, NONE, NONE, NONE, DELAY_HALF)) # neighbors = graph[frontier]
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        total = int(counts.sum())
+        if total:
+            # Position of every adjacency entry of the frontier, row after row
+            index = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            neighbors = targets[index]
+            sources = np.repeat(frontier, counts)
+            fresh = ~visited[neighbors]
+            neighbors, sources = neighbors[fresh], sources[fresh]
+            first = np.unique(neighbors, return_index=True)[1]
+            first.sort() # First discovery of each neighbor, in discovery order
+            found, parents = neighbors[first], sources[first]
+        else:
+            found = parents = np.zeros(0, dtype=np.int64)
+        emit((7, NONE, NONE, NONE, DELAY_HALF)) # next = neighbors - visited
+        visited[found] = True
+        parent[found] = parents
+        emit((8, NONE, NONE, NONE, DELAY_HALF)) # visited |= next
+        _emit_level(trace.events, 9, found, COLOR_VISITING, parents) # mark next as visiting
+        emit((10, NONE, NONE, NONE, DELAY_HALF)) # frontier = next
+        frontier = found
+    trace.parent = array('i', parent.tobytes())
+
+
+def bidirectional_bfs(graph, start, goal):
+    """Runs a bidirectional BFS between node ids `start` and `goal` and returns its StepTrace.
+
+    The two searches take turns expanding one level, always the side with
+    the smaller frontier; the backward search follows reversed edges. The
+    first meeting found lies on a shortest path, which is then marked.
+    """
+    if goal == NONE:
+        raise ValueError("Bidirectional BFS needs a goal node")
+    trace = StepTrace("Bidirectional BFS", graph.labels, start)
+    emit = trace.events.extend
+    visit = trace.order.append
+    parent = trace.parent # Parent in the search tree of the side that found the node
+    adjacency = (None, graph, graph.reverse()) # Indexed by side; the cached reverse is the graph itself if undirected
+    side_of = bytearray(len(graph)) # 0 = not seen, 1 = seen forward, 2 = seen backward
+
+    emit((0, NONE, NONE, NONE, DELAY_FULL)) # BidirectionalBFS function call
+    emit((1, NONE, NONE, NONE, DELAY_FULL)) # front, back = [start], [goal]
+    emit((2, start, COLOR_VISITING, NONE, DELAY_HALF)) # mark start and goal as visiting
+    emit((NONE, goal, COLOR_VISITING, NONE, DELAY_HALF))
+    side_of[start], side_of[goal] = 1, 2
+    frontiers = [None, [start], [goal]]
+    meet = (start, goal) if start == goal else None # (forward end, backward end)
+
+    while meet is None and frontiers[1] and frontiers[2]:
+        emit((3, NONE, NONE, NONE, DELAY_HALF)) # while front and back:
+        side = 1 if len(frontiers[1]) <= len(frontiers[2]) else 2
+        other = 3 - side
+        offsets, targets = adjacency[side].offsets, adjacency[side].targets
+        emit((4, NONE, NONE, NONE, DELAY_FULL)) # side = smaller of front, back
+        found = []
+        for node in frontiers[side]:
+            emit((5, NONE, NONE, NONE, DELAY_HALF)) # for node in side:
+            visit(node)
+            emit((6, node, COLOR_VISITED, NONE, DELAY_FULL)) # mark node as visited
+            emit((7, NONE, NONE, NONE, DELAY_HALF)) # for neighbor in graph[node]:
+            for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                emit((8, NONE, NONE, NONE, DELAY_HALF)) # if neighbor seen from the other side:
+                if side_of[neighbor] == other:
+                    meet = (node, neighbor) if side == 1 else (neighbor, node)
+                    break
+                emit((10, NONE, NONE, NONE, DELAY_HALF)) # if neighbor not seen:
+                if not side_of[neighbor]:
+                    side_of[neighbor] = side
+                    parent[neighbor] = node
+                    found.append(neighbor)
+                    emit((11, neighbor, COLOR_VISITING, node, DELAY_FULL)) # mark neighbor as visiting
+            if meet is not None:
+                break
+        else:
+            emit((12, NONE, NONE, NONE, DELAY_HALF)) # side = neighbors found
+        frontiers[side] = found
+
+    if meet is not None:
+        forward, backward = meet
+        path = _walk_back(parent, forward)
+        path.reverse()
+        if backward != forward:
+            path.extend(_walk_back(parent, backward))
+        _emit_path(emit, 9, path)
+    return trace
+
+
+def dijkstra(graph, start, goal=NONE):
+    """Runs Dijkstra's algorithm from node id `start` and returns its StepTrace.
+
+    Uses a binary heap with lazy deletion and the graph's edge weights
+    (every edge weighs 1 if it has none). With a `goal`, the search stops
+    once the goal is settled and the shortest path to it is marked.
+    """
+    return _best_first("Dijkstra", graph, start, goal, None)
+
+
+def astar(graph, start, goal, coords, heuristic="Euclidean"):
+    """Runs A* from node id `start` to `goal` and returns its StepTrace.
+
+    `coords` holds an (x, y) per node id, e.g. the layout shown on screen;
+    `heuristic` is a name in HEURISTICS or a distance function
+    f(ax, ay, bx, by). The distance is scaled by make_heuristic() so that
+    the search still finds a shortest path.
+    """
+    if goal == NONE:
+        raise ValueError("A* needs a goal node")
+    if coords is None or len(coords) != len(graph):
+        raise ValueError("A* needs a coordinate for every node")
+    distance = HEURISTICS[heuristic] if isinstance(heuristic, str) else heuristic
+    return _best_first("A*", graph, start, goal, make_heuristic(graph, coords, goal, distance))
+
+
+def _best_first(algorithm, graph, start, goal, heuristic):
+    """Dijkstra (heuristic None) or A* (heuristic h(node)); both share the line layout of their pseudo-code."""
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    if weights is not None and len(weights) and min(weights) < 0:
+        raise ValueError(f"{algorithm} needs non-negative edge weights")
+    trace = StepTrace(algorithm, graph.labels, start)
+    emit = trace.events.extend
+    visit = trace.order.append
+    parent = trace.parent
+    n = len(graph)
+    dist = array('d', [math.inf]) * n
+    tree = array('i', [NONE]) * n # Predecessor on the best path found so far
+    settled = Bitmap(n).bits
+
+    emit((0, NONE, NONE, NONE, DELAY_FULL)) # function call
+    dist[start] = 0.0
+    emit((1, NONE, NONE, NONE, DELAY_FULL)) # dist = {start_node: 0}
+    heap = [(0.0 if heuristic is None else heuristic(start), start)]
+    emit((2, NONE, NONE, NONE, DELAY_FULL)) # heap = [(0, start_node)]
+    emit((3, start, COLOR_VISITING, NONE, DELAY_FULL)) # mark start_node as visiting
+
+    while heap:
+        emit((4, NONE, NONE, NONE, DELAY_HALF)) # while heap:
+        node = heapq.heappop(heap)[1]
+        emit((5, NONE, NONE, NONE, DELAY_FULL)) # d, node = heappop(heap)
+        emit((6, NONE, NONE, NONE, DELAY_HALF)) # if node in settled: continue
+        if settled[node >> 3] & (1 << (node & 7)):
+            # Stale heap entry; briefly show the check on the settled node
+            emit((NONE, node, COLOR_CHECKING, NONE, DELAY_QUARTER))
+            emit((NONE, node, COLOR_VISITED, NONE, DELAY_QUARTER))
+            continue
+        settled[node >> 3] |= 1 << (node & 7)
+        visit(node)
+        parent[node] = tree[node]
+        emit((7, node, COLOR_VISITED, tree[node], DELAY_FULL)) # settle node, mark as visited
+        emit((8, NONE, NONE, NONE, DELAY_HALF)) # if node == goal: break
+        if node == goal:
+            break
+        emit((9, NONE, NONE, NONE, DELAY_HALF)) # for neighbor, w in graph[node]:
+        d = dist[node]
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[i]
+            candidate = d + (1.0 if weights is None else weights[i])
+            emit((10, NONE, NONE, NONE, DELAY_HALF)) # if d + w < dist[neighbor]:
+            if candidate < dist[neighbor]:
+                dist[neighbor] = candidate
+                tree[neighbor] = node
+                emit((11, NONE, NONE, NONE, DELAY_FULL)) # dist[neighbor] = d + w
+                heapq.heappush(heap, (candidate if heuristic is None else candidate + heuristic(neighbor), neighbor))
+                emit((12, NONE, NONE, NONE, DELAY_FULL)) # heappush(heap, ...)
+                emit((13, neighbor, COLOR_VISITING, NONE, DELAY_FULL)) # mark neighbor as visiting
+
+    if goal != NONE and settled[goal >> 3] & (1 << (goal & 7)):
+        path = _walk_back(parent, goal)
+        path.reverse()
+        _emit_path(emit, 14, path)
+    return trace
+
+
+def _walk_back(parent, node):
+    """Returns [node, parent, grandparent, ...] up to the root of its search tree."""
+    path = [node]
+    while parent[path[-1]] != NONE:
+        path.append(parent[path[-1]])
+    return path
+
+
+def _emit_path(emit, line, path):
+    """Marks the nodes and edges of `path` in order, starting with a step for `line`."""
+    emit((line, NONE, NONE, NONE, DELAY_HALF))
+    previous = NONE
+    for node in path:
+        emit((NONE, node, COLOR_PATH, previous, DELAY_HALF))
+        previous = node
+
+
+# --- Incremental BFS Levels ---
+class BfsLevels:
+    """Hop distance of every node from `root`, kept up to date as the graph is edited.
+
+    Built with one BFS, then repaired after each edit by visiting only the
+    nodes whose distance changes: an added edge lowers distances downstream
+    of its head, and a removed edge raises the distances of the nodes that
+    lost their last shortest path, which are then recomputed from their
+    unaffected in-neighbors. Incoming edges come from graph.reverse(), which
+    the graph keeps in step with its edits. Unreachable nodes have depth NONE.
+    """
+
+    def __init__(self, graph, root):
+        self.graph = graph
+        self.root = root
+        self.depth = array('l', [NONE]) * len(graph)
+        self.depth[root] = 0
+        self._lower([root])
+
+    # Call these right after making the same edit to the graph; each returns the set
+    # of nodes whose depth changed.
+    def edges_added(self, entries):
+        """Updates the depths for the (u, v) adjacency entries returned by Graph.add_edge()."""
+        depth, changed = self.depth, set()
+        for u, v in entries:
+            if depth[u] != NONE and (depth[v] == NONE or depth[u] + 1 < depth[v]):
+                depth[v] = depth[u] + 1
+                changed.add(v)
+                changed |= self._lower([v])
+        return changed
+
+    def edges_removed(self, entries):
+        """Updates the depths for the (u, v) adjacency entries returned by Graph.remove_edge()."""
+        depth = self.depth
+        lost = []
+        for u, v in entries:
+            if depth[u] != NONE and depth[v] == depth[u] + 1 and not self._supported(v, ()):
+                lost.append(v)
+        if not lost:
+            return set()
+        # Collect the nodes left without a shortest path, shallowest first, so that a
+        # child is judged only after every affected node a level above it is known
+        affected = set()
+        heap = [(depth[v], v) for v in lost]
+        heapq.heapify(heap)
+        offsets, targets = self.graph.offsets, self.graph.targets
+        while heap:
+            d, x = heapq.heappop(heap)
+            if x in affected:
+                continue
+            affected.add(x)
+            for y in targets[offsets[x]:offsets[x + 1]]:
+                if depth[y] == d + 1 and y not in affected and not self._supported(y, affected):
+                    heapq.heappush(heap, (d + 1, y))
+        # Recompute them from their unaffected in-neighbors (Dijkstra with unit weights)
+        reverse = self.graph.reverse()
+        old = {x: depth[x] for x in affected}
+        for x in affected:
+            depth[x] = NONE
+        heap = []
+        for x in affected:
+            best = min((depth[w] for w in reverse.neighbors(x) if depth[w] != NONE), default=NONE)
+            if best != NONE:
+                heap.append((best + 1, x))
+        heapq.heapify(heap)
+        while heap:
+            d, x = heapq.heappop(heap)
+            if depth[x] != NONE:
+                continue
+            depth[x] = d
+            for y in targets[offsets[x]:offsets[x + 1]]:
+                if y in affected and depth[y] == NONE:
+                    heapq.heappush(heap, (d + 1, y))
+        return {x for x in affected if depth[x] != old[x]}
+
+    def node_added(self):
+        """Registers the (isolated) node just added to the graph."""
+        self.depth.append(NONE)
+
+    def node_removed(self, node, moved):
+        """Applies Graph.remove_node(node), which returned `moved`; remove its edges first."""
+        depth = self.depth
+        if node == self.root:
+            self.root = NONE
+        if moved is not None:
+            depth[node] = depth[moved]
+            if moved == self.root:
+                self.root = node
+        depth.pop()
+
+    def _supported(self, v, excluded):
+        """True if some in-neighbor of `v` outside `excluded` is one level above it."""
+        if v == self.root:
+            return True
+        above = self.depth[v] - 1
+        return any(self.depth[w] == above and w not in excluded for w in self.graph.reverse().neighbors(v))
+
+    def _lower(self, frontier):
+        """BFS from nodes whose depth just dropped; returns the nodes it lowered."""
+        depth, offsets, targets = self.depth, self.graph.offsets, self.graph.targets
+        queue = deque(frontier)
+        changed = set()
+        while queue:
+            u = queue.popleft()
+            d = depth[u] + 1
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if depth[v] == NONE or d < depth[v]:
+                    depth[v] = d
+                    changed.add(v)
+                    queue.append(v)
+        return changed
+
+
+# --- Heuristics (A*) ---
+def euclidean(ax, ay, bx, by):
+    return math.hypot(ax - bx, ay - by)
+
+
+def manhattan(ax, ay, bx, by):
+    return abs(ax - bx) + abs(ay - by)
+
+
+def zero(ax, ay, bx, by):
+    """No estimate at all; A* then expands nodes exactly like Dijkstra."""
+    return 0.0
+
+
+HEURISTICS = {"Euclidean": euclidean, "Manhattan": manhattan, "Zero": zero}
+
+
+def make_heuristic(graph, coords, goal, distance=euclidean):
+    """Returns h(node), the estimated cost from a node to `goal` based on node coordinates.
+
+    Coordinates rarely share units with edge weights, so `distance` is
+    scaled by the smallest weight / distance ratio over all edges. For a
+    metric such as euclidean or manhattan, h then never overestimates and
+    is consistent, so A* finds shortest paths without reopening nodes.
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    scale = math.inf
+    for u in range(len(graph)):
+        ux, uy = coords[u]
+        for i in range(offsets[u], offsets[u + 1]):
+            vx, vy = coords[targets[i]]
+            length = distance(ux, uy, vx, vy)
+            if length > 0:
+                scale = min(scale, (1.0 if weights is None else weights[i]) / length)
+    if scale == math.inf: # No edge has a length
+        scale = 0.0
+    gx, gy = coords[goal]
+
+    def h(node):
+        x, y = coords[node]
+        return scale * distance(x, y, gx, gy)
+    return h
+
+
+ALGORITHMS = {
+    "DFS": dfs,
+    "BFS": bfs,
+    "Level BFS": level_bfs,
+    "Bidirectional BFS": bidirectional_bfs,
+    "Dijkstra": dijkstra,
+    "A*": astar,
+}
+PSEUDO_CODE = {
+    "DFS": DFS_CODE,
+    "BFS": BFS_CODE,
+    "Level BFS": LEVEL_BFS_CODE,
+    "Bidirectional BFS": BIDIRECTIONAL_BFS_CODE,
+    "Dijkstra": DIJKSTRA_CODE,
+    "A*": ASTAR_CODE,
+}
+GOAL_ALGORITHMS = ("Bidirectional BFS", "Dijkstra", "A*") # Use a goal node
+GOAL_REQUIRED = ("Bidirectional BFS", "A*")
+
+
+def run(algorithm, graph, start, goal=NONE, coords=None, heuristic="Euclidean"):
+    """Runs the named algorithm (a key of ALGORITHMS) on a Graph and returns its StepTrace.
+
+    `goal` is only used by GOAL_ALGORITHMS, and `coords` and `heuristic`
+    only by A*.
+    """
+    if algorithm == "A*":
+        return astar(graph, start, goal, coords, heuristic)
+    if algorithm in GOAL_ALGORITHMS:
+        return ALGORITHMS[algorithm](graph, start, goal)
+    return ALGORITHMS[algorithm](graph, start)
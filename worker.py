@@ -0,0 +1,228 @@
+"""Background computation for the visualizer.
+
+A Worker runs traversals and layouts away from the Tk thread: cheap work
+on a thread pool, force-directed layouts and traversals of large graphs on
+a process pool, so they use other cores and never hold the GIL the GUI
+needs. Jobs post their results as (channel, job, kind, value) events on
+queues that the GUI drains with poll() from a timer; it never blocks.
+
+Every job belongs to a channel ("run" or "layout") and only the newest job
+of a channel is live. Submitting a job supersedes the previous one of its
+channel, and cancel() drops it; events of jobs that are no longer live
+are discarded. A job that is already running cannot be interrupted, so
+the force layout checks whether it is still live between iterations and
+stops early. A traversal runs to completion, and its result is dropped.
+
+If no process pool can be started (some sandboxes lack the semaphores
+multiprocessing needs), process jobs run on the thread pool instead. This
+module must not import tkinter.
+"""
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import itertools
+import multiprocessing
+import queue
+import time
+
+import layout
+import traversal
+
+CHANNELS = ("run", "layout")
+MAX_WORKERS = 4 # Per pool; superseded jobs that cannot be interrupted may still hold a worker
+PROCESS_MIN_NODES = 20000 # Traversals of graphs at least this big run in a process
+STREAM_INTERVAL = 0.05    # Seconds between the intermediate positions of a force layout
+
+# Event kinds
+PROGRESS = "progress" # Intermediate value; the job goes on
+RESULT = "result"     # Final value; the job is done
+ERROR = "error"       # The job failed; the value is the message
+
+
+class Worker:
+    """Submits jobs to thread and process pools and collects their events."""
+
+    def __init__(self, use_processes=True):
+        self.threads = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="worker")
+        self.processes = None # Started on the first process job
+        self.use_processes = use_processes
+        self.events = queue.SimpleQueue() # Events from threads and from future callbacks
+        self.process_events = None # multiprocessing queue for the progress of process jobs
+        self.live = None # Shared array: the live job of each channel, read by process jobs
+        self.jobs = {}    # channel: live job id
+        self.futures = {} # channel: Future of the live job
+        self.job_ids = itertools.count(1)
+
+    @property
+    def busy(self):
+        """True while any channel has a live job."""
+        return bool(self.jobs)
+
+    # --- Jobs ---
+    def run_traversal(self, algorithm, graph, start, goal=traversal.NONE, coords=None, heuristic="Euclidean"):
+        """Runs traversal.run() on the "run" channel.
+
+        Its RESULT is the pair (StepTrace, traversal.Timeline): the timeline
+        for seeking is built here too, so the GUI thread never has to.
+        """
+        args = (algorithm, graph, start, goal, coords, heuristic)
+        if len(graph) >= PROCESS_MIN_NODES:
+            return self._submit_process("run", _run_traversal, args)
+        return self._submit_thread("run", _run_traversal, args)
+
+    def compute_layout(self, name, graph, width, height, margin, root=0):
+        """Computes a layout.LAYOUTS layout on the "layout" channel, as canvas positions.
+
+        The force layout sends its positions as PROGRESS events while it
+        settles; every layout ends with a RESULT.
+        """
+        if name == "Force":
+            return self._submit_process("layout", _force_layout, (graph, width, height, margin), streams=True)
+        return self._submit_thread("layout", layout.canvas_layout, (name, graph, width, height, margin, root))
+
+    def cancel(self, channel):
+        """Drops the live job of `channel`; returns whether there was one."""
+        job = self.jobs.pop(channel, None)
+        if job is None:
+            return False
+        self._publish(channel, 0)
+        self.futures.pop(channel).cancel() # Only stops jobs that have not started
+        return True
+
+    def close(self):
+        """Drops every job and shuts the pools down without waiting for them."""
+        for channel in CHANNELS:
+            self.cancel(channel)
+        self.threads.shutdown(wait=False, cancel_futures=True)
+        if self.processes:
+            self.processes.shutdown(wait=False, cancel_futures=True)
+
+    # --- Events ---
+    def poll(self):
+        """Returns the (channel, kind, value) events of live jobs that arrived since the last call.
+
+        Only the latest PROGRESS event of each channel is kept, since each
+        one replaces the previous.
+        """
+        events = []
+        for source in (self.events, self.process_events):
+            while source is not None:
+                try:
+                    channel, job, kind, value = source.get_nowait()
+                except queue.Empty:
+                    break
+                if self.jobs.get(channel) != job:
+                    continue # Superseded or cancelled
+                if kind == PROGRESS:
+                    events = [event for event in events if event[:2] != (channel, PROGRESS)]
+                else:
+                    del self.jobs[channel], self.futures[channel]
+                    self._publish(channel, 0)
+                events.append((channel, kind, value))
+        return events
+
+    # --- Internals ---
+    def _start(self, channel, submit):
+        self.cancel(channel)
+        job = next(self.job_ids)
+        self.jobs[channel] = job
+        self._publish(channel, job) # Before submitting, so that the job sees itself live
+        try:
+            future = submit(job)
+        except BaseException:
+            del self.jobs[channel]
+            self._publish(channel, 0)
+            raise
+        self.futures[channel] = future
+        future.add_done_callback(lambda f: self._finish(channel, job, f))
+        return job
+
+    def _submit_thread(self, channel, function, args, streams=False):
+        if not streams:
+            return self._start(channel, lambda job: self.threads.submit(function, *args))
+
+        def emit(job, value):
+            self.events.put((channel, job, PROGRESS, value))
+        return self._start(channel, lambda job: self.threads.submit(
+            function, lambda value: emit(job, value), lambda: self.jobs.get(channel) == job, *args))
+
+    def _submit_process(self, channel, function, args, streams=False):
+        if self._start_processes():
+            try:
+                return self._start(channel, lambda job: self.processes.submit(
+                    _in_process, function, channel, job, streams, *args))
+            except BrokenProcessPool: # A worker process died; stay on threads from now on
+                self.processes = None
+                self.use_processes = False
+        return self._submit_thread(channel, function, args, streams)
+
+    def _start_processes(self):
+        """Starts the process pool if needed; returns False if processes cannot be used."""
+        if self.processes is None and self.use_processes:
+            # Spawn rather than fork: a forked copy of a process running Tk is not safe to use
+            context = multiprocessing.get_context("spawn")
+            try:
+                self.process_events = context.Queue()
+                self.live = context.RawArray('q', len(CHANNELS))
+                self.processes = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=context,
+                                                     initializer=_init_process,
+                                                     initargs=(self.process_events, self.live))
+            except (OSError, ImportError, NotImplementedError): # E.g. no sem_open()
+                self.process_events = self.live = None
+                self.use_processes = False
+        return self.processes is not None
+
+    def _publish(self, channel, job):
+        if self.live is not None:
+            self.live[CHANNELS.index(channel)] = job
+
+    def _finish(self, channel, job, future):
+        """Future callback (on a pool thread): posts the job's RESULT or ERROR."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.events.put((channel, job, RESULT, future.result()))
+        else:
+            self.events.put((channel, job, ERROR, str(error) or type(error).__name__))
+
+
+# --- Job Functions (run on pool threads or in worker processes) ---
+_process_events = None # Set in each worker process by _init_process()
+_process_live = None
+
+
+def _init_process(events, live):
+    global _process_events, _process_live
+    _process_events, _process_live = events, live
+    # Let the process exit with progress still unread; it is stale once the app stops polling
+    events.cancel_join_thread()
+
+
+def _in_process(function, channel, job, streams, *args):
+    """Runs `function` in a worker process, wiring streaming jobs to the shared queue and array."""
+    if not streams:
+        return function(*args)
+    slot = CHANNELS.index(channel)
+    return function(lambda value: _process_events.put((channel, job, PROGRESS, value)),
+                    lambda: _process_live[slot] == job, *args)
+
+
+def _run_traversal(algorithm, graph, start, goal, coords, heuristic):
+    trace = traversal.run(algorithm, graph, start, goal=goal, coords=coords, heuristic=heuristic)
+    return trace, traversal.Timeline(trace)
+
+
+def _force_layout(emit, is_live, graph, width, height, margin):
+    """Refines a ForceLayout until it settles, emitting its positions every STREAM_INTERVAL."""
+    force = layout.ForceLayout(graph)
+    emit(layout.to_canvas(*force.positions(), width, height, margin))
+    running = True
+    while running:
+        deadline = time.perf_counter() + STREAM_INTERVAL
+        while running and time.perf_counter() < deadline:
+            running = force.step()
+        if not is_live():
+            return None # Superseded; nobody will read the result
+        if running:
+            emit(layout.to_canvas(*force.positions(), width, height, margin))
+    return layout.to_canvas(*force.positions(), width, height, margin)